@@ -0,0 +1,196 @@
+import math
+import time
+import logging
+from typing import Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+TIME_CONSTANT_SECONDS = 60.0 # 평균/분산 EWMA 시정수 (샘플 주기와 관계없이 같은 시간 창)
+RATE_WINDOW_SECONDS = 30.0 # 변화율은 이 이상 떨어진 두 값으로 (1초 샘플의 양자화 잡음 제외)
+HOLD_SECONDS = 60.0 # 과도 상태가 끝나고 이만큼 조용해야 주기를 늘리기 시작
+RELEASE_FACTOR = 1.5 # 조용한 측정마다 주기 배율 (빠르게 올리고 천천히 내림)
+BUDGETS = {
+    'cpu': 0.2, # 센서 읽기 시간 / 벽시계 (1-Wire 비트뱅잉, ADC 분석)
+    'bus': 0.5, # RS485 폴링 점유율
+}
+
+class SamplingPolicy(NamedTuple):
+    min_period: float = 1.0
+    max_period: float = 60.0
+    rate_threshold: float = 0.5 # 단위/분 (온도 °C/분, 전류 A/분). 압축기 사이클의 완만한 변화보다 크게
+    std_threshold: float = 0.5 # EWMA 표준편차
+    budget: str = 'cpu'
+
+# 드라이버 종류별 기본값 (ADAPTIVE_OPTIONS 의 channels 에서 채널별로 덮어씀)
+DEFAULT_POLICIES = {
+    'sct013': SamplingPolicy(min_period=1.0, max_period=10.0, rate_threshold=1.0, std_threshold=0.3),
+    'ds18b20': SamplingPolicy(),
+    'fox_mr20': SamplingPolicy(budget='bus'),
+}
+
+# ==============================================================================
+# 1. 채널 상태 (채널당 고정 크기)
+# ==============================================================================
+class AdaptiveChannel:
+    __slots__ = ('name', 'policy', 'apply', 'cost', 'period', 'desired', 'mean', 'var',
+                 'anchor_ts', 'anchor_value', 'rate', 'last_ts', 'transient_at', 'transients')
+
+    def __init__(self, name: str, policy: SamplingPolicy, apply: Callable[[float], None],
+                 cost: Optional[Callable[[], Optional[float]]], period: float):
+        self.name = name
+        self.policy = policy
+        self.apply = apply # apply(period) - 태스크/버스 주기 변경
+        self.cost = cost # 측정 1회에 드는 시간 (초), 예산 계산용
+        self.period = period # 실제 적용된 주기
+        self.desired = period # 예산 적용 전 주기
+        self.mean = None
+        self.var = 0.0
+        self.anchor_ts = None
+        self.anchor_value = None
+        self.rate = 0.0
+        self.last_ts = None
+        self.transient_at = None
+        self.transients = 0
+
+    def observe(self, ts: float, value: float) -> bool:
+        # 과도 상태 여부. 평균/분산은 시간 기반 EWMA, 변화율은 RATE_WINDOW 이상 간격
+        if self.mean is None:
+            self.mean = value
+            self.anchor_ts, self.anchor_value = ts, value
+            self.last_ts = ts
+            return False
+        dt = max(0.0, ts - self.last_ts)
+        self.last_ts = ts
+        alpha = 1.0 - math.exp(-dt / TIME_CONSTANT_SECONDS)
+        dev = value - self.mean
+        self.mean += alpha * dev
+        self.var = (1.0 - alpha) * (self.var + alpha * dev * dev)
+        span = ts - self.anchor_ts
+        if span >= RATE_WINDOW_SECONDS or (span > 0 and self.period >= RATE_WINDOW_SECONDS):
+            self.rate = (value - self.anchor_value) * 60.0 / span
+            self.anchor_ts, self.anchor_value = ts, value
+        return abs(self.rate) > self.policy.rate_threshold or math.sqrt(self.var) > self.policy.std_threshold
+
+# ==============================================================================
+# 2. 스케줄러
+# ==============================================================================
+class AdaptiveScheduler:
+    # 센서 콜백에서 observe(채널, 값) -> 과도 상태면 바로 최소 주기, 조용하면 천천히 최대 주기까지
+    def __init__(self, budgets: Optional[Dict[str, float]] = None, hold_seconds=HOLD_SECONDS,
+                 release_factor=RELEASE_FACTOR):
+        self.budgets = dict(BUDGETS, **(budgets or {}))
+        self.hold_seconds = hold_seconds
+        self.release_factor = release_factor
+        self.channels: Dict[str, AdaptiveChannel] = {}
+
+    def add(self, name: str, policy: SamplingPolicy, apply: Callable[[float], None],
+            cost: Optional[Callable[[], Optional[float]]] = None, period: Optional[float] = None):
+        period = policy.min_period if period is None else min(max(period, policy.min_period), policy.max_period)
+        self.channels[name] = AdaptiveChannel(name, policy, apply, cost, period)
+        apply(period)
+
+    def observe(self, name: str, value: Optional[float], ts: Optional[float] = None) -> Optional[float]:
+        channel = self.channels.get(name)
+        if channel is None or value is None:
+            return None
+        ts = time.time() if ts is None else ts
+        policy = channel.policy
+        if channel.observe(ts, float(value)):
+            if channel.transient_at is None or channel.desired > policy.min_period:
+                channel.transients += 1
+                logger.debug(f"[{name}] 과도 상태: 변화율 {channel.rate:.3f}/분, 표준편차 {math.sqrt(channel.var):.3f}")
+            channel.transient_at = ts
+            channel.desired = policy.min_period
+        elif channel.transient_at is None or ts - channel.transient_at >= self.hold_seconds:
+            channel.desired = min(policy.max_period, channel.desired * self.release_factor)
+        self._rebalance(policy.budget)
+        return channel.period
+
+    def boost(self, *names: str, ts: Optional[float] = None):
+        # 다른 신호로 과도 상태를 알았을 때 (알람, 제상 시작 등) 해당 채널을 바로 최소 주기로
+        ts = time.time() if ts is None else ts
+        budgets = set()
+        for name in names:
+            channel = self.channels.get(name)
+            if channel is not None:
+                channel.transient_at = ts
+                channel.desired = channel.policy.min_period
+                budgets.add(channel.policy.budget)
+        for budget in budgets:
+            self._rebalance(budget)
+
+    def _rebalance(self, budget: str):
+        # 예산 그룹의 점유율 합 (측정 시간 / 주기) 이 예산을 넘으면 그룹 전체 주기를 같은 배율로 늘림
+        group = [c for c in self.channels.values() if c.policy.budget == budget]
+        load = 0.0
+        for channel in group:
+            cost = channel.cost() if channel.cost is not None else None
+            if cost:
+                load += cost / channel.desired
+        limit = self.budgets.get(budget)
+        scale = load / limit if limit and load > limit else 1.0
+        for channel in group:
+            period = min(channel.policy.max_period, max(channel.policy.min_period, channel.desired * scale))
+            if abs(period - channel.period) > 0.01 * channel.period:
+                channel.period = period
+                channel.apply(period)
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {'period': round(c.period, 2), 'desired': round(c.desired, 2),
+                   'rate': round(c.rate, 3), 'std': round(math.sqrt(c.var), 3), 'transients': c.transients}
+            for name, c in self.channels.items()
+        }
+
+def policy_for(kind: Optional[str], overrides: Optional[dict] = None) -> SamplingPolicy:
+    # 드라이버 종류 기본값 + config 의 채널별 값
+    return DEFAULT_POLICIES.get(kind, SamplingPolicy())._replace(**(overrides or {}))
+
+# ==============================================================================
+# 3. 재생 벤치마크 (고정 10초 주기와 비교)
+# ==============================================================================
+def cabinet_temperature(t: float) -> float:
+    # 1초 해상도 모델: 압축기 사이클 (10분 냉각 / 15분 상승) + 2시간마다 90초 문 열림
+    cycle = t % 1500
+    base = 5.0 - cycle / 300 if cycle < 600 else 3.0 + (cycle - 600) / 450
+    into_door = t % 7200 - 3600
+    if 0 <= into_door < 90:
+        base += into_door * 0.04
+    elif 90 <= into_door < 600:
+        base += 3.6 * math.exp(-(into_door - 90) / 60)
+    return round(base * 16) / 16
+
+def _door_peaks(times) -> list:
+    # 문 열림마다 샘플링으로 본 최고 온도 - 실제 최고 온도 (°C)
+    errors = {}
+    for t in times:
+        into_door = t % 7200 - 3600
+        if 0 <= into_door < 600:
+            key = int(t // 7200)
+            errors[key] = max(errors.get(key, -99.0), cabinet_temperature(t))
+    return [peak - cabinet_temperature(int(key) * 7200 + 3600 + 90) for key, peak in sorted(errors.items())]
+
+def simulate(hours=6.0, fixed_period=10.0, cost=0.75):
+    scheduler = AdaptiveScheduler()
+    scheduler.add('temperature', DEFAULT_POLICIES['ds18b20'], lambda period: None, cost=lambda: cost, period=fixed_period)
+    t, times, elapsed = 0.0, [], 0.0
+    while t < hours * 3600:
+        times.append(t)
+        t0 = time.perf_counter()
+        period = scheduler.observe('temperature', cabinet_temperature(t), ts=t)
+        elapsed += time.perf_counter() - t0
+        t += period
+    fixed_times = [i * fixed_period for i in range(int(hours * 3600 / fixed_period))]
+    adaptive_peaks, fixed_peaks = _door_peaks(times), _door_peaks(fixed_times)
+    print(f"{hours:.0f}시간, 측정 1회 {cost:.2f}초 (CPU 예산 {scheduler.budgets['cpu']:.0%} -> 최소 주기 "
+          f"{cost / scheduler.budgets['cpu']:.2f}초)")
+    print(f"  고정 {fixed_period:.0f}초: {len(fixed_times)}회, 문 열림 최고 온도 오차 {[round(e, 2) for e in fixed_peaks]}")
+    print(f"  적응형: {len(times)}회, 문 열림 최고 온도 오차 {[round(e, 2) for e in adaptive_peaks]}, "
+          f"과도 진입 {scheduler.channels['temperature'].transients}회, observe {elapsed / len(times) * 1e6:.1f} µs")
+
+if __name__ == "__main__":
+    simulate()
+    simulate(cost=0.1)
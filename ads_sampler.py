@@ -0,0 +1,168 @@
+import math
+import time
+import random
+import logging
+import threading
+from array import array
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+# ADS1115 연속 변환 모드에서 지원하는 데이터 레이트 (SPS)
+ADS1115_DATA_RATES = (8, 16, 32, 64, 128, 250, 475, 860)
+DEFAULT_DATA_RATE = 860
+DEFAULT_LINE_FREQUENCY = 60.0
+DEFAULT_CAPACITY = 4096  # 860 SPS 기준 약 4.7초 분량
+
+# ==============================================================================
+# 1. ADC 백엔드
+# ==============================================================================
+class Ads1115Backend:
+    # 실제 ADS1115 를 연속 변환 모드로 구동 (start_adc -> get_last_result)
+    def __init__(self, adc=None, channel=0, gain=1, data_rate=DEFAULT_DATA_RATE):
+        if data_rate not in ADS1115_DATA_RATES:
+            raise ValueError(f"지원하지 않는 ADS1115 데이터 레이트: {data_rate}")
+        if adc is None:
+            import Adafruit_ADS1x15
+            adc = Adafruit_ADS1x15.ADS1115()
+        self.adc = adc
+        self.channel = channel
+        self.gain = gain
+        self.data_rate = data_rate
+
+    def start(self):
+        self.adc.start_adc(self.channel, gain=self.gain, data_rate=self.data_rate)
+
+    def read(self) -> int:
+        return self.adc.get_last_result()
+
+    def stop(self):
+        self.adc.stop_adc()
+
+
+class SimulatedAdcBackend:
+    # 라즈베리파이 없이 테스트하기 위한 가상 ADC
+    # n 번째 샘플은 t = n / data_rate 시점의 사인파 값 (벽시계와 무관하게 결정적)
+    def __init__(self, data_rate=DEFAULT_DATA_RATE, amplitude=8000, frequency=DEFAULT_LINE_FREQUENCY,
+                 offset=0, noise=0, seed=None):
+        self.data_rate = data_rate
+        self.amplitude = amplitude
+        self.frequency = frequency
+        self.offset = offset
+        self.noise = noise
+        self._rng = random.Random(seed)
+        self._n = 0
+
+    def start(self):
+        self._n = 0
+
+    def read(self) -> int:
+        t = self._n / self.data_rate
+        self._n += 1
+        value = self.offset + self.amplitude * math.sin(2 * math.pi * self.frequency * t)
+        if self.noise:
+            value += self._rng.gauss(0, self.noise)
+        return max(-32768, min(32767, int(round(value))))
+
+    def stop(self):
+        pass
+
+# ==============================================================================
+# 2. 연속 샘플러 (링 버퍼)
+# ==============================================================================
+class ContinuousSampler:
+    def __init__(self, backend, data_rate: Optional[int] = None, capacity=DEFAULT_CAPACITY,
+                 line_frequency=DEFAULT_LINE_FREQUENCY):
+        self.backend = backend
+        self.data_rate = data_rate or getattr(backend, 'data_rate', DEFAULT_DATA_RATE)
+        self.capacity = capacity
+        self.line_frequency = line_frequency
+        self._buf = array('h', bytes(2 * capacity))  # 미리 할당된 int16 링 버퍼
+        self._count = 0  # 지금까지 기록한 전체 샘플 수
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = None
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self.backend.start()
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="ads-sampler", daemon=True)
+        self._thread.start()
+        logger.info(f"ADC 연속 샘플링 시작: {self.data_rate} SPS, 버퍼 {self.capacity} 샘플")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        try:
+            self.backend.stop()
+        except Exception as e:
+            logger.error(f"ADC 정지 오류: {e}")
+
+    def _run(self):
+        period = 1.0 / self.data_rate
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                value = self.backend.read()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"ADC 샘플 읽기 오류: {e}")
+                self._stop.wait(0.1)
+                next_t = time.monotonic()
+                continue
+            with self._lock:
+                self._buf[self._count % self.capacity] = value
+                self._count += 1
+
+            # 단조 시계 기준으로 다음 샘플 시각을 고정 (누적 드리프트 방지)
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -10 * period:
+                # 한참 밀렸으면 따라잡으려 하지 않고 재동기화
+                next_t = time.monotonic()
+
+    def samples_for_cycles(self, n_cycles: float) -> int:
+        return max(1, int(round(n_cycles * self.data_rate / self.line_frequency)))
+
+    def get_window(self, n_cycles: float = 10) -> array:
+        # 가장 최근 n_cycles 주기 분량의 샘플을 시간순으로 반환 (부족하면 있는 만큼)
+        n = min(self.samples_for_cycles(n_cycles), self.capacity)
+        with self._lock:
+            count = self._count
+            n = min(n, count)
+            if n == 0:
+                return array('h')
+            end = count % self.capacity
+            start = end - n
+            if start >= 0:
+                return self._buf[start:end]
+            return self._buf[start:] + self._buf[:end]
+
+    def effective_rate(self) -> Optional[float]:
+        # 실제로 달성한 샘플링 속도 (SPS)
+        if not self._started_at:
+            return None
+        elapsed = time.monotonic() - self._started_at
+        if elapsed <= 0:
+            return None
+        return self._count / elapsed
+
+    @property
+    def sample_count(self) -> int:
+        return self._count
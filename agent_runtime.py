@@ -0,0 +1,168 @@
+import time
+import math
+import asyncio
+import logging
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 최신값 테이블
+# ==============================================================================
+class LatestValues:
+    # 채널별 마지막 측정값. 모든 태스크가 같은 이벤트 루프에서 갱신하므로 락 불필요
+    def __init__(self):
+        self._values: Dict[str, dict] = {}
+        self._subscribers = []
+
+    def subscribe(self, callback: Callable[[str, dict], None]):
+        # callback(channel, entry) 은 publish 한 이벤트 루프에서 바로 호출됨 (오래 걸리면 안 됨)
+        self._subscribers.append(callback)
+
+    def publish(self, channel: str, value, duration: float):
+        entry = self._values[channel] = {
+            'value': value,
+            'timestamp': time.time(),
+            'duration': duration,
+        }
+        for callback in self._subscribers:
+            try:
+                callback(channel, entry)
+            except Exception as e:
+                logger.error(f"[{channel}] 구독자 오류: {e}")
+
+    def get(self, channel: str, max_age: Optional[float] = None):
+        entry = self._values.get(channel)
+        if entry is None:
+            return None
+        if max_age is not None and time.time() - entry['timestamp'] > max_age:
+            return None
+        return entry['value']
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {k: dict(v) for k, v in self._values.items()}
+
+# ==============================================================================
+# 1. 주기 태스크
+# ==============================================================================
+class PeriodicTask:
+    def __init__(self, name: str, func: Callable, period: float, blocking=True,
+                 publish=True, on_result: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.func = func
+        self.period = period
+        self.blocking = blocking # True 면 executor 스레드에서 실행 (시리얼/HTTP/sysfs 드라이버)
+        self.publish = publish
+        self.on_result = on_result
+        self.runs = 0
+        self.errors = 0
+        self.overruns = 0 # 실행이 주기보다 길어져 건너뛴 슬롯 수
+        self.last_duration = None
+        self.last_lag = None # 예정 시각보다 늦게 시작한 시간 (이벤트 루프가 바쁘거나 느린 Pi)
+        self._wake = None
+
+    def set_period(self, period: float):
+        # 이벤트 루프에서 호출. 다음 실행부터 적용하고, 대기 중이면 깨워 새 주기로 다시 맞춤
+        period = float(period)
+        if period == self.period:
+            return
+        self.period = period
+        if self._wake is not None:
+            self._wake.set()
+
+# ==============================================================================
+# 2. 런타임
+# ==============================================================================
+class AgentRuntime:
+    def __init__(self, max_workers=8):
+        self.latest = LatestValues()
+        self.tasks: Dict[str, PeriodicTask] = {}
+        self.observers = [] # observer(task, duration) - 실행 시간 수집 (벤치마크 등)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-io")
+        self._loop = None
+        self._main = None
+        self._stopping = False
+
+    def add_task(self, name, func, period, blocking=True, publish=True, on_result=None) -> PeriodicTask:
+        task = PeriodicTask(name, func, period, blocking=blocking, publish=publish, on_result=on_result)
+        self.tasks[name] = task
+        return task
+
+    async def _call(self, task: PeriodicTask):
+        if inspect.iscoroutinefunction(task.func):
+            return await task.func()
+        if task.blocking:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, task.func)
+        return task.func()
+
+    async def _run_task(self, task: PeriodicTask):
+        loop = asyncio.get_running_loop()
+        start = loop.time() # 단조 시계
+        slot = 0
+        period = task.period
+        task._wake = asyncio.Event()
+        due = start
+        while True:
+            t0 = loop.time()
+            task.last_lag = max(0.0, t0 - due)
+            try:
+                result = await self._call(task)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                task.errors += 1
+                logger.error(f"[{task.name}] 태스크 오류: {e}")
+                result = None
+            task.runs += 1
+            task.last_duration = loop.time() - t0
+            for observer in self.observers:
+                observer(task, task.last_duration)
+            if task.publish:
+                self.latest.publish(task.name, result, task.last_duration)
+            if task.on_result is not None:
+                try:
+                    task.on_result(result)
+                except Exception as e:
+                    logger.error(f"[{task.name}] 결과 처리 오류: {e}")
+
+            # 시작 시각 기준 k * period 에 맞춰 다음 실행 (sleep 누적 드리프트 없음)
+            if task.period != period:
+                # 주기가 바뀌면 이번 실행 시각을 새 격자의 기준으로
+                period, start, slot = task.period, t0, 0
+            now = loop.time()
+            next_slot = max(slot + 1, math.floor((now - start) / period) + 1)
+            task.overruns += next_slot - slot - 1
+            slot = next_slot
+            while True:
+                task._wake.clear()
+                due = start + slot * period
+                delay = due - loop.time()
+                if delay <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(task._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    break
+                if task.period != period:
+                    # 대기 중 주기 변경 (다른 채널의 과도 상태 등) -> 직전 실행 + 새 주기
+                    period, start, slot = task.period, t0, 1
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._main = asyncio.gather(*(self._run_task(t) for t in self.tasks.values()))
+        try:
+            await self._main
+        except asyncio.CancelledError:
+            if not self._stopping:
+                raise
+        finally:
+            self._executor.shutdown(wait=False)
+
+    def stop(self):
+        # 다른 스레드에서 호출 가능. 모든 태스크를 취소하고 run() 이 정상 반환
+        self._stopping = True
+        if self._loop is not None and self._main is not None:
+            self._loop.call_soon_threadsafe(self._main.cancel)
@@ -0,0 +1,226 @@
+import math
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+EWMA_ALPHA = 0.5 # 변화율 평활 계수 (변화율 창마다. 창 안에서 3°C 넘게 뛰는 센서 계단이면 바로 알람)
+RATE_WINDOW_SECONDS = 30.0 # 변화율은 이 이상 떨어진 두 측정값으로 (적응형 샘플링의 짧은 주기에서 양자화 잡음 제외)
+RATE_LIMIT_PER_MINUTE = 3.0 # 이보다 빠른 온도 변화 (°C/분) 는 센서/배선 이상으로 봄
+CUSUM_SLACK = 0.5 # 허용 대역 밖으로 이만큼(°C)은 누적하지 않음
+CUSUM_THRESHOLD = 10.0 # 대역 밖 초과분 누적 (°C·분). 예: 2.5°C 초과가 5분 지속
+STUCK_SECONDS = 1800 # 값이 전혀 바뀌지 않은 채 이 시간이 지나면 고착
+STUCK_EPSILON = 0.01
+MISSING_SECONDS = 120 # 측정값 없음(None) 지속
+DISAGREEMENT_TOLERANCE = 3.0 # DS18B20 과 제어기(RS485) 온도 차 (°C)
+DISAGREEMENT_SECONDS = 600
+MAX_GAP_SECONDS = 600 # 이보다 긴 공백 뒤의 값은 변화율/누적 계산에 쓰지 않음
+
+ALARM_HIGH = "temperature_high"
+ALARM_LOW = "temperature_low"
+ALARM_RATE = "rate_of_change"
+ALARM_STUCK = "stuck_value"
+ALARM_MISSING = "sensor_missing"
+ALARM_DISAGREEMENT = "sensor_disagreement"
+
+# ==============================================================================
+# 1. 채널 상태 (채널당 고정 크기, 측정값 이력을 저장하지 않음)
+# ==============================================================================
+class ChannelState:
+    __slots__ = ('last_value', 'last_ts', 'anchor_value', 'anchor_ts', 'rate', 'cusum_high', 'cusum_low',
+                 'stuck_value', 'changed_at', 'missing_since', 'active')
+
+    def __init__(self):
+        self.last_value = None
+        self.last_ts = None
+        self.anchor_value = None # 변화율 창 시작 값과 시각
+        self.anchor_ts = None
+        self.rate = 0.0 # EWMA 평활 변화율 (°C/분)
+        self.cusum_high = 0.0
+        self.cusum_low = 0.0
+        self.stuck_value = None # 마지막으로 epsilon 넘게 바뀐 값과 그 시각
+        self.changed_at = None
+        self.missing_since = None
+        self.active = set()
+
+# ==============================================================================
+# 2. 증분 이상 감지기
+# ==============================================================================
+class AnomalyDetector:
+    # update() 는 측정값마다 호출, 상태가 바뀐 알람만 [{'alarm','channel','state','timestamp','value',...}]
+    def __init__(self, alpha=EWMA_ALPHA, rate_limit=RATE_LIMIT_PER_MINUTE, cusum_slack=CUSUM_SLACK,
+                 cusum_threshold=CUSUM_THRESHOLD, stuck_seconds=STUCK_SECONDS, stuck_epsilon=STUCK_EPSILON,
+                 missing_seconds=MISSING_SECONDS, disagreement_tolerance=DISAGREEMENT_TOLERANCE,
+                 disagreement_seconds=DISAGREEMENT_SECONDS, max_gap=MAX_GAP_SECONDS, rate_window=RATE_WINDOW_SECONDS):
+        self.alpha = alpha
+        self.rate_limit = rate_limit
+        self.cusum_slack = cusum_slack
+        self.cusum_threshold = cusum_threshold
+        self.stuck_seconds = stuck_seconds
+        self.stuck_epsilon = stuck_epsilon
+        self.missing_seconds = missing_seconds
+        self.disagreement_tolerance = disagreement_tolerance
+        self.disagreement_seconds = disagreement_seconds
+        self.max_gap = max_gap
+        self.rate_window = rate_window
+        self.band: Optional[Tuple[float, float]] = None
+        self.channels: Dict[str, ChannelState] = {}
+        self._disagree_since = None
+        self._disagree_active = False
+        self.updates = 0
+
+    def set_reference(self, setting_temp, temp_gap):
+        # API 의 setting_temp_value / temp_gap 으로 허용 대역 (설정 ± 편차). 값이 없으면 대역 알람 끔
+        try:
+            setpoint, gap = float(setting_temp), abs(float(temp_gap))
+        except (TypeError, ValueError):
+            self.band = None
+            return
+        self.band = (setpoint - gap, setpoint + gap)
+
+    def _change(self, events, state: ChannelState, alarm: str, raised: bool, channel: str, ts: float,
+                value, **detail):
+        if raised == (alarm in state.active):
+            return
+        if raised:
+            state.active.add(alarm)
+        else:
+            state.active.discard(alarm)
+        event = {'alarm': alarm, 'channel': channel, 'state': 'raised' if raised else 'cleared',
+                 'timestamp': ts, 'value': value}
+        event.update(detail)
+        events.append(event)
+
+    def update(self, channel: str, ts: float, value: Optional[float], defrost=False) -> List[dict]:
+        # defrost=True 면 (제상 히터 동작 중) 고온 누적을 하지 않음
+        self.updates += 1
+        state = self.channels.get(channel)
+        if state is None:
+            state = self.channels[channel] = ChannelState()
+        events = []
+
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            if state.missing_since is None:
+                state.missing_since = ts
+            if ts - state.missing_since >= self.missing_seconds:
+                self._change(events, state, ALARM_MISSING, True, channel, ts, None,
+                             since=state.missing_since)
+            return events
+        state.missing_since = None
+        self._change(events, state, ALARM_MISSING, False, channel, ts, value)
+
+        dt = ts - state.last_ts if state.last_ts is not None else None
+        fresh = dt is not None and 0 < dt <= self.max_gap
+
+        # 변화율 (rate_window 이상 간격, EWMA 평활) - 튀는 한 샘플보다 지속되는 급변을 잡음. 샘플 주기와 무관
+        if not fresh:
+            state.rate = 0.0
+            state.anchor_value, state.anchor_ts = value, ts
+        span = ts - state.anchor_ts
+        if span >= self.rate_window:
+            rate = (value - state.anchor_value) * 60.0 / span
+            state.rate += self.alpha * (rate - state.rate)
+            state.anchor_value, state.anchor_ts = value, ts
+            if abs(state.rate) > self.rate_limit:
+                self._change(events, state, ALARM_RATE, True, channel, ts, value, rate=round(state.rate, 3))
+            elif abs(state.rate) < self.rate_limit / 2:
+                self._change(events, state, ALARM_RATE, False, channel, ts, value)
+
+        # 허용 대역 밖 초과분을 시간 가중으로 누적 (CUSUM) - 일시적 문 열림은 흡수
+        if self.band is not None and fresh:
+            low, high = self.band
+            minutes = dt / 60.0
+            high_excess = 0.0 if defrost else value - high - self.cusum_slack
+            state.cusum_high = max(0.0, state.cusum_high + high_excess * minutes)
+            state.cusum_low = max(0.0, state.cusum_low + (low - value - self.cusum_slack) * minutes)
+            if state.cusum_high > self.cusum_threshold:
+                self._change(events, state, ALARM_HIGH, True, channel, ts, value, limit=high)
+            elif state.cusum_high == 0.0 and value <= high:
+                self._change(events, state, ALARM_HIGH, False, channel, ts, value)
+            if state.cusum_low > self.cusum_threshold:
+                self._change(events, state, ALARM_LOW, True, channel, ts, value, limit=low)
+            elif state.cusum_low == 0.0 and value >= low:
+                self._change(events, state, ALARM_LOW, False, channel, ts, value)
+
+        # 고착: 값이 epsilon 넘게 바뀐 마지막 시각만 기억
+        if state.stuck_value is None or abs(value - state.stuck_value) > self.stuck_epsilon:
+            self._change(events, state, ALARM_STUCK, False, channel, ts, value)
+            state.stuck_value = value
+            state.changed_at = ts
+        elif ts - state.changed_at >= self.stuck_seconds:
+            self._change(events, state, ALARM_STUCK, True, channel, ts, value, since=state.changed_at)
+        state.last_value = value
+        state.last_ts = ts
+        return events
+
+    def compare(self, ts: float, a: Optional[float], b: Optional[float], channel="ds18b20/rs485") -> List[dict]:
+        # 같은 캐비닛을 재는 두 센서의 차이가 오래 벌어지면 한쪽이 빠졌거나 고장
+        if a is None or b is None:
+            return []
+        diff = a - b
+        events = []
+        if abs(diff) > self.disagreement_tolerance:
+            if self._disagree_since is None:
+                self._disagree_since = ts
+            if not self._disagree_active and ts - self._disagree_since >= self.disagreement_seconds:
+                self._disagree_active = True
+                events.append({'alarm': ALARM_DISAGREEMENT, 'channel': channel, 'state': 'raised',
+                               'timestamp': ts, 'value': round(diff, 2), 'since': self._disagree_since})
+        else:
+            self._disagree_since = None
+            if self._disagree_active:
+                self._disagree_active = False
+                events.append({'alarm': ALARM_DISAGREEMENT, 'channel': channel, 'state': 'cleared',
+                               'timestamp': ts, 'value': round(diff, 2)})
+        return events
+
+    def active(self) -> List[dict]:
+        # 현재 켜져 있는 알람 (키오스크 표시용)
+        alarms = [{'alarm': alarm, 'channel': channel}
+                  for channel, state in self.channels.items() for alarm in sorted(state.active)]
+        if self._disagree_active:
+            alarms.append({'alarm': ALARM_DISAGREEMENT, 'channel': "ds18b20/rs485"})
+        return alarms
+
+# ==============================================================================
+# 3. 합성 시나리오 벤치마크
+# ==============================================================================
+def scenario(hours=24, period=10.0, setpoint=3.0, gap=2.0):
+    # 정상 사이클 -> 냉각 고장으로 서서히 상승 -> 센서 고착(제어기 온도는 계속 상승) -> 센서 분리
+    t, temp = 0.0, setpoint
+    cooling = True
+    samples = []
+    while t < hours * 3600:
+        phase = t / (hours * 3600)
+        if phase < 0.5:
+            temp += (-0.02 if cooling else 0.01) * period / 10
+            if temp <= setpoint:
+                cooling = False
+            elif temp >= setpoint + gap:
+                cooling = True
+        else:
+            temp += 0.003 * period / 10 # 냉각 고장
+        value = None if phase >= 0.9 else (round(temp * 16) / 16 if phase < 0.8 else 7.5)
+        samples.append((t, value, temp - 0.2))
+        t += period
+    return samples
+
+def benchmark(hours=24):
+    detector = AnomalyDetector()
+    detector.set_reference(3.0, 2.0)
+    samples = scenario(hours)
+    events = []
+    t0 = time.perf_counter()
+    for ts, value, controller in samples:
+        events.extend(detector.update('temperature', ts, value))
+        events.extend(detector.compare(ts, value, controller))
+    elapsed = time.perf_counter() - t0
+    print(f"{len(samples)}개 측정값, 측정값당 {elapsed / len(samples) * 1e6:.1f} µs")
+    for e in events:
+        print(f"  {e['timestamp'] / 3600:5.2f}h {e['state']:<8} {e['alarm']} ({e['channel']}, 값 {e['value']})")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    benchmark()
@@ -0,0 +1,245 @@
+import gzip
+import json
+import time
+import logging
+from typing import List, Optional
+
+from metrics import HTTP_SECONDS, HTTP_REQUESTS
+from upload_queue import RecordRejected
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+DEFAULT_BATCH_SIZE = 30 # 10초 주기 기준 5분 분량
+DEFAULT_MAX_WAIT_SECONDS = 60.0
+UPLOAD_TIMEOUT_SECONDS = 10
+SUCCESS_STATUS = (200, 201, 202, 204)
+UNSUPPORTED_MEDIA_TYPE = 415 # gzip 본문 거절은 이 코드만 (비압축 재전송이 성공해야 gzip 을 끔)
+# 배열 본문을 이해하지 못하는 서버일 수도 있는 응답 -> 그 배치만 단건으로 보내 확인 (레코드 오류/일시 오류와 구분)
+BATCH_REJECT_STATUS = (400, 404, 405, 413, 415, 422)
+REPROBE_SECONDS = 600.0 # 끈 gzip/배치를 다시 시도할 때까지. 다시 실패할 때마다 두 배
+REPROBE_MAX_SECONDS = 6 * 3600.0
+
+UPLOAD_SECONDS = HTTP_SECONDS.labels("upload")
+
+# 단건 전송에서 이 코드만 '이 레코드가 잘못됨' 으로 보고 dead_letter 로 (나머지 4xx 는 토큰 만료 401/403,
+# 프록시의 404 등 레코드와 무관할 수 있으므로 큐에 남겨 두고 백오프)
+REJECTED_RECORD_STATUS = (400, 422)
+
+def is_retryable(status_code: int) -> bool:
+    return status_code not in REJECTED_RECORD_STATUS
+
+# ==============================================================================
+# 1. 서버 미지원 기능 (gzip, 배열 본문) 재확인
+# ==============================================================================
+class FeatureProbe:
+    # 미지원으로 확인되면 끄고, backoff 뒤 다시 켜서 확인 (프로세스가 살아 있는 동안 영구히 끄지 않음)
+    def __init__(self, name, base=REPROBE_SECONDS, maximum=REPROBE_MAX_SECONDS, clock=time.monotonic):
+        self.name = name
+        self.base = base
+        self.maximum = maximum
+        self.clock = clock
+        self.delay = base
+        self.until = None
+        self.disabled = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.until is None or self.clock() >= self.until
+
+    def disable(self):
+        self.until = self.clock() + self.delay
+        self.disabled += 1
+        logger.warning(f"서버가 {self.name} 을(를) 지원하지 않음, {self.delay:.0f}초 뒤 다시 확인")
+        self.delay = min(self.delay * 2, self.maximum)
+
+    def succeeded(self):
+        if self.until is not None:
+            logger.info(f"{self.name} 재확인 성공, 다시 사용")
+            self.until = None
+            self.delay = self.base
+
+# ==============================================================================
+# 2. 배치 업로더 (keep-alive Session + JSON 배열 + gzip)
+# ==============================================================================
+class BatchUploader:
+    def __init__(self, url, headers=None, compress=True, timeout=UPLOAD_TIMEOUT_SECONDS, session=None,
+                 reprobe_seconds=REPROBE_SECONDS):
+        self.url = url
+        self.headers = headers or {}
+        self._session = session
+        if session is not None:
+            session.headers.update(self.headers)
+        self.compress = compress
+        self.timeout = timeout
+        self.gzip = FeatureProbe("gzip 본문", reprobe_seconds)
+        self.batch = FeatureProbe("배치(JSON 배열) 본문", reprobe_seconds)
+        self.bytes_sent = 0
+        self.requests_sent = 0
+
+    @property
+    def session(self):
+        # requests 는 첫 전송 때 import
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.headers.update(self.headers)
+        return self._session
+
+    def _post(self, body, compress: bool):
+        data = json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if compress:
+            data = gzip.compress(data, compresslevel=6)
+            headers['Content-Encoding'] = 'gzip'
+        self.bytes_sent += len(data)
+        self.requests_sent += 1
+        t0 = time.perf_counter()
+        try:
+            response = self.session.post(self.url, data=data, headers=headers, timeout=self.timeout)
+        except Exception:
+            HTTP_REQUESTS.labels("upload", "error").inc()
+            raise
+        UPLOAD_SECONDS.observe(time.perf_counter() - t0)
+        HTTP_REQUESTS.labels("upload", response.status_code).inc()
+        return response
+
+    def _post_checked(self, body):
+        # gzip 이 415 로 거절되면 비압축으로 한 번 더. 비압축이 성공해야 gzip 을 끔 (통신 오류는 예외)
+        compress = self.compress and self.gzip.enabled
+        response = self._post(body, compress)
+        if not compress:
+            return response
+        if response.status_code == UNSUPPORTED_MEDIA_TYPE:
+            logger.warning("gzip 본문 거절(415), 비압축으로 재시도")
+            response = self._post(body, False)
+            if response.status_code in SUCCESS_STATUS:
+                self.gzip.disable()
+        elif response.status_code in SUCCESS_STATUS:
+            self.gzip.succeeded()
+        return response
+
+    def send(self, records: List[dict]) -> int:
+        # 앞에서부터 전송 완료된 레코드 수를 반환 (드레이너가 그만큼 ack)
+        if not records:
+            return 0
+        if len(records) > 1 and self.batch.enabled:
+            result = self._send_batch(records)
+            if result is not None:
+                return result
+            # 배치 본문 거절: 단건으로 모두 성공해야 서버가 배열을 지원하지 않는 것으로 판단
+            done = self._send_each(records)
+            if done == len(records):
+                self.batch.disable()
+            return done
+        return self._send_each(records)
+
+    def _send_each(self, records) -> int:
+        done = 0
+        for record in records:
+            try:
+                ok = self._send_single(record)
+            except RecordRejected as e:
+                raise RecordRejected(done, e.status, e.reason) from None
+            if not ok:
+                break
+            done += 1
+        return done
+
+    def _send_batch(self, records) -> Optional[int]:
+        # 전송 완료 수, 또는 None (배열 본문을 거절했을 수 있으므로 단건으로 확인)
+        try:
+            response = self._post_checked(records)
+        except Exception as e:
+            logger.error(f"배치 업로드 오류: {e}")
+            return 0
+        if response.status_code in SUCCESS_STATUS:
+            self.batch.succeeded()
+            logger.debug("배치 업로드 성공", extra={'fields': {'records': len(records)}})
+            return len(records)
+        if response.status_code in BATCH_REJECT_STATUS:
+            logger.warning(f"배치 본문 거절({response.status_code}), 이 배치는 단건으로 확인")
+            return None
+        logger.warning(f"배치 업로드 실패: {response.status_code}")
+        return 0
+
+    def _send_single(self, record) -> bool:
+        # True: 전송 완료, False: 나중에 재시도, 형식 오류 거절은 RecordRejected
+        try:
+            response = self._post_checked(record)
+        except Exception as e:
+            logger.error(f"데이터 업로드 오류: {e}")
+            return False
+        if response.status_code in SUCCESS_STATUS:
+            logger.debug("데이터 업로드 성공")
+            return True
+        if not is_retryable(response.status_code):
+            raise RecordRejected(0, response.status_code, _excerpt(response))
+        if response.status_code in (401, 403):
+            logger.error(f"업로드 인증 실패({response.status_code}): 토큰 확인 필요, 레코드는 큐에 보관")
+        else:
+            logger.warning(f"업로드 실패: {response.status_code}")
+        return False
+
+def _excerpt(response, limit=200) -> str:
+    # dead_letter 에 남길 서버 응답 일부
+    try:
+        return response.text[:limit]
+    except Exception:
+        return ""
+
+# ==============================================================================
+# 3. 로컬 모의 서버로 전송량 비교
+# ==============================================================================
+def measure(records_per_hour=360, batch_size=DEFAULT_BATCH_SIZE):
+    import threading
+    import requests
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    stats = {'requests': 0, 'bytes': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length)
+            stats['requests'] += 1
+            stats['bytes'] += len(str(self.headers)) + len(self.requestline) + 2 + len(body)
+            self.send_response(201)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/temperature"
+    record = {
+        "temperature_value": "3.25", "out_temperature_value": "3.1", "setting_temp_value": "3.0",
+        "current_value": "2.41", "refrigerator_id": 12, "raspi_ip": "192.168.0.10",
+        "raspi_serial": "10000000abcdef01", "compressor_state": "compressor",
+        "duty_cycle_1h": 0.412, "duty_cycle_24h": 0.398, "measured_at": "2025-01-01T00:00:00+0900",
+    }
+    records = [dict(record) for _ in range(records_per_hour)]
+
+    # 기존 방식: 레코드마다 새 연결로 requests.post
+    for r in records:
+        requests.post(url, json=r, headers={"Authorization": "JWT"}, timeout=10)
+    before = dict(stats)
+    stats.update(requests=0, bytes=0)
+
+    uploader = BatchUploader(url, headers={"Authorization": "JWT"})
+    for i in range(0, len(records), batch_size):
+        uploader.send(records[i:i + batch_size])
+    after = dict(stats)
+    server.shutdown()
+
+    print(f"기존 단건 전송: {before['requests']} 요청/시간, {before['bytes']} 바이트/시간")
+    print(f"배치({batch_size}건, gzip): {after['requests']} 요청/시간, {after['bytes']} 바이트/시간")
+
+if __name__ == "__main__":
+    measure()
@@ -0,0 +1,214 @@
+import csv
+import sys
+from typing import Optional, List, Dict, Tuple
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+STATE_OFF = "off"
+STATE_COMPRESSOR = "compressor"
+STATE_HEATER = "heater"
+
+# SCT-013 출력 전압(Vrms) 기준 임계값 -> CAL_FACTOR 를 곱해서 전류(A)로 환산
+COMPRESSOR_ON_VRMS = 0.02
+COMPRESSOR_OFF_VRMS = 0.01
+HEATER_ON_VRMS = 0.15
+HEATER_OFF_VRMS = 0.12
+# 압축기 기동 돌입 전류(정격의 수 배, 1초 미만)도 히터 임계값을 넘음 -> 이만큼 이어져야 히터로 판정
+HEATER_CONFIRM_SECONDS = 5.0
+
+MAX_SAMPLE_GAP_SECONDS = 120 # 이보다 긴 공백은 가동률 계산에서 제외
+DUTY_BUCKET_SECONDS = 60
+
+def thresholds_from_cal_factor(cal_factor: float) -> Dict[str, float]:
+    return {
+        'compressor_on': COMPRESSOR_ON_VRMS * cal_factor,
+        'compressor_off': COMPRESSOR_OFF_VRMS * cal_factor,
+        'heater_on': HEATER_ON_VRMS * cal_factor,
+        'heater_off': HEATER_OFF_VRMS * cal_factor,
+    }
+
+# ==============================================================================
+# 1. 이동 가동률 (고정 버킷 링, 샘플당 O(1))
+# ==============================================================================
+class RollingDuty:
+    def __init__(self, window_seconds: int, bucket_seconds: int = DUTY_BUCKET_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.size = max(1, window_seconds // bucket_seconds)
+        self._on = [0.0] * self.size
+        self._total = [0.0] * self.size
+        self._on_sum = 0.0
+        self._total_sum = 0.0
+        self._bucket = None  # 현재 버킷 번호 (절대값)
+
+    def _advance(self, bucket: int):
+        if self._bucket is None:
+            self._bucket = bucket
+            return
+        if bucket <= self._bucket:
+            return
+        # 창 밖으로 밀려나는 버킷들을 비움 (최대 size 개)
+        steps = min(bucket - self._bucket, self.size)
+        for b in range(self._bucket + 1, self._bucket + 1 + steps):
+            i = b % self.size
+            self._on_sum -= self._on[i]
+            self._total_sum -= self._total[i]
+            self._on[i] = 0.0
+            self._total[i] = 0.0
+        self._bucket = bucket
+
+    def add(self, timestamp: float, seconds: float, is_on: bool):
+        bucket = int(timestamp // self.bucket_seconds)
+        self._advance(bucket)
+        i = bucket % self.size
+        self._total[i] += seconds
+        self._total_sum += seconds
+        if is_on:
+            self._on[i] += seconds
+            self._on_sum += seconds
+
+    def value(self) -> Optional[float]:
+        if self._total_sum <= 0:
+            return None
+        return self._on_sum / self._total_sum
+
+# ==============================================================================
+# 2. 압축기/히터 상태 머신
+# ==============================================================================
+class CompressorMonitor:
+    def __init__(self, compressor_on, compressor_off, heater_on, heater_off,
+                 max_gap=MAX_SAMPLE_GAP_SECONDS, heater_confirm=HEATER_CONFIRM_SECONDS):
+        if not (compressor_off < compressor_on and heater_off < heater_on):
+            raise ValueError("히스테리시스 임계값은 off < on 이어야 합니다.")
+        self.compressor_on = compressor_on
+        self.compressor_off = compressor_off
+        self.heater_on = heater_on
+        self.heater_off = heater_off
+        self.max_gap = max_gap
+        self.heater_confirm = heater_confirm
+
+        self.state = None
+        self.state_since = None
+        self.last_time = None
+        self.last_durations = {STATE_OFF: None, STATE_COMPRESSOR: None, STATE_HEATER: None}
+        self.compressor_cycles = 0
+        self.duty_1h = RollingDuty(3600)
+        self.duty_24h = RollingDuty(86400)
+        self._heater_since = None # 히터 수준 전류가 처음 보인 시각 (확정 전)
+
+    @classmethod
+    def from_cal_factor(cls, cal_factor: float, **kwargs):
+        return cls(**thresholds_from_cal_factor(cal_factor), **kwargs)
+
+    def _next_state(self, timestamp: float, current: float) -> Tuple[Optional[str], float]:
+        # (다음 상태, 전환 시각). 히터 수준 전류가 처음 보인 시각부터 heater_confirm 초 이어져야 히터
+        state = self.state
+        if state == STATE_HEATER:
+            if current > self.heater_off:
+                return STATE_HEATER, timestamp
+            return (STATE_COMPRESSOR if current >= self.compressor_on else STATE_OFF), timestamp
+        if current >= self.heater_on:
+            if self._heater_since is None:
+                self._heater_since = timestamp
+            if timestamp - self._heater_since >= self.heater_confirm:
+                since, self._heater_since = self._heater_since, None
+                return STATE_HEATER, since
+            return state, timestamp # 돌입 전류일 수 있으므로 판정 보류
+        pending, self._heater_since = self._heater_since, None
+        if state == STATE_COMPRESSOR:
+            return (STATE_COMPRESSOR if current > self.compressor_off else STATE_OFF), timestamp
+        if current >= self.compressor_on:
+            # 돌입 전류 뒤 압축기 수준이면 기동 시각은 돌입 전류가 보인 시각
+            return STATE_COMPRESSOR, pending if pending is not None else timestamp
+        return STATE_OFF, timestamp
+
+    def update(self, timestamp: float, current: Optional[float]) -> List[dict]:
+        if current is None:
+            return []
+
+        # 직전 샘플부터 지금까지는 직전 상태였던 것으로 가동률에 반영
+        if self.last_time is not None:
+            dt = timestamp - self.last_time
+            if 0 < dt <= self.max_gap:
+                is_on = self.state == STATE_COMPRESSOR
+                self.duty_1h.add(timestamp, dt, is_on)
+                self.duty_24h.add(timestamp, dt, is_on)
+            else:
+                self._heater_since = None # 공백을 사이에 둔 두 측정으로 히터를 확정하지 않음
+        self.last_time = timestamp
+
+        new_state, since = self._next_state(timestamp, current)
+        if self.state is None:
+            self.state = new_state
+            self.state_since = since
+            return []
+        if new_state == self.state:
+            return []
+
+        events = []
+        duration = since - self.state_since
+        self.last_durations[self.state] = duration
+        if self.state == STATE_COMPRESSOR:
+            events.append(self._event("compressor_stop", since, current, duration))
+        elif self.state == STATE_HEATER:
+            events.append(self._event("heater_off", since, current, duration))
+        if new_state == STATE_COMPRESSOR:
+            self.compressor_cycles += 1
+            events.append(self._event("compressor_start", since, current, duration))
+        elif new_state == STATE_HEATER:
+            events.append(self._event("heater_on", since, current, duration))
+
+        self.state = new_state
+        self.state_since = since
+        return events
+
+    def _event(self, kind, timestamp, current, previous_duration):
+        return {
+            'event': kind,
+            'timestamp': timestamp,
+            'current': round(current, 2),
+            'previous_state': self.state,
+            'previous_duration': round(previous_duration, 1),
+        }
+
+    def stats(self) -> dict:
+        def _round(v):
+            return round(v, 3) if v is not None else None
+        return {
+            'compressor_state': self.state,
+            'duty_cycle_1h': _round(self.duty_1h.value()),
+            'duty_cycle_24h': _round(self.duty_24h.value()),
+            'last_on_seconds': self.last_durations[STATE_COMPRESSOR],
+            'last_off_seconds': self.last_durations[STATE_OFF],
+            'compressor_cycles': self.compressor_cycles,
+        }
+
+# ==============================================================================
+# 3. 기록된 전류 트레이스 재생
+# ==============================================================================
+def load_trace(path: str):
+    # CSV: timestamp,current (헤더 허용)
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith('#'):
+                continue
+            try:
+                yield float(row[0]), (float(row[1]) if row[1] not in ('', 'None') else None)
+            except ValueError:
+                continue
+
+def replay(trace, monitor: CompressorMonitor) -> List[dict]:
+    events = []
+    for timestamp, current in trace:
+        events.extend(monitor.update(timestamp, current))
+    return events
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("사용법: python compressor_monitor.py <trace.csv> [CAL_FACTOR]")
+        sys.exit(1)
+    cal_factor = float(sys.argv[2]) if len(sys.argv) > 2 else 30.0
+    monitor = CompressorMonitor.from_cal_factor(cal_factor)
+    for event in replay(load_trace(sys.argv[1]), monitor):
+        print(event)
+    print(monitor.stats())
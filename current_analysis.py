@@ -0,0 +1,128 @@
+import math
+from typing import NamedTuple, Optional
+import numpy as np
+
+# ==============================================================================
+# 0. 상수 (SCT-013-30A + ADS1115)
+# ==============================================================================
+# ADS1115 PGA 게인별 풀스케일 전압 (V)
+ADS1115_FULL_SCALE = {
+    2/3: 6.144,
+    1: 4.096,
+    2: 2.048,
+    4: 1.024,
+    8: 0.512,
+    16: 0.256,
+}
+BIT_RESOLUTION = 32768
+DEFAULT_GAIN = 1 # SCT-013 출력(최대 ±1.41V)이 잘리지 않는 게인
+CAL_FACTOR = 30.0 # SCT-013 1Vrms -> 30A
+DEFAULT_SAMPLE_RATE = 860
+
+# ==============================================================================
+# 1. 분석 결과
+# ==============================================================================
+class CurrentStats(NamedTuple):
+    rms: float # 전류 RMS (A)
+    peak: float # DC 제거 후 최대 절대값 (A)
+    crest_factor: Optional[float] # peak / rms
+    frequency: Optional[float] # 주요 주파수 (Hz)
+    dc_offset: float # 데이터에서 추정한 DC 오프셋 (V)
+    samples: int
+
+# ==============================================================================
+# 2. 블록 분석
+# ==============================================================================
+def to_array(raw) -> np.ndarray:
+    # array('h') 는 복사 없이 int16 로 감싸고, 그 외(list 등)는 변환
+    if isinstance(raw, np.ndarray):
+        return raw
+    try:
+        return np.frombuffer(raw, dtype=np.int16)
+    except (TypeError, ValueError):
+        return np.asarray(raw, dtype=np.float64)
+
+def dominant_frequency(ac: np.ndarray, sample_rate: float) -> Optional[float]:
+    n = ac.size
+    if n < 4:
+        return None
+    spectrum = np.abs(np.fft.rfft(ac))
+    spectrum[0] = 0.0
+    k = int(np.argmax(spectrum))
+    if spectrum[k] == 0.0:
+        return None
+    # 포물선 보간으로 빈 사이의 주파수를 추정
+    if 0 < k < spectrum.size - 1:
+        a, b, c = spectrum[k - 1], spectrum[k], spectrum[k + 1]
+        denom = a - 2 * b + c
+        if denom != 0:
+            k = k + 0.5 * (a - c) / denom
+    return float(k * sample_rate / n)
+
+def analyze_block(raw, gain=DEFAULT_GAIN, cal_factor=CAL_FACTOR,
+                  sample_rate=DEFAULT_SAMPLE_RATE, with_frequency=True) -> Optional[CurrentStats]:
+    x = to_array(raw)
+    n = x.size
+    if n == 0:
+        return None
+    volts_per_count = ADS1115_FULL_SCALE[gain] / BIT_RESOLUTION
+    amps_per_count = volts_per_count * cal_factor
+
+    # 고정 BIAS_VOLTAGE 대신 블록 평균으로 DC 오프셋을 추정해서 제거
+    x = x.astype(np.float64)
+    dc = x.mean()
+    ac = x - dc
+    rms_counts = math.sqrt(float(np.dot(ac, ac)) / n)
+    peak_counts = float(np.abs(ac).max())
+
+    rms = rms_counts * amps_per_count
+    peak = peak_counts * amps_per_count
+    crest = peak_counts / rms_counts if rms_counts > 0 else None
+    freq = dominant_frequency(ac, sample_rate) if with_frequency and rms_counts > 0 else None
+    return CurrentStats(
+        rms=rms,
+        peak=peak,
+        crest_factor=crest,
+        frequency=freq,
+        dc_offset=float(dc) * volts_per_count,
+        samples=n,
+    )
+
+# ==============================================================================
+# 3. 합성 파형 벤치마크
+# ==============================================================================
+def synthetic_block(n=1000, amps_rms=5.0, frequency=60.0, dc_volts=0.3, noise_amps=0.05,
+                    gain=DEFAULT_GAIN, cal_factor=CAL_FACTOR, sample_rate=DEFAULT_SAMPLE_RATE, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / sample_rate
+    amps = amps_rms * math.sqrt(2) * np.sin(2 * np.pi * frequency * t)
+    amps += rng.normal(0.0, noise_amps, n)
+    volts = amps / cal_factor + dc_volts
+    counts = np.round(volts / (ADS1115_FULL_SCALE[gain] / BIT_RESOLUTION))
+    return np.clip(counts, -32768, 32767).astype(np.int16)
+
+def benchmark(iterations=2000, n=1000):
+    import time
+    block = synthetic_block(n)
+    stats = analyze_block(block)
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        analyze_block(block)
+    per_block = (time.perf_counter() - t0) / iterations
+
+    scalar_block = block.tolist()
+    t0 = time.perf_counter()
+    for _ in range(max(1, iterations // 20)):
+        acc = 0.0
+        for raw_value in scalar_block:
+            voltage = (raw_value / BIT_RESOLUTION) * ADS1115_FULL_SCALE[DEFAULT_GAIN]
+            acc += voltage ** 2
+        math.sqrt(acc / n)
+    scalar_per_block = (time.perf_counter() - t0) / max(1, iterations // 20)
+
+    print(f"합성 파형 ({n} 샘플, 5.00 A RMS, 60 Hz): {stats}")
+    print(f"NumPy 분석: {per_block * 1e6:.1f} us/블록")
+    print(f"기존 스칼라 루프(RMS만): {scalar_per_block * 1e6:.1f} us/블록")
+
+if __name__ == "__main__":
+    benchmark()
@@ -54,11 +54,20 @@ CHROME_OPTIONS="
 "
 
 # URL 구성 (env 값 사용)
+# 이 Pi 의 냉장고는 에이전트의 로컬 API 페이지 (NAS 를 거치지 않고, 인터넷이 끊겨도 표시)
+LOCAL_URL="${LOCAL_KIOSK_URL:-http://127.0.0.1:8080/}"
 BASE_URL="https://bistech-db.synology.me/kiosk"
 
-URL1="$BASE_URL/$CHECK_VALUE/$REFRIGERATOR_NUMBER"
+URL1="$LOCAL_URL"
+# 두 번째 냉장고 데이터는 다른 장치에서 오므로 기존 NAS 페이지 유지
 URL2="$BASE_URL/$CHECK_VALUE/${REFRIGERATOR_NUMBER%-1}-2"
 
+# 에이전트가 아직 안 떴으면 로컬 API 가 열릴 때까지 잠시 대기
+for _ in $(seq 1 30); do
+  curl -s -o /dev/null "$LOCAL_URL" && break
+  sleep 1
+done
+
 # 디버깅 로그 (문제 생기면 확인용)
 echo "▶ REFRIGERATOR_NUMBER = $REFRIGERATOR_NUMBER"
 echo "▶ URL1 = $URL1"
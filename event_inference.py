@@ -0,0 +1,258 @@
+import time
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+EWMA_ALPHA = 0.5 # 온도 변화율 평활 계수 (변화율 창마다)
+RATE_WINDOW_SECONDS = 30.0 # 변화율은 이 이상 떨어진 두 측정값으로 (짧은 주기에서 0.0625°C 양자화 한 단계가 문 열림으로 보이지 않도록)
+DOOR_RATE_PER_MINUTE = 0.5 # 제상이 아닌데 이보다 빠르게 오르면 문 열림 시작
+RECOVERY_MARGIN = 0.5 # 시작 온도 + 이 값 이하로 돌아오면 에피소드 종료
+DOOR_MAX_SECONDS = 1800 # 이보다 오래 회복되지 않는 문 열림은 종료 처리 (냉각 고장 판단으로 넘김)
+DEFROST_RECOVERY_SECONDS = 1800 # 히터가 꺼진 뒤 회복을 기다리는 최대 시간
+DEFROST_OVERRUN_RATIO = 1.2 # 히터 시간이 API defrost_time 보다 이 배율 넘게 길면 overrun
+FAILURE_SECONDS = 2700 # 압축기가 이만큼 돌아도 안 내려가거나, 대역 위에 이만큼 머물면 냉각 고장
+FAILURE_MIN_DROP = 0.5 # 압축기 가동 중 이만큼(°C)은 내려가야 냉각으로 봄
+MAX_GAP_SECONDS = 600
+
+STATE_COMPRESSOR = "compressor"
+STATE_HEATER = "heater"
+
+EVENT_DOOR_OPEN = "door_open"
+EVENT_DEFROST = "defrost"
+EVENT_COOLING_FAILURE = "cooling_failure"
+
+# ==============================================================================
+# 1. 진행 중인 에피소드 (종류별 최대 1개 -> 메모리 고정)
+# ==============================================================================
+class Episode:
+    __slots__ = ('kind', 'start', 'start_temperature', 'peak', 'peak_at', 'detail')
+
+    def __init__(self, kind: str, start: float, start_temperature: Optional[float], detail=None):
+        self.kind = kind
+        self.start = start
+        self.start_temperature = start_temperature
+        self.peak = start_temperature
+        self.peak_at = start
+        self.detail = detail or {}
+
+    def observe(self, ts: float, temperature: float):
+        if self.peak is None or temperature > self.peak:
+            self.peak = temperature
+            self.peak_at = ts
+
+    def record(self, end: float, end_temperature: Optional[float], **extra) -> dict:
+        record = {
+            'event': self.kind,
+            'start': round(self.start, 1),
+            'end': round(end, 1),
+            'duration': round(end - self.start, 1),
+            'start_temperature': self.start_temperature,
+            'peak_temperature': self.peak,
+            'peak_at': round(self.peak_at, 1),
+            'end_temperature': end_temperature,
+        }
+        record.update(self.detail)
+        record.update(extra)
+        return record
+
+# ==============================================================================
+# 2. 온도 + 압축기 상태로 문 열림 / 제상 / 냉각 고장 추론
+# ==============================================================================
+class EventInference:
+    # update() 는 내부 온도 측정마다 호출 (압축기 상태는 CompressorMonitor 의 현재 상태), 끝난 에피소드만 반환
+    def __init__(self, alpha=EWMA_ALPHA, door_rate=DOOR_RATE_PER_MINUTE, recovery_margin=RECOVERY_MARGIN,
+                 door_max_seconds=DOOR_MAX_SECONDS, defrost_recovery_seconds=DEFROST_RECOVERY_SECONDS,
+                 failure_seconds=FAILURE_SECONDS, failure_min_drop=FAILURE_MIN_DROP, max_gap=MAX_GAP_SECONDS,
+                 rate_window=RATE_WINDOW_SECONDS):
+        self.alpha = alpha
+        self.door_rate = door_rate
+        self.recovery_margin = recovery_margin
+        self.door_max_seconds = door_max_seconds
+        self.defrost_recovery_seconds = defrost_recovery_seconds
+        self.failure_seconds = failure_seconds
+        self.failure_min_drop = failure_min_drop
+        self.max_gap = max_gap
+        self.rate_window = rate_window
+        self.band_high: Optional[float] = None
+        self.defrost_seconds: Optional[float] = None
+        self.episodes: Dict[str, Episode] = {}
+        self.rate = 0.0
+        self.quiet_temperature = None # 에피소드 밖에서 변화가 작을 때의 온도 (시작 온도 기준)
+        self._last_ts = None
+        self._anchor_ts = None # 변화율 창 시작 (시각, 온도)
+        self._anchor_temperature = None
+        self._state = None
+        self._heater_off_at = None
+        self._run_start = None # 압축기 연속 가동 시작 (시각, 온도)
+        self._above_since = None
+        self.updates = 0
+
+    def set_reference(self, setting_temp, temp_gap, defrost_minutes=None):
+        try:
+            self.band_high = float(setting_temp) + abs(float(temp_gap))
+        except (TypeError, ValueError):
+            self.band_high = None
+        try:
+            self.defrost_seconds = float(defrost_minutes) * 60.0
+        except (TypeError, ValueError):
+            self.defrost_seconds = None
+
+    def _open(self, kind, ts, **detail) -> Episode:
+        episode = self.episodes[kind] = Episode(kind, ts, self.quiet_temperature, detail)
+        logger.info(f"에피소드 시작: {kind} ({detail or ''})")
+        return episode
+
+    def _close(self, kind, ts, temperature, **extra) -> dict:
+        return self.episodes.pop(kind).record(ts, temperature, **extra)
+
+    def _recovered(self, episode: Episode, temperature: float) -> bool:
+        reference = episode.start_temperature if episode.start_temperature is not None else self.band_high
+        return reference is not None and temperature <= reference + self.recovery_margin
+
+    def update(self, ts: float, temperature: Optional[float], state: Optional[str],
+               state_since: Optional[float] = None) -> List[dict]:
+        self.updates += 1
+        events = []
+        previous_state, self._state = self._state, state
+
+        # 압축기/히터 상태 전환 (히터 시작 시각은 전류 기준 state_since 가 더 정확)
+        if state == STATE_HEATER and previous_state != STATE_HEATER and EVENT_DEFROST not in self.episodes:
+            if EVENT_DOOR_OPEN in self.episodes:
+                # 제상 직전 상승을 문 열림으로 잡았으면 버림
+                self.episodes.pop(EVENT_DOOR_OPEN)
+            self._open(EVENT_DEFROST, state_since or ts)
+            self._heater_off_at = None
+        if previous_state == STATE_HEATER and state != STATE_HEATER and EVENT_DEFROST in self.episodes:
+            self._heater_off_at = state_since or ts
+        if state == STATE_COMPRESSOR and previous_state != STATE_COMPRESSOR:
+            self._run_start = (state_since or ts, temperature)
+        elif state != STATE_COMPRESSOR:
+            self._run_start = None
+
+        if temperature is None:
+            return events
+
+        # 변화율은 샘플 주기와 관계없이 rate_window 이상 간격으로 (적응형 샘플링으로 주기가 짧아져도 같은 기준)
+        dt = ts - self._last_ts if self._last_ts is not None else None
+        if dt is None or not 0 < dt <= self.max_gap:
+            self.rate = 0.0
+            self._anchor_ts, self._anchor_temperature = ts, temperature
+        window_start = None
+        span = ts - self._anchor_ts
+        if span >= self.rate_window:
+            rate = (temperature - self._anchor_temperature) * 60.0 / span
+            self.rate += self.alpha * (rate - self.rate)
+            window_start = self._anchor_ts
+            self._anchor_ts, self._anchor_temperature = ts, temperature
+        self._last_ts = ts
+        if self._run_start is not None and self._run_start[1] is None:
+            self._run_start = (self._run_start[0], temperature)
+
+        for episode in self.episodes.values():
+            episode.observe(ts, temperature)
+
+        # 제상: 히터가 꺼지고 온도가 제상 전 수준으로 돌아오면 끝
+        defrost = self.episodes.get(EVENT_DEFROST)
+        if defrost is not None and self._heater_off_at is not None:
+            timed_out = ts - self._heater_off_at >= self.defrost_recovery_seconds
+            if self._recovered(defrost, temperature) or timed_out:
+                heater_seconds = self._heater_off_at - defrost.start
+                extra = {'heater_seconds': round(heater_seconds, 1), 'recovery_timeout': timed_out}
+                if self.defrost_seconds:
+                    extra['expected_heater_seconds'] = self.defrost_seconds
+                    extra['overrun'] = heater_seconds > self.defrost_seconds * DEFROST_OVERRUN_RATIO
+                events.append(self._close(EVENT_DEFROST, ts, temperature, **extra))
+                self._heater_off_at = None
+
+        # 문 열림: 제상이 아닌데 빠르게 상승 -> 시작 온도 근처로 회복되면 끝
+        if EVENT_DEFROST not in self.episodes:
+            door = self.episodes.get(EVENT_DOOR_OPEN)
+            if door is None and self.rate >= self.door_rate:
+                door = self._open(EVENT_DOOR_OPEN, window_start if window_start is not None else ts)
+                door.observe(ts, temperature)
+            elif door is not None:
+                if self._recovered(door, temperature):
+                    events.append(self._close(EVENT_DOOR_OPEN, ts, temperature, recovery_timeout=False))
+                elif ts - door.start >= self.door_max_seconds:
+                    events.append(self._close(EVENT_DOOR_OPEN, ts, temperature, recovery_timeout=True))
+
+        # 냉각 고장: 압축기가 오래 돌아도 안 내려가거나, 대역 위에 오래 머묾 (제상/문 열림 중 제외)
+        if self.band_high is not None and temperature > self.band_high and not self.episodes.keys() & {EVENT_DEFROST, EVENT_DOOR_OPEN}:
+            if self._above_since is None:
+                self._above_since = ts
+        else:
+            self._above_since = None
+        failure = self.episodes.get(EVENT_COOLING_FAILURE)
+        if failure is None:
+            reason = None
+            if (self._run_start is not None and self._run_start[1] is not None
+                    and ts - self._run_start[0] >= self.failure_seconds
+                    and temperature > self._run_start[1] - self.failure_min_drop):
+                reason = 'no_cooling_while_running'
+            elif self._above_since is not None and ts - self._above_since >= self.failure_seconds:
+                reason = 'compressor_idle' if state != STATE_COMPRESSOR else 'above_band'
+            if reason is not None:
+                since = self._run_start[0] if reason == 'no_cooling_while_running' else self._above_since
+                failure = self._open(EVENT_COOLING_FAILURE, since, reason=reason)
+                failure.observe(ts, temperature)
+        elif self.band_high is not None and temperature <= self.band_high:
+            events.append(self._close(EVENT_COOLING_FAILURE, ts, temperature))
+
+        if not self.episodes and window_start is not None and abs(self.rate) < self.door_rate / 2:
+            # 창 끝에서만 (창 안에서는 변화율이 아직 갱신 전이라 상승 중인 온도를 조용한 온도로 잡음)
+            self.quiet_temperature = temperature
+        return events
+
+    def active(self) -> List[dict]:
+        return [{'event': e.kind, 'start': e.start, 'peak_temperature': e.peak} for e in self.episodes.values()]
+
+# ==============================================================================
+# 3. 합성 하루 재생
+# ==============================================================================
+def synthetic_day(period=10.0, setpoint=3.0, gap=2.0):
+    # 압축기 on/off 사이클 + 08:00 문 열림 + 06:00/18:00 제상 + 21:00 이후 냉각 고장
+    t, temp, state = 0.0, setpoint + 1.0, 'off'
+    samples = []
+    while t < 86400:
+        hour = t / 3600
+        heater = any(h <= hour < h + 1 / 3 for h in (6, 18))
+        failed = hour >= 21
+        if heater:
+            state = STATE_HEATER
+            temp += 0.006 * period
+        else:
+            if state == STATE_HEATER:
+                state = STATE_COMPRESSOR
+            if temp >= setpoint + gap:
+                state = STATE_COMPRESSOR
+            elif temp <= setpoint:
+                state = 'off'
+            temp += (0.0005 if failed else -0.0015) * period if state == STATE_COMPRESSOR else 0.0008 * period
+        if 8.0 <= hour < 8.0 + 90 / 3600:
+            temp += 0.05 * period # 90초 동안 문 열림
+        samples.append((t, round(temp * 16) / 16, state))
+        t += period
+    return samples
+
+def benchmark():
+    inference = EventInference()
+    inference.set_reference(3.0, 2.0, defrost_minutes=20)
+    samples = synthetic_day()
+    events = []
+    t0 = time.perf_counter()
+    for ts, temperature, state in samples:
+        events.extend(inference.update(ts, temperature, state))
+    elapsed = time.perf_counter() - t0
+    print(f"{len(samples)}개 측정값, 측정값당 {elapsed / len(samples) * 1e6:.1f} µs, 이벤트 {len(events)}건")
+    for e in events:
+        print(f"  {e['event']:<16} {e['start'] / 3600:5.2f}h ~ {e['end'] / 3600:5.2f}h "
+              f"시작 {e['start_temperature']} / 최고 {e['peak_temperature']} / 종료 {e['end_temperature']}")
+    for e in inference.active():
+        print(f"  {e['event']:<16} {e['start'] / 3600:5.2f}h ~ (진행 중) 최고 {e['peak_temperature']}")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,195 @@
+import logging
+from typing import NamedTuple, Dict, List, Optional, Iterable, Tuple
+
+from modbus import (
+    build_read_request, build_write_single, build_write_multiple, parse_response, transact,
+    to_signed, ModbusError, GAP_FLOOR_SECONDS, READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS,
+    WRITE_SINGLE_REGISTER, WRITE_MULTIPLE_REGISTERS, MAX_READ_REGISTERS, MAX_WRITE_REGISTERS,
+)
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. FOX-MR20 레지스터 맵
+# ==============================================================================
+HOLDING = "holding"
+INPUT = "input"
+ILLEGAL_DATA_ADDRESS = 0x02
+MAX_READ_GAP = 16 # 이 정도 빈 주소는 같이 읽어서 트랜잭션 수를 줄임
+
+class Register(NamedTuple):
+    name: str
+    address: int
+    table: str # HOLDING(0x03/0x06/0x10) 또는 INPUT(0x04)
+    scale: float = 1.0 # 실제값 = raw * scale
+    signed: bool = False
+    unit: str = ""
+    writable: bool = False
+
+    def decode(self, raw: int):
+        value = to_signed(raw) if self.signed else raw
+        if self.scale == 1:
+            return value
+        return round(value * self.scale, 2)
+
+    def encode(self, value) -> int:
+        raw = int(round(float(value) / self.scale))
+        low, high = (-0x8000, 0x7FFF) if self.signed else (0, 0xFFFF)
+        if not low <= raw <= high:
+            raise ValueError(f"{self.name} 값 범위 초과: {value}")
+        return raw & 0xFFFF
+
+REGISTER_MAP: Dict[str, Register] = {r.name: r for r in [
+    Register('temp_set', 0x0002, HOLDING, scale=0.1, signed=True, unit='°C', writable=True),
+    Register('temp_gap', 0x0004, HOLDING, unit='°C', writable=True),
+    Register('heat_time', 0x0012, HOLDING, unit='min', writable=True),
+    Register('probe_temp', 0x0064, INPUT, scale=0.1, signed=True, unit='°C'),
+]}
+
+# ==============================================================================
+# 1. 블록 읽기 계획 (인접 레지스터 병합)
+# ==============================================================================
+class Block(NamedTuple):
+    table: str
+    start: int
+    count: int
+    registers: tuple
+
+    @property
+    def function_code(self):
+        return READ_HOLDING_REGISTERS if self.table == HOLDING else READ_INPUT_REGISTERS
+
+def plan_reads(registers: Iterable[Register], max_gap=MAX_READ_GAP) -> List[Block]:
+    blocks = []
+    for table in (HOLDING, INPUT):
+        regs = sorted((r for r in registers if r.table == table), key=lambda r: r.address)
+        group = []
+        for reg in regs:
+            if group and (reg.address - group[-1].address - 1 > max_gap
+                          or reg.address - group[0].address + 1 > MAX_READ_REGISTERS):
+                blocks.append(_block(table, group))
+                group = []
+            group.append(reg)
+        if group:
+            blocks.append(_block(table, group))
+    return blocks
+
+def _block(table, group) -> Block:
+    start = group[0].address
+    return Block(table, start, group[-1].address - start + 1, tuple(group))
+
+def plan_writes(raw_values: Dict[int, int], known_raw: Dict[int, int]) -> List[tuple]:
+    # 연속 주소끼리 묶어서 (시작 주소, [raw...]) 목록으로. 사이의 빈 주소가 모두 맵에 있는
+    # 쓰기 가능 레지스터이고 현재값을 알면 그 값으로 채워서 한 번의 0x10 으로 보냄
+    writable = {r.address for r in REGISTER_MAP.values() if r.writable and r.table == HOLDING}
+    runs = []
+    for address in sorted(raw_values):
+        if runs:
+            start, values = runs[-1]
+            next_address = start + len(values)
+            fill = range(next_address, address)
+            if (len(values) + len(fill) + 1 <= MAX_WRITE_REGISTERS
+                    and all(a in writable and a in known_raw for a in fill)):
+                values.extend(known_raw[a] for a in fill)
+                values.append(raw_values[address])
+                continue
+        runs.append((address, [raw_values[address]]))
+    return runs
+
+# ==============================================================================
+# 2. 폴러
+# ==============================================================================
+class RegisterPoller:
+    def __init__(self, slave_id=1, names: Optional[Iterable[str]] = None, max_gap=MAX_READ_GAP,
+                 gap_floor=GAP_FLOOR_SECONDS):
+        self.slave_id = slave_id
+        self.gap_floor = gap_floor # 응답 프레임 끝 판정 하한 (modbus.read_frame)
+        registers = [REGISTER_MAP[n] for n in (names or REGISTER_MAP)]
+        self.blocks = plan_reads(registers, max_gap)
+        self.raw: Dict[tuple, int] = {} # (table, address) -> 마지막으로 읽은 raw 값
+        self.transactions = 0
+        self.unsupported: List[str] = [] # 단독으로 읽어도 거절(0x02)되어 폴링에서 뺀 레지스터
+
+    def _read_block(self, ser, block: Block) -> List[int]:
+        request = build_read_request(self.slave_id, block.function_code, block.start, block.count)
+        self.transactions += 1
+        return parse_response(transact(ser, request, gap_floor=self.gap_floor), self.slave_id, block.function_code)
+
+    def read(self, ser, table: Optional[str] = None) -> Dict[str, object]:
+        # table 을 주면 그 테이블(HOLDING/INPUT) 블록만 읽음
+        values = {}
+        for block in list(self.blocks):
+            if table is not None and block.table != table:
+                continue
+            try:
+                raw_values = self._read_block(ser, block)
+            except ModbusError as e:
+                if e.exception_code != ILLEGAL_DATA_ADDRESS:
+                    raise
+                # 빈 주소를 읽을 수 없는 장치 -> 이 블록은 앞으로 나눠서 읽음
+                logger.warning(f"RS485 블록 읽기 거절(0x{block.start:04X}, {block.count}개), 나눠서 읽기로 전환")
+                block_values, blocks = self._read_split(ser, block)
+                i = self.blocks.index(block)
+                self.blocks[i:i + 1] = blocks
+                values.update(block_values)
+                continue
+            values.update(self._decode(block, raw_values))
+        return values
+
+    def _read_split(self, ser, block: Block) -> Tuple[dict, List[Block]]:
+        # 연속 구간별로, 이미 연속 구간이면 레지스터 하나씩. (읽은 값, 앞으로 쓸 블록 목록)
+        if len(block.registers) == 1:
+            register = block.registers[0]
+            logger.error(f"RS485 레지스터 {register.name}(0x{register.address:04X}) 읽기 거절, 폴링에서 제외")
+            self.unsupported.append(register.name)
+            return {}, []
+        split = plan_reads(block.registers, max_gap=0)
+        if len(split) == 1:
+            split = [_block(block.table, [r]) for r in block.registers]
+        values, blocks = {}, []
+        for sub in split:
+            try:
+                raw_values = self._read_block(ser, sub)
+            except ModbusError as e:
+                if e.exception_code != ILLEGAL_DATA_ADDRESS:
+                    raise
+                sub_values, sub_blocks = self._read_split(ser, sub)
+                values.update(sub_values)
+                blocks.extend(sub_blocks)
+                continue
+            values.update(self._decode(sub, raw_values))
+            blocks.append(sub)
+        return values, blocks
+
+    def _decode(self, block: Block, raw_values: List[int]) -> dict:
+        for offset, raw in enumerate(raw_values):
+            self.raw[(block.table, block.start + offset)] = raw
+        return {r.name: r.decode(raw_values[r.address - block.start]) for r in block.registers}
+
+    def write(self, ser, settings: Dict[str, object]) -> bool:
+        # settings: {레지스터 이름: 실제값}. 연속 구간은 0x10 한 번, 단독 레지스터는 0x06
+        raw_values = {}
+        for name, value in settings.items():
+            reg = REGISTER_MAP[name]
+            if not reg.writable:
+                raise ValueError(f"쓰기 불가 레지스터: {name}")
+            raw_values[reg.address] = reg.encode(value)
+        known = {a: v for (t, a), v in self.raw.items() if t == HOLDING}
+        ok = True
+        for start, values in plan_writes(raw_values, known):
+            if len(values) == 1:
+                request = build_write_single(self.slave_id, start, values[0])
+                function_code = WRITE_SINGLE_REGISTER
+            else:
+                request = build_write_multiple(self.slave_id, start, values)
+                function_code = WRITE_MULTIPLE_REGISTERS
+            self.transactions += 1
+            try:
+                parse_response(transact(ser, request, gap_floor=self.gap_floor), self.slave_id, function_code)
+            except ModbusError as e:
+                logger.error(f"RS485 설정 쓰기 실패 (0x{start:04X}, {len(values)}개): {e}")
+                ok = False
+                continue
+            for offset, raw in enumerate(values):
+                self.raw[(HOLDING, start + offset)] = raw
+        return ok
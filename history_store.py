@@ -0,0 +1,219 @@
+import os
+import sys
+import time
+import struct
+import logging
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수 / 레코드 형식
+# ==============================================================================
+HISTORY_DIR = "history"
+RETENTION_DAYS = 30
+FLUSH_EVERY_RECORDS = 6 # 10초 주기면 1분에 한 번 SD 카드에 씀
+SEGMENT_SUFFIX = ".bin"
+
+# 세그먼트 파일 = 16바이트 헤더 + 고정 길이 레코드 배열 (리틀 엔디안, 값 없으면 NaN)
+MAGIC = b'RFHS'
+FORMAT_VERSION = 1
+CHANNELS = ('ds18b20', 'rs485', 'current', 'setpoint')
+RECORD_DTYPE = np.dtype([('timestamp', '<f8')] + [(name, '<f4') for name in CHANNELS])
+HEADER = struct.Struct('<4sHHH6x') # magic, version, record_size, channel 수
+HEADER_SIZE = HEADER.size
+_RECORD = struct.Struct('<d' + 'f' * len(CHANNELS))
+
+def segment_name(timestamp: float) -> str:
+    # 하루 단위 세그먼트 (UTC 날짜)
+    return time.strftime('%Y%m%d', time.gmtime(timestamp)) + SEGMENT_SUFFIX
+
+def _value(v) -> float:
+    if v is None:
+        return float('nan')
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return float('nan')
+
+# ==============================================================================
+# 1. 기록 (버퍼링된 append)
+# ==============================================================================
+class HistoryStore:
+    def __init__(self, directory=HISTORY_DIR, retention_days=RETENTION_DAYS,
+                 flush_every=FLUSH_EVERY_RECORDS):
+        self.directory = directory
+        self.retention_days = retention_days
+        self.flush_every = flush_every
+        self._file = None
+        self._segment = None
+        self._pending = 0
+        self.records_written = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_segment(self, name: str):
+        self.close()
+        path = os.path.join(self.directory, name)
+        fresh = not os.path.exists(path) or os.path.getsize(path) < HEADER_SIZE
+        if not fresh:
+            # 전원 차단으로 잘린 마지막 레코드는 버림
+            size = os.path.getsize(path)
+            whole = HEADER_SIZE + (size - HEADER_SIZE) // RECORD_DTYPE.itemsize * RECORD_DTYPE.itemsize
+            if whole != size:
+                logger.warning(f"히스토리 세그먼트 끝의 불완전한 레코드 제거: {name}")
+                with open(path, 'r+b') as f:
+                    f.truncate(whole)
+        self._file = open(path, 'wb' if fresh else 'ab')
+        if fresh:
+            self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD_DTYPE.itemsize, len(CHANNELS)))
+        self._segment = name
+        self.enforce_retention()
+
+    def append(self, timestamp: float, **values):
+        # values: CHANNELS 중 일부 (문자열/None 허용)
+        name = segment_name(timestamp)
+        if name != self._segment:
+            self._open_segment(name)
+        self._file.write(_RECORD.pack(timestamp, *(_value(values.get(c)) for c in CHANNELS)))
+        self.records_written += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._file is not None and self._pending:
+            self._file.flush()
+            self._pending = 0
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+            self._segment = None
+
+    def enforce_retention(self):
+        cutoff = segment_name(time.time() - self.retention_days * 86400)
+        for name in self.segment_names():
+            if name < cutoff and name != self._segment:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    logger.info(f"보존 기간 지난 히스토리 세그먼트 삭제: {name}")
+                except OSError as e:
+                    logger.error(f"히스토리 세그먼트 삭제 오류 ({name}): {e}")
+
+    def segment_names(self) -> List[str]:
+        try:
+            entries = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(e for e in entries if e.endswith(SEGMENT_SUFFIX) and len(e) == 8 + len(SEGMENT_SUFFIX))
+
+    # ==========================================================================
+    # 2. 조회 (텍스트 파싱 없이 mmap 뷰)
+    # ==========================================================================
+    def open_segment(self, name: str) -> Optional[np.ndarray]:
+        # 세그먼트 전체를 읽기 전용 memmap 으로. 기록 중인 세그먼트는 flush 된 부분까지 보임
+        if name == self._segment:
+            self.flush()
+        path = os.path.join(self.directory, name)
+        try:
+            size = os.path.getsize(path)
+            with open(path, 'rb') as f:
+                magic, version, record_size, channels = HEADER.unpack(f.read(HEADER_SIZE))
+        except (OSError, struct.error):
+            return None
+        if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD_DTYPE.itemsize:
+            logger.warning(f"히스토리 세그먼트 형식 불일치: {name}")
+            return None
+        count = (size - HEADER_SIZE) // record_size
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+
+    def segments(self, start: float, end: float) -> Iterator[np.ndarray]:
+        # [start, end) 범위를 세그먼트별 복사 없는 슬라이스로 (세그먼트 안의 timestamp 는 증가 순)
+        first, last = segment_name(start), segment_name(end)
+        for name in self.segment_names():
+            if name < first or name > last:
+                continue
+            records = self.open_segment(name)
+            if records is None or not len(records):
+                continue
+            timestamps = records['timestamp']
+            lo = np.searchsorted(timestamps, start, side='left')
+            hi = np.searchsorted(timestamps, end, side='left')
+            if hi > lo:
+                yield records[lo:hi]
+
+    def query(self, start: float, end: float, channel: Optional[str] = None) -> np.ndarray:
+        # 여러 날에 걸치면 하나로 합침 (이때만 복사). channel 을 주면 (timestamp, 값) 두 열만
+        parts = list(self.segments(start, end))
+        if not parts:
+            result = np.empty(0, dtype=RECORD_DTYPE)
+        elif len(parts) == 1:
+            result = parts[0]
+        else:
+            result = np.concatenate(parts)
+        if channel is not None:
+            return result[['timestamp', channel]]
+        return result
+
+    def latest(self) -> Optional[dict]:
+        for name in reversed(self.segment_names()):
+            records = self.open_segment(name)
+            if records is not None and len(records):
+                last = records[-1]
+                return {field: (None if field != 'timestamp' and np.isnan(last[field]) else float(last[field]))
+                        for field in RECORD_DTYPE.names}
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ==============================================================================
+# 3. 측정 (10초 기록 비용, 1주일 조회 비용)
+# ==============================================================================
+def benchmark(directory, days=7, period=10):
+    store = HistoryStore(directory, retention_days=days + 1)
+    now = time.time()
+    start = now - days * 86400
+    t0 = time.perf_counter()
+    n = 0
+    ts = start
+    while ts < now:
+        store.append(ts, ds18b20=3.0, rs485=3.4, current=2.1, setpoint=3.0)
+        ts += period
+        n += 1
+    elapsed = time.perf_counter() - t0
+    store.flush()
+    print(f"기록: {n}건, 건당 {elapsed / n * 1e6:.2f} us, {RECORD_DTYPE.itemsize} 바이트/건")
+    t0 = time.perf_counter()
+    parts = list(store.segments(start, now))
+    rows = sum(len(p) for p in parts)
+    mean = sum(float(np.nanmean(p['ds18b20'])) * len(p) for p in parts) / rows
+    print(f"1주일 조회(세그먼트 뷰 {len(parts)}개, {rows}건, 평균 {mean:.2f}°C): "
+          f"{(time.perf_counter() - t0) * 1e3:.2f} ms")
+    store.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            benchmark(tmp)
+    else:
+        hours = float(sys.argv[1]) if len(sys.argv) > 1 else 24
+        with HistoryStore() as store:
+            now = time.time()
+            records = store.query(now - hours * 3600, now)
+            print(f"최근 {hours:g}시간: {len(records)}건")
+            for channel in CHANNELS:
+                values = records[channel]
+                if len(values) and not np.all(np.isnan(values)):
+                    print(f"  {channel}: min {np.nanmin(values):.2f}, max {np.nanmax(values):.2f}, "
+                          f"mean {np.nanmean(values):.2f}")
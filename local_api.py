@@ -0,0 +1,344 @@
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import logging
+import mimetypes
+from typing import Dict, Optional, Set
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+LOCAL_API_HOST = "127.0.0.1"
+LOCAL_API_PORT = 8080
+KIOSK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kiosk")
+MAX_HEADER_BYTES = 8192
+CLIENT_QUEUE_SIZE = 64 # 느린 SSE 클라이언트는 오래된 이벤트부터 버림
+SSE_KEEPALIVE_SECONDS = 15
+HISTORY_MAX_POINTS = 2000
+HISTORY_MAX_HOURS = 24 * 7
+
+STATUS_TEXT = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 431: "Request Header Fields Too Large", 503: "Service Unavailable"}
+
+def _json(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, default=str, allow_nan=False).encode('utf-8')
+
+def _clean(value):
+    # NaN/inf 는 JSON 으로 못 보내므로 None
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+# ==============================================================================
+# 1. 로컬 HTTP 서버 (asyncio 단일 프로세스, 의존성 없음)
+# ==============================================================================
+class LocalApiServer:
+    # latest: agent_runtime.LatestValues, history: history_store.HistoryStore (없어도 됨)
+    def __init__(self, latest=None, history=None, host=LOCAL_API_HOST, port=LOCAL_API_PORT,
+                 static_dir=KIOSK_DIR):
+        self.latest = latest
+        self.history = history
+        self.host = host
+        self.port = port
+        self.static_dir = static_dir
+        self.record: Optional[dict] = None # 마지막 업로드 레코드 (키오스크 표시용)
+        self._clients: Set[asyncio.Queue] = set()
+        self._server = None
+        self._event_id = 0
+        self.requests = 0
+        self.events_sent = 0
+        self.events_dropped = 0
+        if latest is not None:
+            latest.subscribe(self._on_publish)
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        sockets = self._server.sockets or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        logger.info(f"로컬 API 시작: http://{self.host}:{self.port}/")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for q in list(self._clients):
+            self._offer(q, None)
+
+    @property
+    def clients(self) -> int:
+        return len(self._clients)
+
+    # --------------------------------------------------------------------------
+    # 푸시 (센서 태스크가 값을 갱신하는 즉시 SSE 로)
+    # --------------------------------------------------------------------------
+    def _on_publish(self, channel: str, entry: dict):
+        self.push('sample', {'channel': channel, 'value': entry['value'], 'timestamp': entry['timestamp']})
+
+    def publish_record(self, record: dict):
+        self.record = record
+        self.push('record', record)
+
+    def push(self, event: str, data):
+        if not self._clients:
+            return
+        self._event_id += 1
+        message = b"id: %d\nevent: %s\ndata: %s\n\n" % (self._event_id, event.encode(), _json(data))
+        for q in list(self._clients):
+            self._offer(q, message)
+
+    def _offer(self, q: asyncio.Queue, message):
+        if q.full():
+            q.get_nowait()
+            self.events_dropped += 1
+        q.put_nowait(message)
+
+    # --------------------------------------------------------------------------
+    # 요청 처리 (HTTP/1.1 keep-alive, GET/HEAD 만)
+    # --------------------------------------------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, b"", keep_alive=False)
+                    break
+                if len(head) > MAX_HEADER_BYTES:
+                    await self._respond(writer, 431, b"", keep_alive=False)
+                    break
+                lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, b"", keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version.upper() == 'HTTP/1.1')
+                self.requests += 1
+                if method not in ('GET', 'HEAD'):
+                    await self._respond(writer, 405, b"", keep_alive=keep_alive)
+                elif not await self._route(writer, method, target, keep_alive):
+                    break
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            logger.error(f"로컬 API 요청 처리 오류: {e}")
+        finally:
+            writer.close()
+
+    async def _route(self, writer, method, target, keep_alive) -> bool:
+        # False 를 돌려주면 연결 종료 (SSE 스트림이 끝난 경우)
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        head_only = method == 'HEAD'
+        if url.path == '/api/events':
+            await self._stream(writer)
+            return False
+        if url.path == '/api/latest':
+            body = _json(self.snapshot())
+            await self._respond(writer, 200, body, 'application/json; charset=utf-8', keep_alive, head_only)
+        elif url.path == '/api/history':
+            status, payload = self._history(query)
+            await self._respond(writer, status, _json(payload), 'application/json; charset=utf-8',
+                                keep_alive, head_only)
+        else:
+            await self._static(writer, url.path, keep_alive, head_only)
+        return True
+
+    async def _respond(self, writer, status, body: bytes, content_type='text/plain; charset=utf-8',
+                       keep_alive=True, head_only=False):
+        header = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Cache-Control: no-store\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        ).encode('latin-1') + b"\r\n"
+        writer.write(header if head_only else header + body)
+        await writer.drain()
+
+    # --------------------------------------------------------------------------
+    # /api/latest, /api/history
+    # --------------------------------------------------------------------------
+    def snapshot(self) -> dict:
+        channels = self.latest.snapshot() if self.latest is not None else {}
+        return {'record': self.record, 'channels': channels, 'server_time': time.time()}
+
+    def _history(self, query: Dict[str, str]):
+        if self.history is None:
+            return 503, {'error': '로컬 이력 없음'}
+        try:
+            hours = float(query.get('hours', 24))
+            max_points = max(1, min(int(query.get('max_points', HISTORY_MAX_POINTS)), HISTORY_MAX_POINTS))
+        except ValueError:
+            return 400, {'error': 'hours/max_points 형식 오류'}
+        # float() 은 nan/inf/음수도 받음 -> 조회 범위 계산 전에 거름
+        if not (math.isfinite(hours) and hours > 0):
+            return 400, {'error': 'hours 는 0 보다 큰 유한한 값'}
+        hours = min(hours, HISTORY_MAX_HOURS)
+        channel = query.get('channel')
+        from history_store import CHANNELS
+        if channel is not None and channel not in CHANNELS:
+            return 400, {'error': f'알 수 없는 채널: {channel}', 'channels': list(CHANNELS)}
+        now = time.time()
+        records = self.history.query(now - hours * 3600, now)
+        # 점 개수 제한: 균일하게 건너뛰며 추출 (mmap 뷰에 대한 슬라이스라 복사는 추출분만)
+        step = max(1, math.ceil(len(records) / max_points))
+        records = records[::step]
+        names = [channel] if channel else list(CHANNELS)
+        payload = {'timestamp': [round(float(t), 1) for t in records['timestamp']]}
+        for name in names:
+            payload[name] = [_clean(round(float(v), 2)) for v in records[name]]
+        return 200, payload
+
+    # --------------------------------------------------------------------------
+    # /api/events (Server-Sent Events)
+    # --------------------------------------------------------------------------
+    async def _stream(self, writer):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream; charset=utf-8\r\n"
+            b"Cache-Control: no-store\r\n"
+            b"Connection: keep-alive\r\n"
+            b"X-Accel-Buffering: no\r\n\r\n"
+            b"retry: 2000\n"
+            b"event: snapshot\ndata: " + _json(self.snapshot()) + b"\n\n"
+        )
+        await writer.drain()
+        q = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._clients.add(q)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(q.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    message = b": keepalive\n\n"
+                if message is None:
+                    break
+                writer.write(message)
+                await writer.drain()
+                self.events_sent += 1
+        finally:
+            self._clients.discard(q)
+
+    # --------------------------------------------------------------------------
+    # 정적 파일 (키오스크 페이지)
+    # --------------------------------------------------------------------------
+    async def _static(self, writer, path, keep_alive, head_only):
+        if path in ('', '/'):
+            path = '/index.html'
+        root = os.path.realpath(self.static_dir)
+        full = os.path.realpath(os.path.join(root, path.lstrip('/')))
+        if not full.startswith(root + os.sep) or not os.path.isfile(full):
+            await self._respond(writer, 404, "없음".encode('utf-8'), keep_alive=keep_alive, head_only=head_only)
+            return
+        with open(full, 'rb') as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(full)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        await self._respond(writer, 200, body, content_type, keep_alive, head_only)
+
+# ==============================================================================
+# 2. 부하 테스트 (SSE 구독자 여러 개 + /api/latest 동시 요청)
+# ==============================================================================
+async def _sse_client(host, port, latencies, connected: list, expected: int, ready: asyncio.Event):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"GET /api/events HTTP/1.1\r\nHost: local\r\nAccept: text/event-stream\r\n\r\n")
+    await writer.drain()
+    await reader.readuntil(b"\r\n\r\n")
+    connected.append(writer)
+    if len(connected) == expected:
+        ready.set()
+    try:
+        while True:
+            block = await reader.readuntil(b"\n\n")
+            for line in block.split(b"\n"):
+                if line.startswith(b"data: "):
+                    data = json.loads(line[6:])
+                    if isinstance(data, dict) and data.get('channel') == 'loadtest':
+                        latencies.append(time.time() - data['value'])
+    except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def _poll_client(host, port, duration, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    end = time.monotonic() + duration
+    try:
+        while time.monotonic() < end:
+            t0 = time.perf_counter()
+            writer.write(b"GET /api/latest HTTP/1.1\r\nHost: local\r\n\r\n")
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        writer.close()
+
+def _percentiles(values):
+    if not values:
+        return "없음"
+    values = sorted(values)
+    pick = lambda p: values[min(len(values) - 1, int(p / 100 * len(values)))] * 1e3
+    return f"p50 {pick(50):.2f} ms, p95 {pick(95):.2f} ms, p99 {pick(99):.2f} ms, max {values[-1] * 1e3:.2f} ms"
+
+async def load_test(sse_clients=10, poll_clients=10, duration=5.0, rate=10.0):
+    from agent_runtime import LatestValues
+    latest = LatestValues()
+    server = LocalApiServer(latest, host="127.0.0.1", port=0)
+    await server.start()
+    sse_latency, poll_latency = [], []
+    ready = asyncio.Event()
+    connected = []
+    subscribers = [asyncio.ensure_future(
+        _sse_client("127.0.0.1", server.port, sse_latency, connected, sse_clients, ready))
+        for _ in range(sse_clients)]
+    await asyncio.wait_for(ready.wait(), 5)
+    pollers = [asyncio.ensure_future(_poll_client("127.0.0.1", server.port, duration, poll_latency))
+               for _ in range(poll_clients)]
+    # 센서 태스크 대신 rate Hz 로 값 발행 (값 = 발행 시각 -> 수신 측에서 지연 계산)
+    end = time.monotonic() + duration
+    published = 0
+    while time.monotonic() < end:
+        latest.publish('loadtest', time.time(), 0.0)
+        published += 1
+        await asyncio.sleep(1.0 / rate)
+    await asyncio.gather(*pollers)
+    await asyncio.sleep(0.2)
+    for task in subscribers:
+        task.cancel()
+    await asyncio.gather(*subscribers, return_exceptions=True)
+    await server.stop()
+    print(f"SSE 구독자 {sse_clients}개, 발행 {published}건, 수신 {len(sse_latency)}건 "
+          f"(누락 {published * sse_clients - len(sse_latency)}건)")
+    print(f"  발행 -> 수신 지연: {_percentiles(sse_latency)}")
+    print(f"/api/latest 동시 클라이언트 {poll_clients}개: {len(poll_latency)}건, "
+          f"{len(poll_latency) / duration:.0f} req/s")
+    print(f"  응답 시간: {_percentiles(poll_latency)}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "loadtest":
+        clients = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+        asyncio.run(load_test(sse_clients=clients, poll_clients=clients))
+    else:
+        print("사용법: python local_api.py loadtest [클라이언트 수]")
@@ -0,0 +1,279 @@
+import math
+import time
+import asyncio
+import logging
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+METRICS_HOST = "0.0.0.0" # 플릿 전체를 수집 서버에서 스크레이프
+METRICS_PORT = 9108
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# 지연 히스토그램 기본 구간 (초): 센서 읽기 ~ms, Modbus 수십 ms, HTTP 수백 ms
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer() and abs(value) < 1e15):
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+def _label_text(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+# ==============================================================================
+# 1. 메트릭 (잠금 없음: 관측은 GIL 아래 속성 갱신 몇 개. 같은 자식은 보통 한 스레드에서만 갱신)
+# ==============================================================================
+class Metric:
+    kind = "unknown"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple, "Metric"] = {}
+        self._function = None
+
+    def labels(self, *values, **kwargs):
+        # 핫패스에서는 labels() 결과를 미리 받아 두고 그 자식에 관측
+        if kwargs:
+            values = tuple(kwargs[n] for n in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._child()
+        return child
+
+    def set_function(self, function: Callable[[], float]):
+        # 스크레이프 시점에 값을 읽음 (큐 길이, 버스 점유율 등 관측 비용 0)
+        self._function = function
+        return self
+
+    def _child(self) -> "Metric":
+        return type(self)(self.name, self.documentation)
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        # [(접미사, 라벨 텍스트 추가분, 값)]
+        raise NotImplementedError
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        series = self._children.items() if self.labelnames else [((), self)]
+        for values, metric in series:
+            for suffix, extra, value in metric._samples():
+                lines.append(f"{self.name}{suffix}{_label_text(self.labelnames, values, extra)} {_format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def _samples(self):
+        value = self._function() if self._function is not None else self.value
+        return [("_total", "", value or 0)]
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def _samples(self):
+        if self._function is None:
+            return [("", "", self.value)]
+        try:
+            value = self._function()
+        except Exception as e:
+            logger.debug(f"[{self.name}] 게이지 함수 오류: {e}")
+            return []
+        return [] if value is None else [("", "", value)]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1) # 마지막은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def _child(self):
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float):
+        # 구간 누적은 스크레이프 때. 관측은 이분 탐색 한 번 + 덧셈 세 번
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+    def _samples(self):
+        samples, cumulative = [], 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            samples.append(("_bucket", f'le="{"+Inf" if bound == math.inf else repr(float(bound))}"', cumulative))
+        samples.append(("_count", "", self.count))
+        samples.append(("_sum", "", self.sum))
+        return samples
+
+class _Timer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+# ==============================================================================
+# 2. 레지스트리 + OpenMetrics 텍스트
+# ==============================================================================
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def _get(self, cls, name, documentation, labelnames=(), **kwargs):
+        # 같은 이름은 같은 객체 (모듈이 import 될 때마다 새로 만들지 않도록)
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, documentation, labelnames, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"메트릭 {name} 은 이미 {metric.kind} 로 등록됨")
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._get(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._get(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def exposition(self) -> bytes:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.collect())
+        lines.append("# EOF")
+        return ("\n".join(lines) + "\n").encode('utf-8')
+
+REGISTRY = Registry()
+
+# 여러 모듈이 함께 쓰는 메트릭: NAS API HTTP (batch_uploader 업로드, settings_sync 설정 조회) 를 endpoint 라벨로 구분
+HTTP_SECONDS = REGISTRY.histogram("agent_http_request_seconds", "NAS API HTTP 요청 시간", ("endpoint",))
+HTTP_REQUESTS = REGISTRY.counter("agent_http_requests", "NAS API HTTP 요청 수 (상태 코드별, 통신 오류는 error)",
+                                 ("endpoint", "status"))
+
+# ==============================================================================
+# 3. /metrics 서버 (에이전트 이벤트 루프에서, 의존성 없음)
+# ==============================================================================
+class MetricsServer:
+    def __init__(self, registry: Registry = REGISTRY, host=METRICS_HOST, port=METRICS_PORT):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.scrapes = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        sockets = self._server.sockets or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        logger.info(f"메트릭 엔드포인트 시작: http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            method, target, _ = head.decode('latin-1').split("\r\n", 1)[0].split(" ", 2)
+            if method not in ('GET', 'HEAD'):
+                status, body = "405 Method Not Allowed", b""
+            elif target.split("?", 1)[0] != "/metrics":
+                status, body = "404 Not Found", b""
+            else:
+                self.scrapes += 1
+                status, body = "200 OK", self.registry.exposition()
+            header = (f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                      f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode('latin-1')
+            writer.write(header if method == 'HEAD' else header + body)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"메트릭 요청 처리 오류: {e}")
+        finally:
+            writer.close()
+
+# ==============================================================================
+# 4. 관측 비용 벤치마크
+# ==============================================================================
+def benchmark(n=1_000_000):
+    registry = Registry()
+    counter = registry.counter("bench_events", "벤치마크", ("kind",)).labels("crc")
+    gauge = registry.gauge("bench_depth", "벤치마크")
+    histogram = registry.histogram("bench_seconds", "벤치마크", ("task",)).labels("current")
+    values = [(i % 1000) * 1e-5 for i in range(1000)]
+
+    def run(label, func):
+        t0 = time.perf_counter()
+        for i in range(n // 1000):
+            for v in values:
+                func(v)
+        elapsed = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for i in range(n // 1000):
+            for v in values:
+                pass
+        loop = time.perf_counter() - t0
+        print(f"  {label:<24} {(elapsed - loop) / n * 1e9:6.0f} ns/관측")
+
+    print(f"{n}회 관측 (반복문 비용 제외)")
+    run("Counter.inc", lambda v: counter.inc())
+    run("Gauge.set", gauge.set)
+    run("Histogram.observe", histogram.observe)
+    t0 = time.perf_counter()
+    body = registry.exposition()
+    print(f"  exposition {len(body)} 바이트, {(time.perf_counter() - t0) * 1e6:.0f} µs")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,260 @@
+import os
+import time
+import struct
+import logging
+from typing import Optional, Sequence, Union
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+READ_HOLDING_REGISTERS = 0x03
+READ_INPUT_REGISTERS = 0x04
+WRITE_SINGLE_REGISTER = 0x06
+WRITE_MULTIPLE_REGISTERS = 0x10
+EXCEPTION_FLAG = 0x80
+MAX_READ_REGISTERS = 125
+MAX_WRITE_REGISTERS = 123
+RESPONSE_TIMEOUT_SECONDS = 0.5 # 요청 후 첫 바이트까지 기다리는 최대 시간
+# USB-RS485 변환기는 수신 바이트를 USB 패킷 단위로 묶어서 넘기므로 프레임 간격 판정에 하한을 둠.
+# FTDI 기본 latency_timer 는 16ms -> 그보다 짧으면 프레임 중간에서 끊겨 CRC/길이 오류로 보임
+GAP_FLOOR_SECONDS = 0.020
+
+class ModbusError(Exception):
+    def __init__(self, message, exception_code=None):
+        super().__init__(message)
+        self.exception_code = exception_code
+
+class ModbusTimeout(ModbusError):
+    pass
+
+# 트랜잭션 시간과 오류 종류별 횟수 (GET /metrics)
+TRANSACTION_SECONDS = REGISTRY.histogram("agent_modbus_transaction_seconds", "Modbus RTU 요청 -> 응답 프레임 수신 시간")
+ERRORS = REGISTRY.counter("agent_modbus_errors", "Modbus 오류 횟수", ("kind",))
+TIMEOUT_ERRORS = ERRORS.labels("timeout")
+FRAME_ERRORS = ERRORS.labels("frame") # 프레임 수신 중단/길이 오류
+CRC_ERRORS = ERRORS.labels("crc")
+DEVICE_ERRORS = ERRORS.labels("exception") # 장치 에러 응답
+
+# ==============================================================================
+# 1. CRC16 (Modbus, 다항식 0xA001) - 256 엔트리 테이블
+# ==============================================================================
+def _make_crc_table():
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+        table.append(crc)
+    return tuple(table)
+
+CRC_TABLE = _make_crc_table()
+
+def crc16(data: Union[bytes, bytearray, memoryview], crc: int = 0xFFFF) -> int:
+    # crc 인자로 이전 결과를 넘기면 이어서 계산 (스트리밍)
+    table = CRC_TABLE
+    for b in data:
+        crc = (crc >> 8) ^ table[(crc ^ b) & 0xFF]
+    return crc
+
+def crc16_modbus(data: bytes) -> bytes:
+    # 기존 스크립트와 같은 형태: 리틀 엔디안 2바이트
+    return crc16(data).to_bytes(2, byteorder='little')
+
+def check_crc(frame: Union[bytes, bytearray, memoryview]) -> bool:
+    # 데이터+CRC 전체의 CRC 는 0 이 됨
+    return len(frame) >= 4 and crc16(frame) == 0
+
+class Crc16:
+    # 프레임을 조각으로 받으면서 CRC 를 누적
+    def __init__(self):
+        self.value = 0xFFFF
+
+    def update(self, chunk: Union[bytes, bytearray, memoryview]):
+        self.value = crc16(memoryview(chunk), self.value)
+        return self
+
+    def digest(self) -> bytes:
+        return self.value.to_bytes(2, byteorder='little')
+
+# ==============================================================================
+# 2. 요청 프레임 생성
+# ==============================================================================
+def _frame(pdu: bytes) -> bytes:
+    return pdu + crc16_modbus(pdu)
+
+def build_read_request(slave_id: int, function_code: int, address: int, count: int) -> bytes:
+    if function_code not in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+        raise ValueError(f"읽기 함수 코드가 아님: 0x{function_code:02X}")
+    if not 1 <= count <= MAX_READ_REGISTERS:
+        raise ValueError(f"레지스터 개수 범위 오류: {count}")
+    return _frame(struct.pack('>BBHH', slave_id, function_code, address, count))
+
+def build_write_single(slave_id: int, address: int, value: int) -> bytes:
+    return _frame(struct.pack('>BBHH', slave_id, WRITE_SINGLE_REGISTER, address, value & 0xFFFF))
+
+def build_write_multiple(slave_id: int, address: int, values: Sequence[int]) -> bytes:
+    count = len(values)
+    if not 1 <= count <= MAX_WRITE_REGISTERS:
+        raise ValueError(f"레지스터 개수 범위 오류: {count}")
+    pdu = struct.pack('>BBHHB', slave_id, WRITE_MULTIPLE_REGISTERS, address, count, count * 2)
+    pdu += struct.pack(f'>{count}H', *(v & 0xFFFF for v in values))
+    return _frame(pdu)
+
+# ==============================================================================
+# 3. 응답 프레임 해석
+# ==============================================================================
+def expected_response_length(function_code: int, header: bytes) -> int:
+    # header: 응답 앞 3바이트 (slave, function, byte_count 또는 주소 상위)
+    if function_code & EXCEPTION_FLAG:
+        return 5
+    if function_code in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+        return 3 + header[2] + 2
+    if function_code in (WRITE_SINGLE_REGISTER, WRITE_MULTIPLE_REGISTERS):
+        return 8
+    raise ModbusError(f"지원하지 않는 함수 코드: 0x{function_code:02X}")
+
+def parse_response(frame: bytes, slave_id: int, function_code: int):
+    # 0x03/0x04: 레지스터 값 리스트, 0x06: (주소, 값), 0x10: (주소, 개수)
+    if len(frame) < 5:
+        raise ModbusError(f"응답 길이 부족: {bytes(frame).hex()}")
+    if not check_crc(frame):
+        CRC_ERRORS.inc()
+        raise ModbusError(f"CRC 불일치: {bytes(frame).hex()}")
+    if frame[0] != slave_id:
+        raise ModbusError(f"슬레이브 ID 불일치: 예상 {slave_id}, 수신 {frame[0]}")
+    if frame[1] == function_code | EXCEPTION_FLAG:
+        DEVICE_ERRORS.inc()
+        raise ModbusError(f"장치 에러 응답: 함수 0x{function_code:02X}, 에러 코드 {frame[2]}", frame[2])
+    if frame[1] != function_code:
+        raise ModbusError(f"함수 코드 불일치: 예상 0x{function_code:02X}, 수신 0x{frame[1]:02X}")
+
+    if function_code in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+        byte_count = frame[2]
+        if byte_count % 2 or len(frame) != 3 + byte_count + 2:
+            raise ModbusError(f"바이트 수 불일치: {bytes(frame).hex()}")
+        return list(struct.unpack_from(f'>{byte_count // 2}H', frame, 3))
+    if function_code in (WRITE_SINGLE_REGISTER, WRITE_MULTIPLE_REGISTERS):
+        if len(frame) != 8:
+            raise ModbusError(f"쓰기 응답 길이 오류: {bytes(frame).hex()}")
+        return struct.unpack_from('>HH', frame, 2)
+    raise ModbusError(f"지원하지 않는 함수 코드: 0x{function_code:02X}")
+
+def to_signed(value: int) -> int:
+    return value - 0x10000 if value & 0x8000 else value
+
+# ==============================================================================
+# 4. RTU 프레임 수신 (길이 계산 + 3.5 문자 프레임 간격)
+# ==============================================================================
+def char_time(baudrate: int) -> float:
+    # 1 문자 = start + 8 data + parity/stop 2 = 11 비트
+    return 11.0 / baudrate
+
+def inter_frame_gap(baudrate: int) -> float:
+    # 19200bps 초과는 규격상 1.75ms 고정
+    if baudrate > 19200:
+        return 0.00175
+    return 3.5 * char_time(baudrate)
+
+def usb_latency_timer(port: str) -> Optional[float]:
+    # USB 시리얼 변환기의 latency_timer (초). /dev/serial/by-id 심볼릭 링크도 따라감, USB 가 아니면 None
+    name = os.path.basename(os.path.realpath(port))
+    try:
+        with open(f"/sys/bus/usb-serial/devices/{name}/latency_timer") as f:
+            return int(f.read().strip()) / 1000.0
+    except (OSError, ValueError):
+        return None
+
+def check_gap_floor(port: str, gap_floor=GAP_FLOOR_SECONDS) -> Optional[float]:
+    # 포트를 열 때 한 번. 변환기가 바이트를 모아 두는 시간이 프레임 간격 하한보다 길면 경고
+    latency = usb_latency_timer(port)
+    if latency is not None and latency >= gap_floor:
+        logger.warning(f"{port} latency_timer {latency * 1000:.0f}ms 가 프레임 간격 하한 {gap_floor * 1000:.0f}ms "
+                       f"이상 -> 응답이 중간에 끊길 수 있음 (gap_floor 를 늘리거나 latency_timer 를 1로)")
+    return latency
+
+def read_frame(ser, response_timeout=RESPONSE_TIMEOUT_SECONDS, gap_floor=GAP_FLOOR_SECONDS) -> bytes:
+    # 헤더로 전체 길이를 계산해서 다 받으면 바로 반환 (고정 길이 read + 타임아웃 대기 없음)
+    gap = max(inter_frame_gap(ser.baudrate), gap_floor)
+    saved_timeout = ser.timeout
+    try:
+        ser.timeout = response_timeout
+        buf = bytearray(ser.read(1))
+        if not buf:
+            raise ModbusTimeout("응답 없음 (타임아웃)")
+        # 첫 바이트 이후에는 3.5 문자 이상 조용하면 프레임이 끝난 것으로 판단
+        ser.timeout = gap
+        expected = None
+        while True:
+            if expected is None and len(buf) >= 3:
+                expected = expected_response_length(buf[1], buf)
+            need = (expected if expected is not None else 3) - len(buf)
+            if need <= 0:
+                break
+            chunk = ser.read(need)
+            if not chunk:
+                raise ModbusError(f"프레임 수신 중단 ({len(buf)}/{expected or '?'} 바이트): {bytes(buf).hex()}")
+            buf += chunk
+        return bytes(buf)
+    finally:
+        ser.timeout = saved_timeout
+
+def transact(ser, request: bytes, response_timeout=RESPONSE_TIMEOUT_SECONDS, gap_floor=GAP_FLOOR_SECONDS) -> bytes:
+    # 남아 있던 이전 응답 조각을 버리고 요청 -> 응답 프레임 하나를 받음
+    # 프레임 덤프는 DEBUG 에서만 (LOG_LEVELS 에 {"modbus": "DEBUG"}). 꺼져 있으면 레벨 확인 한 번
+    dump = logger.isEnabledFor(logging.DEBUG)
+    t0 = time.perf_counter()
+    ser.reset_input_buffer()
+    ser.write(request)
+    ser.flush()
+    if dump:
+        logger.debug("TX %s", request.hex(' '))
+    try:
+        response = read_frame(ser, response_timeout, gap_floor)
+    except ModbusTimeout:
+        TIMEOUT_ERRORS.inc()
+        raise
+    except ModbusError:
+        FRAME_ERRORS.inc()
+        raise
+    TRANSACTION_SECONDS.observe(time.perf_counter() - t0)
+    if dump:
+        logger.debug("RX %s", response.hex(' '))
+    return response
+
+# ==============================================================================
+# 5. 마이크로 벤치마크 (기존 비트 단위 구현과 비교)
+# ==============================================================================
+def _crc16_bitwise(data: bytes) -> bytes:
+    crc = 0xFFFF
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            if crc & 0x0001:
+                crc >>= 1
+                crc ^= 0xA001
+            else:
+                crc >>= 1
+    return crc.to_bytes(2, byteorder='little')
+
+def benchmark(iterations=20000):
+    import timeit
+    frames = [
+        b'\x01\x04\x00\x64\x00\x02',  # FOX-MR20 온도 읽기 요청
+        b'\x01\x04\x04\x00\xe1\x00\x00',  # 2 레지스터 응답
+        bytes(range(64)),
+    ]
+    for frame in frames:
+        assert crc16_modbus(frame) == _crc16_bitwise(frame)
+        old = timeit.timeit(lambda: _crc16_bitwise(frame), number=iterations) / iterations
+        new = timeit.timeit(lambda: crc16_modbus(frame), number=iterations) / iterations
+        print(f"{len(frame):3d} 바이트: 비트 단위 {old * 1e6:.2f} us, 테이블 {new * 1e6:.2f} us ({old / new:.1f}배)")
+
+if __name__ == "__main__":
+    benchmark()
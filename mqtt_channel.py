@@ -0,0 +1,334 @@
+import json
+import gzip
+import random
+import struct
+import asyncio
+import logging
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수 (MQTT 3.1.1)
+# ==============================================================================
+MQTT_PORT = 1883
+KEEPALIVE_SECONDS = 60
+CONNECT_TIMEOUT_SECONDS = 10
+PUBACK_TIMEOUT_SECONDS = 10
+RECONNECT_BASE_SECONDS = 1
+RECONNECT_MAX_SECONDS = 300
+TOPIC_PREFIX = "refrigerator"
+
+CONNECT, CONNACK, PUBLISH, PUBACK = 0x10, 0x20, 0x30, 0x40
+SUBSCRIBE, SUBACK, PINGREQ, PINGRESP, DISCONNECT = 0x80, 0x90, 0xC0, 0xD0, 0xE0
+
+class MqttError(Exception):
+    pass
+
+def encode_length(n: int) -> bytes:
+    # Remaining Length: 7비트씩, 최상위 비트는 다음 바이트 있음
+    out = bytearray()
+    while True:
+        byte, n = n % 128, n // 128
+        out.append(byte | (0x80 if n else 0))
+        if not n:
+            return bytes(out)
+
+def encode_string(s) -> bytes:
+    data = s.encode('utf-8') if isinstance(s, str) else bytes(s)
+    return struct.pack('>H', len(data)) + data
+
+def packet(header: int, body: bytes = b"") -> bytes:
+    return bytes([header]) + encode_length(len(body)) + body
+
+async def read_packet(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    header = (await reader.readexactly(1))[0]
+    length, shift = 0, 0
+    while True:
+        byte = (await reader.readexactly(1))[0]
+        length |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+        if shift > 21:
+            raise MqttError("Remaining Length 형식 오류")
+    return header, await reader.readexactly(length) if length else b""
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    # '+' 한 단계, '#' 나머지 전체
+    p_parts, t_parts = pattern.split('/'), topic.split('/')
+    for i, p in enumerate(p_parts):
+        if p == '#':
+            return True
+        if i >= len(t_parts) or (p != '+' and p != t_parts[i]):
+            return False
+    return len(p_parts) == len(t_parts)
+
+# ==============================================================================
+# 1. 최소 MQTT 클라이언트 (asyncio, 지속 연결 1개 + 자동 재연결)
+# ==============================================================================
+class MqttClient:
+    def __init__(self, host, port=MQTT_PORT, client_id="", username=None, password=None,
+                 keepalive=KEEPALIVE_SECONDS, will: Optional[Tuple[str, bytes, bool]] = None,
+                 on_connect: Optional[Callable[[], None]] = None):
+        self.host = host
+        self.port = port
+        self.client_id = client_id
+        self.username = username
+        self.password = password
+        self.keepalive = keepalive
+        self.will = will # (topic, payload, retain)
+        self.on_connect = on_connect
+        self._subscriptions: Dict[str, Callable[[str, bytes], None]] = {}
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._packet_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._stopping = False
+        self.connects = 0
+        self.published = 0
+        self.received = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    def subscribe(self, topic: str, callback: Callable[[str, bytes], None]):
+        # 연결될 때마다 다시 구독 (clean session)
+        self._subscriptions[topic] = callback
+        if self._writer is not None:
+            self._send(self._subscribe_packet(topic))
+
+    def _next_id(self) -> int:
+        self._packet_id = self._packet_id % 0xFFFF + 1
+        return self._packet_id
+
+    def _send(self, data: bytes):
+        if self._writer is None:
+            raise MqttError("연결 안 됨")
+        self._writer.write(data)
+
+    def _connect_packet(self) -> bytes:
+        flags = 0x02 # clean session
+        payload = encode_string(self.client_id)
+        if self.will is not None:
+            topic, message, retain = self.will
+            flags |= 0x04 | 0x08 | (0x20 if retain else 0) # will, will QoS 1
+            payload += encode_string(topic) + encode_string(message)
+        if self.username is not None:
+            flags |= 0x80
+            payload += encode_string(self.username)
+            if self.password is not None:
+                flags |= 0x40
+                payload += encode_string(self.password)
+        body = encode_string("MQTT") + bytes([4, flags]) + struct.pack('>H', self.keepalive) + payload
+        return packet(CONNECT, body)
+
+    def _subscribe_packet(self, topic: str) -> bytes:
+        return packet(SUBSCRIBE | 0x02, struct.pack('>H', self._next_id()) + encode_string(topic) + b'\x01')
+
+    # --------------------------------------------------------------------------
+    # 연결 루프
+    # --------------------------------------------------------------------------
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        delay = RECONNECT_BASE_SECONDS
+        while not self._stopping:
+            try:
+                await self._session()
+                delay = RECONNECT_BASE_SECONDS
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, MqttError) as e:
+                logger.warning(f"MQTT 연결 끊김 ({self.host}:{self.port}): {e or type(e).__name__}")
+            finally:
+                self._drop()
+            if self._stopping:
+                break
+            wait = delay * random.uniform(0.5, 1.0)
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+    async def stop(self):
+        self._stopping = True
+        if self._writer is not None:
+            try:
+                self._writer.write(packet(DISCONNECT))
+                await self._writer.drain()
+            except OSError:
+                pass
+        self._drop()
+
+    def _drop(self):
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(MqttError("연결 끊김"))
+        self._pending.clear()
+
+    async def _session(self):
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), CONNECT_TIMEOUT_SECONDS)
+        writer.write(self._connect_packet())
+        await writer.drain()
+        header, body = await asyncio.wait_for(read_packet(reader), CONNECT_TIMEOUT_SECONDS)
+        if header != CONNACK or len(body) < 2 or body[1] != 0:
+            writer.close()
+            raise MqttError(f"CONNACK 거절: {body.hex()}")
+        self._writer = writer
+        self.connects += 1
+        logger.info(f"MQTT 연결: {self.host}:{self.port}")
+        for topic in self._subscriptions:
+            self._send(self._subscribe_packet(topic))
+        if self.on_connect is not None:
+            try:
+                self.on_connect()
+            except Exception as e:
+                logger.error(f"MQTT on_connect 오류: {e}")
+        pinger = asyncio.ensure_future(self._ping())
+        try:
+            while True:
+                # keepalive 1.5배 동안 아무것도 안 오면 죽은 연결
+                header, body = await asyncio.wait_for(read_packet(reader), self.keepalive * 1.5)
+                try:
+                    self._dispatch(header, body)
+                except (struct.error, UnicodeDecodeError) as e:
+                    # 깨진 패킷 하나로 태스크가 죽지 않도록 연결을 끊고 재연결
+                    raise MqttError(f"잘못된 패킷 (0x{header:02X}, {len(body)} 바이트): {e}") from e
+        finally:
+            pinger.cancel()
+
+    async def _ping(self):
+        while self._writer is not None:
+            await asyncio.sleep(self.keepalive / 2)
+            if self._writer is not None:
+                self._writer.write(packet(PINGREQ))
+
+    def _dispatch(self, header: int, body: bytes):
+        kind = header & 0xF0
+        if kind == PUBLISH:
+            qos = (header >> 1) & 0x03
+            topic_len = struct.unpack_from('>H', body)[0]
+            topic = body[2:2 + topic_len].decode('utf-8')
+            pos = 2 + topic_len
+            if qos:
+                packet_id = struct.unpack_from('>H', body, pos)[0]
+                pos += 2
+                self._send(packet(PUBACK, struct.pack('>H', packet_id)))
+            self.received += 1
+            payload = body[pos:]
+            for pattern, callback in self._subscriptions.items():
+                if topic_matches(pattern, topic):
+                    try:
+                        callback(topic, payload)
+                    except Exception as e:
+                        logger.error(f"MQTT 메시지 처리 오류 ({topic}): {e}")
+        elif kind == PUBACK:
+            future = self._pending.pop(struct.unpack('>H', body[:2])[0], None)
+            if future is not None and not future.done():
+                future.set_result(True)
+        elif kind == SUBACK:
+            if body[2:] and body[2] == 0x80:
+                logger.error("MQTT 구독 거절")
+        elif kind == PINGRESP:
+            pass
+
+    # --------------------------------------------------------------------------
+    # 발행
+    # --------------------------------------------------------------------------
+    async def publish(self, topic: str, payload: bytes, qos=0, retain=False, timeout=PUBACK_TIMEOUT_SECONDS):
+        # qos=1 이면 브로커 PUBACK 까지 기다림 (적어도 한 번 전달)
+        header = PUBLISH | (qos << 1) | (0x01 if retain else 0)
+        body = encode_string(topic)
+        future = None
+        if qos:
+            packet_id = self._next_id()
+            body += struct.pack('>H', packet_id)
+            future = self._loop.create_future()
+            self._pending[packet_id] = future
+        self._send(packet(header, body + payload))
+        await self._writer.drain()
+        self.published += 1
+        if future is not None:
+            try:
+                await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                # PUBACK 이 안 오는 연결은 keepalive 만료를 기다리지 않고 끊고 재연결
+                self._pending.pop(packet_id, None)
+                self._drop()
+                raise
+
+    def publish_threadsafe(self, topic: str, payload: bytes, qos=1, retain=False,
+                           timeout=PUBACK_TIMEOUT_SECONDS) -> bool:
+        # 이벤트 루프 밖(업로드 드레이너 스레드)에서 호출
+        if self._loop is None or not self.connected:
+            return False
+        future = asyncio.run_coroutine_threadsafe(
+            self.publish(topic, payload, qos, retain, timeout), self._loop)
+        try:
+            future.result(timeout + 1)
+            return True
+        except (FutureTimeout, asyncio.TimeoutError, MqttError, OSError) as e:
+            logger.warning(f"MQTT 발행 실패 ({topic}): {e or type(e).__name__}")
+            future.cancel()
+            return False
+
+# ==============================================================================
+# 2. 설정 채널 + 텔레메트리 업링크
+# ==============================================================================
+class DeviceLink:
+    # 토픽: {prefix}/{냉장고 번호}/config (구독, 변경 알림), /telemetry (발행), /status (online/offline)
+    def __init__(self, client: MqttClient, refrigerator_number: str, on_config: Callable[[bytes], None],
+                 prefix=TOPIC_PREFIX, compress=True):
+        self.client = client
+        self.base = f"{prefix}/{refrigerator_number}"
+        self.on_config = on_config
+        self.compress = compress
+        self.config_messages = 0
+        client.will = (f"{self.base}/status", b"offline", True)
+        client.on_connect = self._online
+        client.subscribe(f"{self.base}/config", self._config)
+
+    def _online(self):
+        asyncio.ensure_future(self._publish_status())
+
+    async def _publish_status(self):
+        try:
+            await self.client.publish(f"{self.base}/status", b"online", qos=1, retain=True)
+        except (MqttError, OSError, asyncio.TimeoutError) as e:
+            logger.warning(f"MQTT 상태 발행 실패: {e}")
+
+    def _config(self, topic: str, payload: bytes):
+        # 서버가 설정을 바꾸면 이 토픽에 알림 -> 즉시 설정 동기화
+        self.config_messages += 1
+        logger.info(f"MQTT 설정 변경 알림 수신 ({len(payload)} 바이트)")
+        self.on_config(payload)
+
+    def send(self, records: List[dict]) -> int:
+        # QueueDrainer 의 send 와 같은 규약: 처리 완료된 앞쪽 레코드 수
+        data = json.dumps(records, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if self.compress:
+            data = gzip.compress(data, compresslevel=6)
+        topic = f"{self.base}/telemetry" + ("/gz" if self.compress else "")
+        return len(records) if self.client.publish_threadsafe(topic, data, qos=1) else 0
+
+class FallbackSender:
+    # MQTT 가 연결돼 있으면 MQTT, 아니면 (또는 실패하면) 기존 HTTP 배치 업로더
+    def __init__(self, link: Optional[DeviceLink], http_send: Callable[[List[dict]], int]):
+        self.link = link
+        self.http_send = http_send
+        self.mqtt_records = 0
+        self.http_records = 0
+
+    def send(self, records: List[dict]) -> int:
+        if self.link is not None and self.link.client.connected:
+            done = self.link.send(records)
+            if done:
+                self.mqtt_records += done
+                return done
+        done = self.http_send(records)
+        self.http_records += done
+        return done
@@ -1,25 +1,36 @@
 import os
+import json
 import time
-import requests
-import serial
+import asyncio
 import socket
-import Adafruit_ADS1x15
-import math
 import logging
-from typing import Optional, Any, Dict
-from dotenv import load_dotenv
+import argparse
+import threading
+from typing import Optional, Any, Dict, List
+from sensor_drivers import SensorDriver, Sct013Driver, Ds18b20Driver, FoxMr20Driver, build_drivers
+from w1_sensors import probe_readings
+from rs485_bus import WRITE_PRIORITY
+from compressor_monitor import CompressorMonitor
+from upload_queue import UploadQueue, QueueDrainer
+from batch_uploader import BatchUploader
+from report_filter import ReportFilter, HEARTBEAT_SECONDS
+from local_api import LocalApiServer, LOCAL_API_HOST, LOCAL_API_PORT
+from settings_sync import SettingsSync, desired_registers, SETTINGS_SNAPSHOT_PATH
+from setpoint_reconciler import SetpointReconciler, RECONCILE_INTERVAL_SECONDS
+from anomaly_detector import AnomalyDetector
+from event_inference import EventInference
+from adaptive_sampling import AdaptiveScheduler, policy_for
+from mqtt_channel import MqttClient, DeviceLink, FallbackSender, MQTT_PORT, TOPIC_PREFIX
+from agent_runtime import AgentRuntime
+from metrics import REGISTRY, MetricsServer, METRICS_HOST, METRICS_PORT
+import structured_logging
+# numpy(전류 분석/이력), pyserial, Adafruit, requests, dotenv 는 쓰는 시점에 import (콘솔 점검이 빨리 뜨도록)
 
 # ==============================================================================
 # 0. 로깅 설정
 # ==============================================================================
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler("refrigerator.log"),
-        logging.StreamHandler()
-    ]
-)
+# 핸들러는 configure_logging() 에서 (import 만으로 로그 파일을 열지 않음). __main__ 으로 실행해도 같은 이름
+logger = logging.getLogger("refrigerator_update")
 
 # ==============================================================================
 # 1. 환경 변수 관리
@@ -33,7 +44,7 @@ def get_ip_address():
         s.close()
         return ip
     except Exception as e:
-        logging.error(f"IP 주소 가져오기 오류: {e}")
+        logger.error(f"IP 주소 가져오기 오류: {e}")
         return None
         
 def get_serial_number():
@@ -43,17 +54,18 @@ def get_serial_number():
                 if line.startswith('Serial'):
                     return line.strip().split(":")[1].strip()
     except Exception as e:
-        logging.error(f"시리얼 넘버 가져오기 오류: {e}")
+        logger.error(f"시리얼 넘버 가져오기 오류: {e}")
         return None
 
 def ensure_env():
+    from dotenv import load_dotenv
     load_dotenv(ENV_PATH)
 
     refrigerator_number = os.getenv("REFRIGERATOR_NUMBER")
     check_value = os.getenv("CHECK_VALUE")
 
     if not refrigerator_number or not check_value:
-        logging.info("첫 실행입니다. 냉장고 번호와 관리자 ID를 입력해주세요.")
+        logger.info("첫 실행입니다. 냉장고 번호와 관리자 ID를 입력해주세요.")
         refrigerator_number = input("냉장고 번호 입력: ").strip()
         check_value = input("관리자 ID 입력: ").strip()
 
@@ -61,199 +73,382 @@ def ensure_env():
             f.write(f"REFRIGERATOR_NUMBER={refrigerator_number}\n")
             f.write(f"CHECK_VALUE={check_value}\n")
 
-        logging.info(".env 파일을 생성했습니다. 다음 실행부터는 자동으로 불러옵니다.")
+        logger.info(".env 파일을 생성했습니다. 다음 실행부터는 자동으로 불러옵니다.")
 
     return refrigerator_number, check_value
 
 # ==============================================================================
 # 2. 상수 및 전역 변수
 # ==============================================================================
+CONFIG_PATH = "config.json"
+
+def load_config():
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.error(f"설정 파일 읽기 오류: {e}")
+        return {}
+
+CONFIG = load_config()
+
 TEMP_API_BASE_URL = "http://bistech-db.synology.me:57166/api/refrigerator/raspi"
 DATA_POST_URL = "http://bistech-db.synology.me:57166/api/temperature"
 TEMP_API_BASE_URL = "http://bistech-db.synology.me:/api/refrigerator/raspi" #port num 삭제
 DATA_POST_URL = "http://bistech-db.synology.me:/api/temperature"
 HEADERS = {"Authorization": "JWT"}  # 필요 시 토큰 추가
-
-SLAVE_ID = 1
-
-SLAVE_ID = 1
-REG_ADDR_TEMP_SET = 0x0002
-REG_ADDR_TEMP_GAP = 0x0004
-REG_ADDR_HEAT_TIME = 0x0012
-
-GAIN = 1
-VOLTAGE_REF = 4.096
-BIT_RESOLUTION = 32768
-BIAS_VOLTAGE = 1.65
-CAL_FACTOR = 30.0 #SCT-013 1Vrms -> 30A
-# SENSOR_SCALE = 0.0333
-ADS1115_AVAILABLE = False
-
-try:
-    adc = Adafruit_ADS1x15.ADS1115()
-    ADS1115_AVAILABLE = True
-except Exception as e:
-    logging.error(f"ADS1115 초기화 오류: {e}")
-    ADS1115_AVAILABLE = False
+SETTINGS_SNAPSHOT = CONFIG.get("SETTINGS_SNAPSHOT_PATH", SETTINGS_SNAPSHOT_PATH) # 네트워크 없이 재시작할 때 쓰는 마지막 설정
+UPLOAD_BATCH_SIZE = 30 # N건이 모이면 한 번에 전송
+UPLOAD_MAX_WAIT_SECONDS = 60 # 또는 가장 오래된 레코드가 T초 지나면 전송
+UPLOAD_GZIP = True
+# 예외 보고 모드: 데드밴드를 벗어나거나 하트비트가 지났을 때만 전송, 그 사이는 min/max/mean 집계
+# (레코드 수와 필드가 바뀌므로 서버 쪽 준비가 끝난 장치의 config.json 에서만 켬)
+REPORT_BY_EXCEPTION = CONFIG.get("REPORT_BY_EXCEPTION", False)
+REPORT_HEARTBEAT_SECONDS = CONFIG.get("REPORT_HEARTBEAT_SECONDS", HEARTBEAT_SECONDS)
+REPORT_DEADBANDS = CONFIG.get("REPORT_DEADBANDS") # 없으면 report_filter.DEFAULT_DEADBANDS
+# 로컬 이력: 하루 단위 고정 길이 바이너리 세그먼트 (로그 텍스트 대신 조회용, 없으면 history_store 기본값)
+HISTORY_PATH = CONFIG.get("HISTORY_DIR")
+HISTORY_RETENTION_DAYS = CONFIG.get("HISTORY_RETENTION_DAYS")
+# 키오스크용 로컬 API (최신값, 이력, SSE 푸시). 화면이 NAS 를 거치지 않고 같은 Pi 에서 값을 받음
+LOCAL_API_ENABLED = CONFIG.get("LOCAL_API_ENABLED", True)
+LOCAL_API_BIND = CONFIG.get("LOCAL_API_HOST", LOCAL_API_HOST)
+LOCAL_API_PORT_NUMBER = CONFIG.get("LOCAL_API_PORT", LOCAL_API_PORT)
+# MQTT: 설정 변경 알림 구독 + 텔레메트리 업링크 (MQTT_HOST 가 없으면 기존 HTTP 만 사용)
+MQTT_HOST = CONFIG.get("MQTT_HOST")
+MQTT_PORT_NUMBER = CONFIG.get("MQTT_PORT", MQTT_PORT)
+MQTT_USERNAME = CONFIG.get("MQTT_USERNAME")
+MQTT_PASSWORD = CONFIG.get("MQTT_PASSWORD")
+MQTT_TOPIC_PREFIX = CONFIG.get("MQTT_TOPIC_PREFIX", TOPIC_PREFIX)
+# 현장 이상 감지: 설정 온도 ± temp_gap 대역 이탈, 급변, 고착, 센서 누락, DS18B20/제어기 불일치
+ANOMALY_DETECTION = CONFIG.get("ANOMALY_DETECTION", True)
+ANOMALY_OPTIONS = CONFIG.get("ANOMALY_OPTIONS", {}) # anomaly_detector.AnomalyDetector 인자 (예: {"rate_limit": 2.0})
+# 온도 + 압축기 상태로 문 열림/제상/냉각 고장 에피소드를 추론해 시작/끝/최고 온도만 전송
+EVENT_INFERENCE = CONFIG.get("EVENT_INFERENCE", True)
+EVENT_OPTIONS = CONFIG.get("EVENT_OPTIONS", {}) # event_inference.EventInference 인자 (예: {"door_rate": 0.8})
+# 적응형 샘플링: 과도 상태면 최소 주기(기본 1초), 안정 상태면 최대 주기(기본 60초)까지. DRIVERS 의 period 는 시작 주기
+ADAPTIVE_SAMPLING = CONFIG.get("ADAPTIVE_SAMPLING", True)
+# {"budgets": {"cpu": 0.2, "bus": 0.5}, "channels": {"ds18b20": {"min_period": 2, "max_period": 120}}}
+ADAPTIVE_OPTIONS = CONFIG.get("ADAPTIVE_OPTIONS", {})
+# OpenMetrics /metrics: 센서 읽기/Modbus/HTTP/태스크 지연 히스토그램, 큐 깊이 등 (수집 서버가 플릿 전체를 스크레이프)
+METRICS_ENABLED = CONFIG.get("METRICS_ENABLED", True)
+METRICS_BIND = CONFIG.get("METRICS_HOST", METRICS_HOST)
+METRICS_PORT_NUMBER = CONFIG.get("METRICS_PORT", METRICS_PORT)
+# 로그: 큐 + 리스너 스레드, 크기/하루 단위 회전 후 gzip, JSON lines. LOG_LEVELS 로 서브시스템별 레벨
+# (예: {"modbus": "DEBUG"} 면 요청/응답 프레임 덤프, {"mqtt_channel": "WARNING"})
+LOG_PATH = CONFIG.get("LOG_PATH", structured_logging.LOG_PATH)
+LOG_LEVEL = CONFIG.get("LOG_LEVEL", "INFO")
+LOG_LEVELS = CONFIG.get("LOG_LEVELS", {})
+LOG_JSON = CONFIG.get("LOG_JSON", True)
+LOG_MAX_BYTES = CONFIG.get("LOG_MAX_BYTES", structured_logging.LOG_MAX_BYTES)
+LOG_ROTATE_SECONDS = CONFIG.get("LOG_ROTATE_SECONDS", structured_logging.LOG_ROTATE_SECONDS)
+LOG_BACKUPS = CONFIG.get("LOG_BACKUPS", structured_logging.LOG_BACKUPS)
+
+def configure_logging(console_level=None):
+    # run()/main() 에서 호출 (이미 설정돼 있으면 레벨만 갱신)
+    structured_logging.setup_logging(LOG_PATH, LOG_LEVEL, LOG_LEVELS, json_lines=LOG_JSON, max_bytes=LOG_MAX_BYTES,
+                                     rotate_seconds=LOG_ROTATE_SECONDS, backups=LOG_BACKUPS,
+                                     console_level=console_level)
+
+# 태스크별 주기 (초). 센서 드라이버 주기는 config.json 의 DRIVERS 항목에서 지정
+UPLOAD_PERIOD_SECONDS = 10
+API_CHECK_INTERVAL_SECONDS = 300
+STALE_AFTER_SECONDS = 30 # 이보다 오래된 센서값은 전송하지 않음 (주기가 더 길면 두 주기)
+BUS_STATS_INTERVAL_SECONDS = 300
 
 # ==============================================================================
-# 3. 센서/RS485 헬퍼 함수
+# 3. 센서 드라이버
 # ==============================================================================
-def read_current(samples=1000):
-    if not ADS1115_AVAILABLE:
-        return 0.0
-    try:
-        acc = 0.0
-        for _ in range(samples):
-            raw_value = adc.read_adc(0, gain=GAIN)
-            voltage = (raw_value / BIT_RESOLUTION) * VOLTAGE_REF
-            v_ac = voltage - BIAS_VOLTAGE
-            acc += v_ac ** 2
-            time.sleep(0.001)
-        
-        v_rms = math.sqrt(acc / samples) #RMS 전압
-        current_rms = (v_rms / 1.0) * CAL_FACTOR
-        # current_rms = v_rms / SENSOR_SCALE #전류 환산
-        return round(current_rms, 2)
-    except Exception as e:
-        logging.error(f"전류 측정 오류: {e}")
-        return None
-
-def read_temp_raw():
-    base_dir = '/sys/bus/w1/devices/'
-    try:
-        device_folders = [d for d in os.listdir(base_dir) if d.startswith('28-')]
-        if not device_folders:
-            return None
-        device_file = os.path.join(base_dir, device_folders[0], 'w1_slave')
-    except Exception:
-        return None
-    try:
-        with open(device_file, 'r') as f:
-            return f.readlines()
-    except Exception:
-        return None
-
-def read_ds18b20_temp():
-    lines = read_temp_raw()
-    if not lines:
-        return None
-    while lines and lines[0].strip()[-3:] != 'YES':
-        time.sleep(0.2)
-        lines = read_temp_raw()
-        if not lines:
-            return None
-    if lines and len(lines) > 1:
-        equals_pos = lines[1].find('t=')
-        if equals_pos != -1:
-            try:
-                temp_string = lines[1][equals_pos + 2:]
-                temp_c = float(temp_string) / 1000.0
-                return round(temp_c, 2)
-            except Exception as e:
-                logging.error(f"DS18B20 파싱 오류: {e}")
-                return None
-    return None
-
-def crc16_modbus(data: bytes) -> bytes:
-    crc = 0xFFFF
-    for b in data:
-        crc ^= b
-        for _ in range(8):
-            if crc & 0x0001:
-                crc >>= 1
-                crc ^= 0xA001
-            else:
-                crc >>= 1
-    return crc.to_bytes(2, byteorder='little')
-
-def open_rs485_serial():
-    try:
-        ser = serial.Serial(
-            port='/dev/ttyUSB0',
-            baudrate=9600,
-            bytesize=serial.EIGHTBITS,
-            parity=serial.PARITY_NONE,
-            stopbits=serial.STOPBITS_ONE,
-            timeout=1
-        )
-        if ser.isOpen():
-            logging.info(f"RS485 포트 {ser.port} 열림")
-            return ser
-    except Exception as e:
-        logging.error(f"RS485 포트 오류: {e}")
-    return None
-
-def read_rs485_temp(ser):
-    if not ser or not ser.isOpen():
-        return None
-    request_packet = b'\x01\x04\x00\x64\x00\x02\x30\x14'
-    try:
-        ser.write(request_packet)
-        response = ser.read(15)
-        if len(response) < 9:
-            return None
-        received_crc = response[-2:]
-        calculated_crc = crc16_modbus(response[:-2])
-        if received_crc != calculated_crc:
-            logging.warning("RS485 CRC 불일치")
-            return None
-        temp_value_raw = int.from_bytes(response[3:5], byteorder='big')
-        return round(temp_value_raw / 10.0, 2)
-    except Exception as e:
-        logging.error(f"RS485 읽기 오류: {e}")
-        return None
+def find_driver(drivers: List[SensorDriver], cls) -> Optional[SensorDriver]:
+    # 레코드를 구성할 때 쓰는 종류별 첫 드라이버 (같은 종류가 여럿이면 나머지는 채널 값으로만)
+    return next((d for d in drivers if isinstance(d, cls)), None)
+
+def open_drivers(drivers: List[SensorDriver]):
+    for driver in drivers:
+        t0 = time.monotonic()
+        driver.open()
+        logger.info(f"드라이버 {driver.kind} -> 채널 '{driver.channel}' 준비 ({(time.monotonic() - t0) * 1000:.0f} ms)")
+
+def close_drivers(drivers: List[SensorDriver]):
+    for driver in drivers:
+        try:
+            driver.close()
+        except Exception as e:
+            logger.error(f"드라이버 {driver.kind} 종료 오류: {e}")
+
+def add_driver_tasks(runtime: AgentRuntime, drivers: List[SensorDriver], on_result=None):
+    # 드라이버마다 독립된 주기 태스크, 블로킹 드라이버는 executor 스레드에서 실행
+    on_result = on_result or {}
+    for driver in drivers:
+        runtime.add_task(driver.channel, lambda d=driver: d.read().value, driver.period,
+                         blocking=driver.blocking, on_result=on_result.get(driver.channel))
+
+def add_adaptive_channels(sampler: AdaptiveScheduler, runtime: AgentRuntime, drivers: List[SensorDriver],
+                          overrides: Optional[dict] = None):
+    # 태스크 드라이버는 태스크 주기를, FOX-MR20 은 버스 폴링 주기를 조절 (스냅샷 태스크는 1초 그대로).
+    # 버스는 가장 짧은 설정 주기를 기준으로 채널 하나, 슬레이브마다 자기 설정 주기에 같은 배율을 곱함
+    overrides = overrides or {}
+    for driver in drivers:
+        policy = policy_for(driver.kind, overrides.get(driver.channel))
+        if isinstance(driver, FoxMr20Driver):
+            if driver.bus is not None:
+                base = driver.bus.base_period()
+                scale = lambda period, bus=driver.bus, base=base: bus.scale_poll_periods(period / base)
+                sampler.add(driver.channel, policy, scale, cost=driver.bus.poll_seconds, period=base)
+        else:
+            task = runtime.tasks[driver.channel]
+            sampler.add(driver.channel, policy, task.set_period, cost=lambda t=task: t.last_duration,
+                        period=driver.period)
+
+def add_runtime_metrics(runtime: AgentRuntime):
+    # 태스크(센서 읽기 포함) 실행 시간/시작 지연은 관측마다, 실행/오류/밀림 횟수와 주기는 스크레이프 때 읽음
+    durations = REGISTRY.histogram("agent_task_seconds", "태스크 1회 실행 시간 (센서 읽기, 업로드 큐 기록 등)", ("task",))
+    lags = REGISTRY.histogram("agent_task_lag_seconds", "예정 시각보다 늦게 시작한 시간", ("task",))
+    runs = REGISTRY.counter("agent_task_runs", "태스크 실행 횟수", ("task",))
+    errors = REGISTRY.counter("agent_task_errors", "태스크 오류 횟수", ("task",))
+    overruns = REGISTRY.counter("agent_task_overruns", "실행이 주기보다 길어 건너뛴 슬롯 수", ("task",))
+    periods = REGISTRY.gauge("agent_task_period_seconds", "현재 태스크 주기 (적응형 샘플링 반영)", ("task",))
+    children = {}
+    for name, task in runtime.tasks.items():
+        children[name] = (durations.labels(name), lags.labels(name))
+        runs.labels(name).set_function(lambda t=task: t.runs)
+        errors.labels(name).set_function(lambda t=task: t.errors)
+        overruns.labels(name).set_function(lambda t=task: t.overruns)
+        periods.labels(name).set_function(lambda t=task: t.period)
+
+    def observe(task, duration):
+        duration_child, lag_child = children[task.name]
+        duration_child.observe(duration)
+        if task.last_lag is not None:
+            lag_child.observe(task.last_lag)
+    runtime.observers.append(observe)
 
 # ==============================================================================
 # 4. API 설정 동기화
 # ==============================================================================
-def update_refrigerator_settings(serial_port, refrigerator_number, check_value, settings):
-    temp_api_url_full = f"{TEMP_API_BASE_URL}/{refrigerator_number}?check_refrigerator={check_value}"
-    try:
-        response = requests.get(temp_api_url_full, headers=HEADERS, timeout=10)
-        if response.status_code != 200:
-            logging.warning(f"API 요청 실패: {response.status_code}")
-            return
-        data = response.json().get('data')
-        if not data:
-            return
-        found_fridge = next((item for item in data if item.get('refrigerator_number') == refrigerator_number), None)
-        if not found_fridge:
-            settings['refrigerator_id'] = None
-            return
-        settings['refrigerator_id'] = found_fridge.get("refrigerator_id")
-        settings['setting_temp_value_from_api'] = found_fridge.get('setting_temp_value')
-        settings['temp_gap_api'] = found_fridge.get('temp_gap')
-        settings['heating_time_from_api'] = found_fridge.get('defrost_time')
-        logging.info(f"API 설정 동기화 완료: {settings}")
-    except Exception as e:
-        logging.error(f"API 통신 오류: {e}")
+def submit_reconcile(bus, reconciler):
+    # 바뀐 필드만이 아니라 실제 레지스터와 비교해서 차이만 씀 (제어기 재시작/전면 패널 변경도 복구)
+    future = bus.submit(reconciler.reconcile, priority=WRITE_PRIORITY)
+
+    def _done(f):
+        if f.exception() is not None:
+            logger.error(f"제어기 설정 수렴 실패: {f.exception()}")
+    future.add_done_callback(_done)
+    return future
 
 # ==============================================================================
 # 5. 메인 루프
 # ==============================================================================
-def main(refrigerator_number: str, check_value: str):
-    settings = {
-        'refrigerator_id': None,
-        'setting_temp_value_from_api': None,
-        'temp_gap_api': None,
-        'heating_time_from_api': None,
-    }
-
-    api_check_interval_seconds = 300
-    last_api_check_time = 0
-
-    serial_port = open_rs485_serial()
-    update_refrigerator_settings(serial_port, refrigerator_number, check_value, settings)
+async def run_agent(runtime, api, mqtt=None, metrics=None):
+    # 로컬 API/메트릭/MQTT 는 센서 태스크와 같은 이벤트 루프에서 (연결이 안 돼도 측정/전송은 계속)
+    if api is not None:
+        try:
+            await api.start()
+        except OSError as e:
+            logger.error(f"로컬 API 시작 실패: {e}")
+            api = None
+    if metrics is not None:
+        try:
+            await metrics.start()
+        except OSError as e:
+            logger.error(f"메트릭 엔드포인트 시작 실패: {e}")
+            metrics = None
+    mqtt_task = asyncio.ensure_future(mqtt.run()) if mqtt is not None else None
+    try:
+        await runtime.run()
+    finally:
+        if mqtt_task is not None:
+            await mqtt.stop()
+            mqtt_task.cancel()
+        if api is not None:
+            await api.stop()
+        if metrics is not None:
+            await metrics.stop()
+
+def main(refrigerator_number: str, check_value: str, drivers: Optional[List[SensorDriver]] = None,
+         console=False, runtime: Optional[AgentRuntime] = None):
+    # console=True: 매 전송 주기마다 센서값/전송 데이터를 화면에 출력 (기존 cmd_check.py)
+    configure_logging()
+    from history_store import HistoryStore, HISTORY_DIR, RETENTION_DAYS
+
+    # 디스크 스냅샷으로 먼저 시작하고, API 는 ETag/Last-Modified 조건부 요청으로 확인 (첫 확인은 settings 태스크)
+    settings_sync = SettingsSync(TEMP_API_BASE_URL, refrigerator_number, check_value,
+                                 headers=HEADERS, snapshot_path=SETTINGS_SNAPSHOT)
+    settings = settings_sync.settings
+
+    if drivers is None:
+        drivers = build_drivers(CONFIG)
+    open_drivers(drivers)
+    current_driver = find_driver(drivers, Sct013Driver)
+    probe_driver = find_driver(drivers, Ds18b20Driver)
+    fox_driver = find_driver(drivers, FoxMr20Driver)
+    probe_locations = probe_driver.probes if probe_driver else {}
 
     raspi_ip = get_ip_address()
     raspi_serial = get_serial_number()
+    compressor_monitor = CompressorMonitor.from_cal_factor(current_driver.cal_factor if current_driver else 30.0)
+    compressor_events = []
+    report_filter = ReportFilter(REPORT_DEADBANDS, REPORT_HEARTBEAT_SECONDS) if REPORT_BY_EXCEPTION else None
+    detector = AnomalyDetector(**ANOMALY_OPTIONS) if ANOMALY_DETECTION else None
+    pending_alarms = []
+    inference = EventInference(**EVENT_OPTIONS) if EVENT_INFERENCE else None
+    episodes = []
+    sampler = AdaptiveScheduler(ADAPTIVE_OPTIONS.get('budgets')) if ADAPTIVE_SAMPLING else None
+
+    # 모든 레코드는 SD 카드의 큐에 먼저 기록하고, 전송은 백그라운드에서 순서대로
+    upload_queue = UploadQueue()
+    uploader = BatchUploader(DATA_POST_URL, headers=HEADERS, compress=UPLOAD_GZIP)
+    # 설정 변경은 MQTT 알림으로 1초 안에, 주기 폴링(API_CHECK_INTERVAL_SECONDS)은 예비로 유지
+    mqtt = link = None
+    if MQTT_HOST:
+        mqtt = MqttClient(MQTT_HOST, MQTT_PORT_NUMBER, client_id=f"raspi-{refrigerator_number}",
+                          username=MQTT_USERNAME, password=MQTT_PASSWORD)
+        link = DeviceLink(mqtt, refrigerator_number, on_config=lambda payload: on_config_changed(),
+                          prefix=MQTT_TOPIC_PREFIX)
+    sender = FallbackSender(link, uploader.send)
+    drainer = QueueDrainer(upload_queue, sender.send,
+                           batch_size=UPLOAD_BATCH_SIZE, max_wait=UPLOAD_MAX_WAIT_SECONDS)
+    drainer.start()
+    history = HistoryStore(HISTORY_PATH or HISTORY_DIR, retention_days=HISTORY_RETENTION_DAYS or RETENTION_DAYS)
+
+    # 시리얼 포트는 FOX-MR20 드라이버의 버스 매니저 스레드만 사용 (슬레이브별 주기 폴링 + 쓰기 직렬화)
+    bus = fox_driver.bus if fox_driver else None
+    primary_slave = fox_driver.primary_slave if fox_driver else None
+
+    sync_lock = threading.Lock()
+    reconciler = SetpointReconciler(bus.slaves[primary_slave].poller) if bus is not None else None
+    reconcile_job = None
+
+    def reconcile():
+        # 원하는 값은 항상 최신으로, 버스 작업은 한 번에 하나만 대기
+        nonlocal reconcile_job
+        if reconciler is None:
+            return
+        reconciler.set_desired(desired_registers(settings))
+        if reconcile_job is None or reconcile_job.done():
+            reconcile_job = submit_reconcile(bus, reconciler)
+
+    def update_reference():
+        if detector is not None:
+            detector.set_reference(settings['setting_temp_value_from_api'], settings['temp_gap_api'])
+        if inference is not None:
+            inference.set_reference(settings['setting_temp_value_from_api'], settings['temp_gap_api'],
+                                    settings['heating_time_from_api'])
+
+    def sync_settings():
+        # 주기 폴링과 MQTT 알림이 겹쳐도 한 번에 하나씩
+        with sync_lock:
+            diff = settings_sync.sync()
+        if diff:
+            update_reference()
+            reconcile()
+
+    update_reference()
+
+    def on_config_changed():
+        asyncio.get_running_loop().run_in_executor(None, sync_settings)
+
+    runtime = runtime or AgentRuntime()
+    latest = runtime.latest
+    api = LocalApiServer(latest, history, LOCAL_API_BIND, LOCAL_API_PORT_NUMBER) if LOCAL_API_ENABLED else None
+
+    def stale_after(driver) -> float:
+        # 적응형 샘플링으로 주기가 STALE_AFTER_SECONDS 보다 길어져도 마지막 값은 두 주기 동안 유효
+        if driver is fox_driver and bus is not None:
+            period = max(s.period for s in bus.slaves.values())
+        else:
+            period = runtime.tasks[driver.channel].period
+        return max(STALE_AFTER_SECONDS, 2 * period)
+
+    def log_bus_stats():
+        if bus is not None:
+            logger.info(f"RS485 버스 통계: {bus.stats()}, 설정 수렴: {reconciler.stats()}")
+        if sampler is not None:
+            logger.info(f"샘플링 주기: {sampler.stats()}")
+
+    def on_alarms(events):
+        # 알람은 서버 왕복 없이 키오스크에 바로 표시하고, 우선 전송 레코드로 즉시 큐에
+        for event in events:
+            if event['state'] == 'raised':
+                logger.warning(f"이상 감지: {event}")
+                if sampler is not None:
+                    sampler.boost(*(d.channel for d in (current_driver, probe_driver, fox_driver) if d))
+            else:
+                logger.info(f"이상 해제: {event}")
+        pending_alarms.extend(events)
+        latest.publish('alarms', detector.active(), 0.0)
+        asyncio.get_running_loop().create_task(queue_record(priority=True))
 
-
-    while True:
-        current_value = read_current()
-        ds18b20_temp = read_ds18b20_temp()
-        rs485_temp = read_rs485_temp(serial_port)
+    def check_temperatures(channel, value):
+        # 센서 태스크 결과마다 (측정값당 수 µs). 제상 히터 동작 중에는 고온 누적 제외
+        now = time.time()
+        events = detector.update(channel, now, value, defrost=compressor_monitor.state == 'heater')
+        inside = latest.get('temperature', max_age=stale_after(probe_driver)) if probe_driver else None
+        controller = latest.get('out_temperature', max_age=stale_after(fox_driver)) if fox_driver else None
+        events.extend(detector.compare(now, inside, controller))
+        if events:
+            on_alarms(events)
+
+    def infer_episodes(temperature):
+        # 캐비닛 온도 측정마다 현재 압축기 상태와 함께. 끝난 에피소드만 다음 정기 레코드에 실음
+        finished = inference.update(time.time(), temperature, compressor_monitor.state, compressor_monitor.state_since)
+        for episode in finished:
+            logger.info(f"에피소드 종료: {episode}")
+        episodes.extend(finished)
+
+    def on_ds18b20(probe_temps):
+        # 대표 온도는 별도 채널로 (키오스크가 업로드 주기를 기다리지 않고 표시)
+        temperature = probe_driver.primary_temperature(probe_temps)
+        latest.publish('temperature', temperature, 0.0)
+        if sampler is not None:
+            sampler.observe(probe_driver.channel, temperature)
+        if detector is not None:
+            check_temperatures('temperature', temperature)
+        if inference is not None:
+            infer_episodes(temperature)
+
+    last_controller = None
+
+    def on_controllers(controllers):
+        # 스냅샷 태스크는 1초마다지만 새로 폴링된 값일 때만 감지기에 넣음
+        nonlocal last_controller
+        controller = (controllers or {}).get(primary_slave)
+        if controller is last_controller:
+            return
+        last_controller = controller
+        temperature = controller.get('probe_temp') if controller else None
+        latest.publish('out_temperature', temperature, 0.0)
+        if sampler is not None:
+            sampler.observe(fox_driver.channel, temperature)
+        if detector is not None:
+            check_temperatures('out_temperature', temperature)
+        if inference is not None and probe_driver is None:
+            infer_episodes(temperature) # DS18B20 가 없으면 제어기 온도로
+
+    def on_current(current_value):
+        # 압축기/히터 상태 변화는 이벤트로, 가동률은 요약값으로 전송
+        events = compressor_monitor.update(time.time(), current_value)
+        compressor_events.extend(events)
+        if sampler is not None:
+            sampler.observe(current_driver.channel, current_value)
+            if any(e['event'] in ('heater_on', 'heater_off') for e in events):
+                # 제상 시작/끝은 온도가 크게 움직이는 구간
+                sampler.boost(*(d.channel for d in (probe_driver, fox_driver) if d))
+
+    async def queue_record(priority=False):
+        # 레코드 구성은 이벤트 루프에서, SQLite 기록만 executor 에서. priority=True 는 알람 직후 즉시 전송
+        if priority and not pending_alarms:
+            return # 그 사이 정기 레코드에 이미 실림
+        current_value = latest.get(current_driver.channel, max_age=stale_after(current_driver)) if current_driver else None
+        probe_temps = (latest.get(probe_driver.channel, max_age=stale_after(probe_driver)) if probe_driver else None) or {}
+        ds18b20_temp = probe_driver.primary_temperature(probe_temps) if probe_driver else None
+        controllers = (latest.get(fox_driver.channel, max_age=STALE_AFTER_SECONDS) if fox_driver else None) or {}
+        controller = controllers.get(primary_slave) or {}
+        rs485_temp = controller.get('probe_temp')
+        compressor_stats = compressor_monitor.stats()
+        if console:
+            print(f"[센서값] DS18B20: {ds18b20_temp} °C | RS485: {rs485_temp} °C | 전류: {current_value} A")
 
         data_to_send = {
             "temperature_value": str(ds18b20_temp) if ds18b20_temp else None,
@@ -262,37 +457,124 @@ def main(refrigerator_number: str, check_value: str):
             "current_value": str(current_value) if current_value else None,
             "refrigerator_id": int(settings['refrigerator_id']) if settings['refrigerator_id'] else None,
             "raspi_ip":raspi_ip,
-            "raspi_serial" : raspi_serial
+            "raspi_serial" : raspi_serial,
+            "measured_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "compressor_state": compressor_stats['compressor_state'],
+            "duty_cycle_1h": compressor_stats['duty_cycle_1h'],
+            "duty_cycle_24h": compressor_stats['duty_cycle_24h'],
+            "controller_registers": controller or None,
         }
+        if probe_temps or probe_locations:
+            data_to_send["probe_temperatures"] = probe_readings(probe_temps, probe_locations)
+        if len(controllers) > 1:
+            data_to_send["controllers"] = [
+                {"slave_id": slave_id, "registers": values} for slave_id, values in controllers.items()
+            ]
+        if compressor_events:
+            data_to_send["compressor_events"] = list(compressor_events)
+            compressor_events.clear()
+        if episodes and not priority:
+            data_to_send["episodes"] = list(episodes)
+            episodes.clear()
+        if pending_alarms:
+            data_to_send["alarms"] = list(pending_alarms)
+            data_to_send["active_alarms"] = detector.active()
+            pending_alarms.clear()
+
+        # 레코드 전체는 DEBUG 에서만 (포맷은 로그 리스너 스레드에서, 레코드는 이후 바꾸지 않음)
+        logger.debug("전송할 데이터", extra={'fields': {'record': data_to_send}})
+        if console:
+            print(f"[전송 데이터] {data_to_send}")
+        if api is not None:
+            api.publish_record(data_to_send)
+
+        # 원시값은 전송 여부와 관계없이 매 주기 로컬 이력에 (버퍼링된 24바이트 append)
+        if not priority:
+            try:
+                history.append(time.time(), ds18b20=ds18b20_temp, rs485=rs485_temp, current=current_value,
+                               setpoint=settings['setting_temp_value_from_api'])
+            except OSError as e:
+                logger.error(f"로컬 이력 기록 오류: {e}")
 
-        logging.info(f"전송할 데이터: {data_to_send}")
+        if report_filter is not None:
+            data_to_send = report_filter.offer(data_to_send, time.time())
+            if data_to_send is None:
+                return
 
         if settings['refrigerator_id']:
             try:
-                response = requests.post(DATA_POST_URL, json=data_to_send, headers=HEADERS, timeout=10)
-                if response.status_code in [200, 201]:
-                    logging.info("데이터 업로드 성공")
-                else:
-                    logging.warning(f"업로드 실패: {response.status_code}")
+                await asyncio.get_running_loop().run_in_executor(None, upload_queue.put, data_to_send, priority)
             except Exception as e:
-                logging.error(f"데이터 업로드 오류: {e}")
-
-        # 설정값 재확인 주기
-        now = time.time()
-        if now - last_api_check_time >= api_check_interval_seconds:
-            update_refrigerator_settings(serial_port, refrigerator_number, check_value, settings)
-            last_api_check_time = now
-
-        time.sleep(10)
+                logger.error(f"업로드 큐 저장 오류: {e}")
+                return
+            if priority:
+                drainer.flush()
+
+    on_result = {}
+    if current_driver:
+        on_result[current_driver.channel] = on_current
+    if probe_driver:
+        on_result[probe_driver.channel] = on_ds18b20
+    if fox_driver:
+        on_result[fox_driver.channel] = on_controllers
+    add_driver_tasks(runtime, drivers, on_result)
+    if sampler is not None:
+        add_adaptive_channels(sampler, runtime, [d for d in (current_driver, probe_driver, fox_driver) if d],
+                              ADAPTIVE_OPTIONS.get('channels'))
+    runtime.add_task('bus_stats', log_bus_stats, BUS_STATS_INTERVAL_SECONDS, blocking=False, publish=False)
+    runtime.add_task('upload', queue_record, UPLOAD_PERIOD_SECONDS, publish=False)
+    runtime.add_task('settings', sync_settings, API_CHECK_INTERVAL_SECONDS, publish=False)
+    runtime.add_task('reconcile', reconcile, RECONCILE_INTERVAL_SECONDS, blocking=False, publish=False)
+    metrics = None
+    if METRICS_ENABLED:
+        add_runtime_metrics(runtime)
+        REGISTRY.gauge("agent_info", "에이전트 식별 (값은 항상 1)", ("refrigerator", "serial")).labels(
+            refrigerator_number, raspi_serial or "").set(1)
+        REGISTRY.gauge("agent_upload_queue_depth", "전송 대기 레코드 수").set_function(lambda: len(upload_queue))
+
+        def queue_age():
+            oldest = upload_queue.oldest_created()
+            return time.time() - oldest if oldest else 0.0
+        REGISTRY.gauge("agent_upload_queue_oldest_age_seconds", "가장 오래된 대기 레코드 경과 시간").set_function(queue_age)
+        REGISTRY.gauge("agent_upload_dead_letters", "서버가 형식 오류로 거절해 보관 중인 레코드 수").set_function(
+            upload_queue.dead_letter_count)
+        REGISTRY.counter("agent_upload_bytes", "업로드 본문 바이트 (gzip 후)").set_function(lambda: uploader.bytes_sent)
+        if bus is not None:
+            REGISTRY.gauge("agent_rs485_bus_utilization", "RS485 버스 점유율").set_function(
+                lambda: bus.stats()['bus_utilization'])
+        metrics = MetricsServer(REGISTRY, METRICS_BIND, METRICS_PORT_NUMBER)
+    try:
+        asyncio.run(run_agent(runtime, api, mqtt, metrics))
+    finally:
+        drainer.stop()
+        history.close()
+        close_drivers(drivers)
 
 # ==============================================================================
 # 6. 실행부
 # ==============================================================================
-if __name__ == "__main__":
-    refrigerator_number, check_value = ensure_env()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="냉장고 IoT 에이전트")
+    parser.add_argument('--console', action='store_true',
+                        help="센서값과 전송 데이터를 매 주기 화면에 출력 (로그는 파일로만)")
+    parser.add_argument('--drivers', help="사용할 드라이버 종류 (예: ds18b20,fox_mr20). 기본은 config.json 의 DRIVERS")
+    return parser.parse_args(argv)
+
+def run(argv=None):
+    args = parse_args(argv)
+    # 콘솔 점검 모드는 화면에 출력 줄만, 로그는 refrigerator.log 에
+    configure_logging(console_level=logging.WARNING if args.console else None)
+    refrigerator_number, check_value = ensure_env() # info.env 의 AGENT_DRIVERS 도 여기서 로드
     try:
-        main(refrigerator_number, check_value)
+        main(refrigerator_number, check_value, build_drivers(CONFIG, args.drivers), console=args.console)
     except KeyboardInterrupt:
-        logging.info("사용자에 의해 프로그램이 종료되었습니다.")
+        logger.info("사용자에 의해 프로그램이 종료되었습니다.")
+        if args.console:
+            print("사용자에 의해 프로그램이 종료되었습니다.")
     except Exception as e:
-        logging.critical(f"예상치 못한 오류 발생: {e}")
+        logger.critical(f"예상치 못한 오류 발생: {e}")
+        if args.console:
+            print(f"예상치 못한 오류 발생: {e}")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,223 @@
+import sys
+import ast
+import json
+import math
+import random
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+HEARTBEAT_SECONDS = 600 # 변화가 없어도 이 시간이 지나면 한 번은 보냄 (생존 신호)
+# 경로(점 구분) 또는 마지막 키 이름 -> 데드밴드. 여기 있는 숫자 필드만 구간 집계(min/max/mean)
+DEFAULT_DEADBANDS = {
+    'temperature_value': 0.3,
+    'out_temperature_value': 0.3,
+    'temperature': 0.3,
+    'probe_temp': 0.3,
+    'current_value': 0.2,
+    'duty_cycle_1h': 0.05,
+    'duty_cycle_24h': 0.05,
+}
+# 비교하지 않는 필드 (매번 바뀌는 값)
+IGNORED_FIELDS = ('measured_at',)
+# 이 필드가 있으면 항상 보냄
+FORCE_FIELDS = ('compressor_events', 'alarms', 'episodes')
+
+# ==============================================================================
+# 1. 구간 집계 (필드당 O(1) 상태)
+# ==============================================================================
+class Aggregate:
+    __slots__ = ('min', 'max', 'total', 'count')
+
+    def __init__(self):
+        self.min = math.inf
+        self.max = -math.inf
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value: float):
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.total += value
+        self.count += 1
+
+    def summary(self) -> dict:
+        return {
+            'min': round(self.min, 3),
+            'max': round(self.max, 3),
+            'mean': round(self.total / self.count, 3),
+            'count': self.count,
+        }
+
+def _number(value) -> Optional[float]:
+    # 업로드 레코드의 측정값은 문자열("4.25")로 들어 있음
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def flatten(record, prefix='') -> Dict[str, object]:
+    # {'a': {'b': 1}, 'c': [{'d': 2}]} -> {'a.b': 1, 'c.0.d': 2}
+    items = {}
+    if isinstance(record, dict):
+        pairs = record.items()
+    elif isinstance(record, (list, tuple)):
+        pairs = enumerate(record)
+    else:
+        return {prefix: record}
+    for key, value in pairs:
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, (dict, list, tuple)):
+            items.update(flatten(value, path))
+        else:
+            items[path] = value
+    return items
+
+# ==============================================================================
+# 2. 예외 보고 필터 (데드밴드 + 하트비트)
+# ==============================================================================
+class ReportFilter:
+    def __init__(self, deadbands: Optional[Dict[str, float]] = None, heartbeat=HEARTBEAT_SECONDS):
+        self.deadbands = dict(DEFAULT_DEADBANDS if deadbands is None else deadbands)
+        self.heartbeat = heartbeat
+        self._reported: Dict[str, object] = {} # 마지막으로 보낸 값 (평탄화된 경로 기준)
+        self._reported_at = None
+        self._interval_start = None
+        self._aggregates: Dict[str, Aggregate] = {}
+        self.offered = 0
+        self.reported = 0
+
+    def _deadband(self, path: str) -> Optional[float]:
+        band = self.deadbands.get(path)
+        if band is None:
+            band = self.deadbands.get(path.rsplit('.', 1)[-1])
+        return band
+
+    def _changed(self, current: Dict[str, object]) -> Optional[str]:
+        if current.keys() != self._reported.keys():
+            return 'fields'
+        for path, value in current.items():
+            previous = self._reported[path]
+            band = self._deadband(path)
+            new, old = _number(value), _number(previous)
+            if band is not None and new is not None and old is not None:
+                if abs(new - old) >= band:
+                    return path
+            elif value != previous:
+                return path
+        return None
+
+    def offer(self, record: dict, timestamp: float) -> Optional[dict]:
+        # 매 측정 주기마다 호출. 보낼 레코드(구간 집계 포함) 또는 None
+        self.offered += 1
+        current = flatten({k: v for k, v in record.items() if k not in IGNORED_FIELDS and k not in FORCE_FIELDS})
+        if self._interval_start is None:
+            self._interval_start = timestamp
+        for path, value in current.items():
+            number = _number(value)
+            if number is not None and self._deadband(path) is not None:
+                aggregate = self._aggregates.get(path)
+                if aggregate is None:
+                    aggregate = self._aggregates[path] = Aggregate()
+                aggregate.add(number)
+
+        if self._reported_at is None:
+            reason = 'first'
+        elif any(record.get(f) for f in FORCE_FIELDS):
+            reason = 'event'
+        elif timestamp - self._reported_at >= self.heartbeat:
+            reason = 'heartbeat'
+        else:
+            reason = self._changed(current)
+            if reason is None:
+                return None
+
+        report = dict(record)
+        report['report_reason'] = reason
+        report['interval_seconds'] = round(timestamp - self._interval_start, 1)
+        if self._aggregates:
+            report['aggregates'] = {path: a.summary() for path, a in self._aggregates.items()}
+        self._reported = current
+        self._reported_at = timestamp
+        self._interval_start = timestamp
+        self._aggregates = {}
+        self.reported += 1
+        return report
+
+# ==============================================================================
+# 3. 리플레이 벤치마크 (refrigerator.log 의 "전송할 데이터" 줄 또는 합성 하루치)
+# ==============================================================================
+LOG_MARKER = "전송할 데이터: "
+LOG_MESSAGE = "전송할 데이터"
+
+def load_log(path: str):
+    # refrigerator.log 에 남은 레코드를 (timestamp, record) 로. 예전 텍스트 줄과 JSON lines(DEBUG) 모두
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            try:
+                if line.startswith('{'):
+                    entry = json.loads(line)
+                    if entry.get('msg') != LOG_MESSAGE or not isinstance(entry.get('record'), dict):
+                        continue
+                    record = entry['record']
+                else:
+                    pos = line.find(LOG_MARKER)
+                    if pos == -1:
+                        continue
+                    record = ast.literal_eval(line[pos + len(LOG_MARKER):].strip())
+                timestamp = datetime.strptime(record['measured_at'], "%Y-%m-%dT%H:%M:%S%z").timestamp()
+            except (ValueError, SyntaxError, KeyError, TypeError):
+                continue
+            yield timestamp, record
+
+def synthetic_day(period=10, set_temp=3.0, gap=2.0, seed=1):
+    # 설정온도 ± gap/2 사이를 오가는 압축기 사이클, 센서 잡음 ±0.06°C
+    rng = random.Random(seed)
+    start = 1_700_000_000
+    temp, cooling = set_temp, False
+    for i in range(86400 // period):
+        timestamp = start + i * period
+        if temp >= set_temp + gap / 2:
+            cooling = True
+        elif temp <= set_temp - gap / 2:
+            cooling = False
+        temp += (-0.02 if cooling else 0.006) * period / 10
+        current = 2.1 + rng.gauss(0, 0.03) if cooling else 0.0
+        yield timestamp, {
+            "temperature_value": str(round(temp + rng.gauss(0, 0.03), 2)),
+            "out_temperature_value": str(round(temp + 0.4, 1)),
+            "setting_temp_value": str(set_temp),
+            "current_value": str(round(current, 3)) if current else None,
+            "refrigerator_id": 1,
+            "raspi_ip": "192.168.0.10",
+            "raspi_serial": "00000000abcdef01",
+            "measured_at": datetime.fromtimestamp(timestamp).astimezone().strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "compressor_state": "compressor" if cooling else "off",
+        }
+
+def replay(trace, report_filter: ReportFilter) -> Tuple[int, int, int, int]:
+    records = reports = bytes_all = bytes_sent = 0
+    for timestamp, record in trace:
+        records += 1
+        bytes_all += len(json.dumps(record, ensure_ascii=False))
+        report = report_filter.offer(record, timestamp)
+        if report is not None:
+            reports += 1
+            bytes_sent += len(json.dumps(report, ensure_ascii=False))
+    return records, reports, bytes_all, bytes_sent
+
+if __name__ == "__main__":
+    trace = load_log(sys.argv[1]) if len(sys.argv) > 1 else synthetic_day()
+    records, reports, bytes_all, bytes_sent = replay(trace, ReportFilter())
+    if not records:
+        print("레코드 없음")
+        sys.exit(1)
+    print(f"전체 전송: {records}건, {bytes_all} 바이트")
+    print(f"예외 보고: {reports}건, {bytes_sent} 바이트 "
+          f"(건수 {records / max(reports, 1):.1f}배 감소, 바이트 {bytes_all / max(bytes_sent, 1):.1f}배 감소)")
@@ -0,0 +1,204 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterable, Optional
+
+from modbus import ModbusError, ModbusTimeout, GAP_FLOOR_SECONDS
+from fox_registers import RegisterPoller
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+DEFAULT_POLL_PERIOD_SECONDS = 10
+MAX_BACKOFF_SECONDS = 300
+WRITE_PRIORITY = 0 # 쓰기는 대기 중인 폴링보다 먼저
+JOB_PRIORITY = 1
+
+# ==============================================================================
+# 1. 슬레이브 상태
+# ==============================================================================
+class SlaveState:
+    def __init__(self, slave_id: int, period: float, gap_floor=GAP_FLOOR_SECONDS):
+        self.slave_id = slave_id
+        self.base_period = period # 설정한 주기 (적응형 샘플링은 이 값에 배율을 곱함)
+        self.period = period
+        self.poller = RegisterPoller(slave_id, gap_floor=gap_floor)
+        self.next_due = 0.0
+        self.failures = 0 # 연속 실패 횟수
+        self.values = None
+        self.updated_at = None
+        self.polls = 0
+        self.errors = 0
+        self.busy_seconds = 0.0 # 이 슬레이브 폴링에 쓴 버스 시간
+
+# ==============================================================================
+# 2. 버스 매니저 (시리얼 포트 단독 소유)
+# ==============================================================================
+class BusManager:
+    # slaves: [{'slave_id': 1, 'period': 10}, ...]
+    def __init__(self, ser, slaves: Iterable[dict], max_backoff=MAX_BACKOFF_SECONDS, gap_floor=GAP_FLOOR_SECONDS):
+        self.ser = ser
+        self.max_backoff = max_backoff
+        self.slaves: Dict[int, SlaveState] = {}
+        for cfg in slaves:
+            state = SlaveState(int(cfg['slave_id']), float(cfg.get('period', DEFAULT_POLL_PERIOD_SECONDS)), gap_floor)
+            self.slaves[state.slave_id] = state
+        self._jobs = queue.PriorityQueue()
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = None
+        self.transactions = 0
+        self.busy_seconds = 0.0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="rs485-bus", daemon=True)
+        self._thread.start()
+        logger.info(f"RS485 버스 스케줄러 시작: 슬레이브 {sorted(self.slaves)}")
+
+    def stop(self):
+        self._stop.set()
+        self._submit(JOB_PRIORITY, None)  # 대기 중인 get() 을 깨움
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    # --------------------------------------------------------------------------
+    # 외부 요청 (모든 포트 접근은 버스 스레드 한 곳에서 직렬화)
+    # --------------------------------------------------------------------------
+    def _submit(self, priority, func) -> Future:
+        future = Future()
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+        self._jobs.put((priority, seq, func, future))
+        return future
+
+    def submit_write(self, slave_id: int, settings: dict) -> Future:
+        poller = self.slaves[slave_id].poller
+        return self._submit(WRITE_PRIORITY, lambda: poller.write(self.ser, settings))
+
+    def submit(self, func, priority=JOB_PRIORITY) -> Future:
+        # func(ser) 형태의 임의 트랜잭션
+        return self._submit(priority, lambda: func(self.ser))
+
+    def get(self, slave_id: int, max_age: Optional[float] = None):
+        state = self.slaves.get(slave_id)
+        if state is None or state.values is None:
+            return None
+        if max_age is not None and time.monotonic() - state.updated_at > max_age:
+            return None
+        return state.values
+
+    def set_poll_period(self, period: float, slave_id: Optional[int] = None):
+        # 슬레이브 주기를 직접 지정 (slave_id 가 없으면 전부 같은 값)
+        now = time.monotonic()
+        for state in self.slaves.values():
+            if slave_id is None or state.slave_id == slave_id:
+                self._set_period(state, float(period), now)
+        self._submit(JOB_PRIORITY, None)
+
+    def scale_poll_periods(self, factor: float):
+        # 적응형 샘플링용. 슬레이브마다 설정 주기 x 배율 (슬레이브 간 주기 비율은 유지)
+        now = time.monotonic()
+        for state in self.slaves.values():
+            self._set_period(state, state.base_period * factor, now)
+        self._submit(JOB_PRIORITY, None)
+
+    def _set_period(self, state: SlaveState, period: float, now: float):
+        # 짧아지면 새 주기 안에 다음 폴링이 오도록 당김 (버스 스레드는 호출한 쪽에서 깨움)
+        if period < state.period and state.failures == 0:
+            state.next_due = min(state.next_due, now + period)
+        state.period = period
+
+    def base_period(self) -> float:
+        # 가장 짧은 설정 주기 (적응형 채널의 기준 주기)
+        return min((s.base_period for s in self.slaves.values()), default=DEFAULT_POLL_PERIOD_SECONDS)
+
+    def poll_seconds(self) -> Optional[float]:
+        # 기준 주기(base_period) 한 번 동안 드는 평균 버스 시간 (폴링 전이면 None).
+        # 설정 주기가 긴 슬레이브는 base / 설정 주기 만큼만 더함 -> 점유율 = poll_seconds / 기준 주기
+        polled = [s for s in self.slaves.values() if s.polls]
+        if not polled:
+            return None
+        base = self.base_period()
+        return sum(s.busy_seconds / s.polls * base / s.base_period for s in polled)
+
+    # --------------------------------------------------------------------------
+    def _transactions_now(self):
+        return sum(s.poller.transactions for s in self.slaves.values())
+
+    def _run_job(self, func, future: Future):
+        if not future.set_running_or_notify_cancel():
+            return
+        t0 = time.monotonic()
+        before = self._transactions_now()
+        try:
+            future.set_result(func())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            self.transactions += max(1, self._transactions_now() - before)
+            self.busy_seconds += time.monotonic() - t0
+
+    def _poll(self, state: SlaveState):
+        t0 = time.monotonic()
+        before = state.poller.transactions
+        try:
+            state.values = state.poller.read(self.ser)
+            state.updated_at = time.monotonic()
+            state.failures = 0
+            # 정해진 주기 격자에 맞춰 다음 폴링 (밀렸으면 지금부터)
+            state.next_due = max(state.next_due + state.period, t0)
+        except (ModbusError, OSError) as e:
+            state.errors += 1
+            state.failures += 1
+            backoff = min(state.period * (2 ** state.failures), self.max_backoff)
+            state.next_due = t0 + backoff
+            if not isinstance(e, ModbusTimeout) or state.failures == 1:
+                logger.warning(f"RS485 슬레이브 {state.slave_id} 폴링 실패({state.failures}회): {e}, {backoff:.0f}초 후 재시도")
+        finally:
+            state.polls += 1
+            self.transactions += state.poller.transactions - before
+            busy = time.monotonic() - t0
+            state.busy_seconds += busy
+            self.busy_seconds += busy
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = min(self.slaves.values(), key=lambda s: s.next_due, default=None)
+            wait = 1.0 if due is None else max(0.0, due.next_due - now)
+            # 쓰기/외부 작업은 폴링 사이에 끼워 넣음
+            try:
+                _, _, func, future = self._jobs.get(timeout=wait) if wait > 0 else self._jobs.get_nowait()
+            except queue.Empty:
+                func = None
+            else:
+                if func is None:
+                    continue
+                self._run_job(func, future)
+                continue
+            if due is not None and due.next_due <= time.monotonic():
+                self._poll(due)
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            'transactions': self.transactions,
+            'transactions_per_second': round(self.transactions / elapsed, 2) if elapsed > 0 else None,
+            'bus_utilization': round(self.busy_seconds / elapsed, 3) if elapsed > 0 else None,
+            'slaves': {
+                s.slave_id: {'polls': s.polls, 'errors': s.errors, 'failures': s.failures, 'period': s.period}
+                for s in self.slaves.values()
+            },
+        }
@@ -0,0 +1,225 @@
+import os
+import time
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Type
+
+from w1_sensors import W1Bus, W1_BASE_DIR, primary_temperature
+from rs485_bus import BusManager
+from modbus import GAP_FLOOR_SECONDS, check_gap_floor
+from ads_sampler import Ads1115Backend, SimulatedAdcBackend, ContinuousSampler
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+# 기본 주기 (초). config.json 의 DRIVERS 항목에서 period 로 개별 지정
+CURRENT_PERIOD_SECONDS = 2
+DS18B20_PERIOD_SECONDS = 10
+BUS_SNAPSHOT_SECONDS = 1 # 버스 매니저 최신값을 읽어 오는 주기 (폴링 주기는 슬레이브별)
+RS485_POLL_SECONDS = 10
+STALE_AFTER_SECONDS = 30
+
+# ==============================================================================
+# 1. 측정값 / 드라이버 인터페이스
+# ==============================================================================
+class Reading(NamedTuple):
+    channel: str
+    value: Any
+    timestamp: float
+
+class SensorDriver:
+    # open() 에서 하드웨어/라이브러리를 준비, read() 는 주기마다 호출 (blocking 이면 executor 스레드)
+    kind = None
+    channel = None
+    blocking = True
+
+    def __init__(self, period: float, channel: Optional[str] = None):
+        self.period = float(period)
+        if channel:
+            self.channel = channel
+
+    def open(self):
+        pass
+
+    def read(self) -> Reading:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def _reading(self, value) -> Reading:
+        return Reading(self.channel, value, time.time())
+
+DRIVERS: Dict[str, Type[SensorDriver]] = {}
+
+def register_driver(kind: str) -> Callable[[Type[SensorDriver]], Type[SensorDriver]]:
+    def _register(cls):
+        cls.kind = kind
+        DRIVERS[kind] = cls
+        return cls
+    return _register
+
+# ==============================================================================
+# 2. 드라이버 (numpy/pyserial/Adafruit 는 open() 에서 import -> 쓰지 않는 드라이버의 의존성은 로드하지 않음)
+# ==============================================================================
+@register_driver('sct013')
+class Sct013Driver(SensorDriver):
+    # ADS1115 연속 샘플링 링 버퍼 + SCT-013 RMS. 계산만 하므로 이벤트 루프에서 바로 실행
+    channel = 'current'
+    blocking = False
+
+    def __init__(self, period=CURRENT_PERIOD_SECONDS, channel=None, adc_channel=0, gain=1, cal_factor=30.0,
+                 data_rate=860, line_frequency=60.0, window_cycles=30, simulate=False, adc=None):
+        super().__init__(period, channel)
+        self.adc_channel = adc_channel
+        self.gain = gain
+        self.cal_factor = cal_factor
+        self.data_rate = data_rate
+        self.line_frequency = line_frequency
+        self.window_cycles = window_cycles
+        self.simulate = simulate
+        self.adc = adc # Adafruit ADS1115 과 같은 인터페이스의 객체 (없으면 open() 에서 생성)
+        self.sampler = None
+        self._analyze = None
+
+    def open(self):
+        from current_analysis import analyze_block
+        self._analyze = analyze_block
+        try:
+            if self.simulate:
+                backend = SimulatedAdcBackend(data_rate=self.data_rate, frequency=self.line_frequency)
+            else:
+                backend = Ads1115Backend(self.adc, channel=self.adc_channel, gain=self.gain, data_rate=self.data_rate)
+            self.sampler = ContinuousSampler(backend, line_frequency=self.line_frequency)
+        except Exception as e:
+            logger.error(f"ADS1115 초기화 오류: {e}")
+            self.sampler = None
+
+    def read(self) -> Reading:
+        if self.sampler is None:
+            return self._reading(0.0)
+        try:
+            if not self.sampler.running:
+                self.sampler.start()
+            # 샘플러 스레드가 채운 링 버퍼에서 최근 구간만 가져옴 (블로킹 없음)
+            window = self.sampler.get_window(self.window_cycles)
+            # 주파수는 실제 달성한 샘플링 속도로 계산 (I2C 지연으로 공칭 data_rate 보다 느릴 수 있음)
+            rate = self.sampler.effective_rate() or self.data_rate
+            stats = self._analyze(window, gain=self.gain, cal_factor=self.cal_factor, sample_rate=rate)
+            return self._reading(None if stats is None else round(stats.rms, 2))
+        except Exception as e:
+            logger.error(f"전류 측정 오류: {e}")
+            return self._reading(None)
+
+    def close(self):
+        if self.sampler is not None:
+            self.sampler.stop()
+
+@register_driver('ds18b20')
+class Ds18b20Driver(SensorDriver):
+    # 값은 {프로브 ID: 온도}. 일괄 변환 약 750ms 동안 블로킹하므로 executor 에서
+    channel = 'ds18b20'
+
+    def __init__(self, period=DS18B20_PERIOD_SECONDS, channel=None, probes=None, primary=None,
+                 base_dir=W1_BASE_DIR):
+        super().__init__(period, channel)
+        self.probes: Dict[str, str] = probes or {}
+        self.primary = primary
+        self.base_dir = base_dir
+        self.bus = None
+
+    def open(self):
+        self.bus = W1Bus(self.base_dir)
+
+    def read(self) -> Reading:
+        return self._reading(self.bus.read_all())
+
+    def primary_temperature(self, temps: Optional[Dict[str, Optional[float]]]) -> Optional[float]:
+        return primary_temperature(temps or {}, self.probes, self.primary)
+
+@register_driver('fox_mr20')
+class FoxMr20Driver(SensorDriver):
+    # 값은 {슬레이브 ID: 레지스터 값}. 시리얼 포트는 버스 매니저 스레드만 사용하고, read() 는 캐시만 읽음
+    channel = 'rs485'
+    blocking = False
+
+    def __init__(self, period=BUS_SNAPSHOT_SECONDS, channel=None, port="/dev/ttyUSB0", baudrate=9600,
+                 slaves=None, poll_period=RS485_POLL_SECONDS, max_age=STALE_AFTER_SECONDS, gap_floor=GAP_FLOOR_SECONDS):
+        super().__init__(period, channel)
+        self.port = port
+        self.baudrate = baudrate
+        self.slave_configs = slaves or [{'slave_id': 1}]
+        self.poll_period = poll_period
+        self.max_age = max_age
+        self.gap_floor = gap_floor # USB 변환기 latency_timer 보다 길게 (FTDI 기본 16ms)
+        self.primary_slave = int(self.slave_configs[0]['slave_id'])
+        self.bus = None
+
+    def open(self):
+        import serial
+        try:
+            ser = serial.Serial(
+                port=self.port,
+                baudrate=self.baudrate,
+                bytesize=serial.EIGHTBITS,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                timeout=1
+            )
+        except Exception as e:
+            logger.error(f"RS485 포트 오류: {e}")
+            return
+        logger.info(f"RS485 포트 {ser.port} 열림")
+        check_gap_floor(self.port, self.gap_floor)
+        self.bus = BusManager(ser, [{'period': self.poll_period, **cfg} for cfg in self.slave_configs],
+                              gap_floor=self.gap_floor)
+        self.bus.start()
+
+    def read(self) -> Reading:
+        if self.bus is None:
+            return self._reading(None)
+        values = {}
+        for slave_id, state in self.bus.slaves.items():
+            # 적응형 샘플링으로 폴링 주기가 길어지면 마지막 값은 두 주기 동안 유효
+            v = self.bus.get(slave_id, max_age=max(self.max_age, 2 * state.period))
+            if v is not None:
+                values[slave_id] = v
+        return self._reading(values)
+
+    def close(self):
+        if self.bus is not None:
+            self.bus.stop()
+            self.bus.ser.close()
+
+# ==============================================================================
+# 3. 설정 기반 구성
+# ==============================================================================
+def default_driver_specs(config: dict) -> List[dict]:
+    # DRIVERS 가 없는 기존 config.json 은 개별 키로 구성 (세 장치 모두 사용)
+    return [
+        {'type': 'sct013'},
+        {'type': 'ds18b20', 'probes': config.get('DS18B20_PROBES', {}), 'primary': config.get('DS18B20_PRIMARY')},
+        {'type': 'fox_mr20', 'port': config.get('RS485_PORT', "/dev/ttyUSB0"),
+         'slaves': config.get('RS485_SLAVES', [{'slave_id': 1}]),
+         'gap_floor': config.get('RS485_GAP_FLOOR_SECONDS', GAP_FLOOR_SECONDS)},
+    ]
+
+def build_drivers(config: dict, enabled: Optional[str] = None) -> List[SensorDriver]:
+    # enabled: "ds18b20,fox_mr20" 처럼 쓸 드라이버 종류만 (info.env 의 AGENT_DRIVERS 또는 --drivers)
+    specs = config.get('DRIVERS') or default_driver_specs(config)
+    enabled = enabled or os.getenv('AGENT_DRIVERS')
+    kinds = {k.strip() for k in enabled.split(',') if k.strip()} if enabled else None
+    drivers = []
+    for spec in specs:
+        options = dict(spec)
+        kind = options.pop('type')
+        if kinds is not None and kind not in kinds:
+            continue
+        if kind not in DRIVERS:
+            raise ValueError(f"알 수 없는 드라이버: {kind} (사용 가능: {sorted(DRIVERS)})")
+        driver = DRIVERS[kind](**options)
+        if any(d.channel == driver.channel for d in drivers):
+            raise ValueError(f"채널 이름 중복: {driver.channel} (같은 종류를 여럿 쓰면 channel 지정)")
+        drivers.append(driver)
+    return drivers
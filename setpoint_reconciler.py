@@ -0,0 +1,128 @@
+import time
+import logging
+from typing import Dict
+
+from modbus import ModbusError
+from fox_registers import REGISTER_MAP, HOLDING, RegisterPoller
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+RECONCILE_INTERVAL_SECONDS = 60
+WRITE_MIN_INTERVAL_SECONDS = 30 # 같은 레지스터를 이보다 자주 쓰지 않음
+MAX_WRITES_PER_HOUR = 20 # 전체 쓰기 상한 (제어기 EEPROM 보호)
+MAX_BACKOFF_SECONDS = 3600 # 검증 실패가 반복되는 레지스터의 최대 대기
+
+# ==============================================================================
+# 1. 설정값 수렴 (실제 레지스터 읽기 -> 차이만 쓰기 -> 다시 읽어 확인)
+# ==============================================================================
+class SetpointReconciler:
+    # reconcile(ser) 는 버스 스레드에서 실행 (BusManager.submit)
+    def __init__(self, poller: RegisterPoller, min_interval=WRITE_MIN_INTERVAL_SECONDS,
+                 max_writes_per_hour=MAX_WRITES_PER_HOUR, max_backoff=MAX_BACKOFF_SECONDS, clock=time.monotonic):
+        self.poller = poller
+        self.clock = clock
+        self.min_interval = min_interval
+        self.max_writes_per_hour = max_writes_per_hour
+        self.max_backoff = max_backoff
+        self.desired_raw: Dict[str, int] = {}
+        self._verified_raw: Dict[str, int] = {} # 마지막으로 일치를 확인한 값 (외부 변경 감지용)
+        self._next_allowed: Dict[str, float] = {}
+        self._failures: Dict[str, int] = {}
+        self._write_times = []
+        self.checks = 0
+        self.writes = 0
+        self.verify_failures = 0
+        self.drifts = 0
+
+    def set_desired(self, values: Dict[str, float]):
+        # {레지스터 이름: 실제값}. 범위를 벗어난 값은 버리고 기록
+        desired = {}
+        for name, value in values.items():
+            reg = REGISTER_MAP[name]
+            if not reg.writable:
+                raise ValueError(f"쓰기 불가 레지스터: {name}")
+            try:
+                desired[name] = reg.encode(value)
+            except ValueError as e:
+                logger.error(f"설정값 무시: {e}")
+        self.desired_raw = desired
+
+    def _actual_raw(self, ser) -> Dict[str, int]:
+        # 보유 레지스터 한 블록 읽기 (트랜잭션 1회)
+        self.poller.read(ser, HOLDING)
+        return {name: self.poller.raw.get((HOLDING, REGISTER_MAP[name].address)) for name in self.desired_raw}
+
+    def _allowed(self, name: str, now: float) -> bool:
+        if now < self._next_allowed.get(name, 0.0):
+            return False
+        self._write_times = [t for t in self._write_times if now - t < 3600]
+        return len(self._write_times) < self.max_writes_per_hour
+
+    def reconcile(self, ser) -> dict:
+        report = {'deltas': {}, 'written': {}, 'verified': None}
+        if not self.desired_raw:
+            return report
+        self.checks += 1
+        actual = self._actual_raw(ser)
+        deltas = {name: raw for name, raw in self.desired_raw.items() if actual.get(name) != raw}
+        for name, raw in self._verified_raw.items():
+            if name in deltas and self.desired_raw.get(name) == raw:
+                # 맞춰 둔 값이 바뀌어 있음 -> 제어기 재시작 또는 전면 패널 조작
+                self.drifts += 1
+                logger.warning(f"제어기 설정이 바뀌어 있음 ({name}: {REGISTER_MAP[name].decode(actual[name] or 0)}"
+                                f" -> 다시 {REGISTER_MAP[name].decode(raw)})")
+        for name in deltas:
+            self._verified_raw.pop(name, None)
+        for name, raw in self.desired_raw.items():
+            if name not in deltas:
+                self._verified_raw[name] = raw
+                self._failures.pop(name, None)
+        report['deltas'] = {n: REGISTER_MAP[n].decode(r) for n, r in deltas.items()}
+        if not deltas:
+            return report
+
+        now = self.clock()
+        writes = {name: raw for name, raw in deltas.items() if self._allowed(name, now)}
+        if not writes:
+            logger.info(f"설정 쓰기 보류 (쓰기 간격/상한): {report['deltas']}")
+            return report
+        values = {name: REGISTER_MAP[name].decode(raw) for name, raw in writes.items()}
+        self.poller.write(ser, values)
+        self.writes += len(writes)
+        self._write_times.extend([now] * len(writes))
+        report['written'] = values
+
+        # 다시 읽어서 실제로 들어갔는지 확인
+        try:
+            readback = self._actual_raw(ser)
+        except ModbusError as e:
+            logger.error(f"설정 확인 읽기 실패: {e}")
+            readback = {}
+        ok = True
+        for name, raw in writes.items():
+            if readback.get(name) == raw:
+                self._verified_raw[name] = raw
+                self._failures.pop(name, None)
+                self._next_allowed[name] = now + self.min_interval
+                continue
+            ok = False
+            self.verify_failures += 1
+            failures = self._failures[name] = self._failures.get(name, 0) + 1
+            self._next_allowed[name] = now + min(self.min_interval * (2 ** failures), self.max_backoff)
+            logger.error(f"설정 쓰기 확인 실패 ({name}): 쓴 값 {REGISTER_MAP[name].decode(raw)}, "
+                          f"읽은 값 {readback.get(name)} ({failures}회 연속)")
+        report['verified'] = ok
+        if ok:
+            logger.info(f"제어기 설정 반영 확인: {values}")
+        return report
+
+    def stats(self) -> dict:
+        return {
+            'checks': self.checks,
+            'writes': self.writes,
+            'verify_failures': self.verify_failures,
+            'drifts': self.drifts,
+        }
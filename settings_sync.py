@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Dict, Optional, Tuple
+
+from metrics import HTTP_SECONDS, HTTP_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+SETTINGS_SNAPSHOT_PATH = "settings_snapshot.json"
+SETTINGS_TIMEOUT_SECONDS = 10
+# API 응답 키 -> 에이전트 settings 키
+API_FIELDS = {
+    'refrigerator_id': 'refrigerator_id',
+    'setting_temp_value': 'setting_temp_value_from_api',
+    'temp_gap': 'temp_gap_api',
+    'defrost_time': 'heating_time_from_api',
+}
+# settings 키 -> FOX-MR20 레지스터 이름 (fox_registers.REGISTER_MAP)
+REGISTER_FIELDS = {
+    'setting_temp_value_from_api': 'temp_set',
+    'temp_gap_api': 'temp_gap',
+    'heating_time_from_api': 'heat_time',
+}
+
+def empty_settings() -> dict:
+    return {key: None for key in API_FIELDS.values()}
+
+def diff_settings(old: dict, new: dict) -> Dict[str, Tuple[object, object]]:
+    # {키: (이전, 최신)} - 실제로 바뀐 필드만
+    return {key: (old.get(key), new.get(key)) for key in new if old.get(key) != new.get(key)}
+
+def register_changes(diff: Dict[str, Tuple[object, object]]) -> Dict[str, float]:
+    # 바뀐 설정 중 RS485 로 써야 하는 것만 {레지스터 이름: 실제값}. 빈 값/형식 오류는 건너뜀
+    changes = {}
+    for key, (_, value) in diff.items():
+        register = REGISTER_FIELDS.get(key)
+        if register is None or value is None or value == '':
+            continue
+        try:
+            changes[register] = float(value)
+        except (TypeError, ValueError):
+            logger.error(f"API 설정값 변환 오류 ({key}): '{value}'")
+    return changes
+
+def desired_registers(settings: dict) -> Dict[str, float]:
+    # 현재 settings 전체를 제어기에 있어야 할 값 {레지스터 이름: 실제값} 으로
+    return register_changes({key: (None, settings.get(key)) for key in REGISTER_FIELDS})
+
+# ==============================================================================
+# 1. 조건부 요청 + 디스크 스냅샷
+# ==============================================================================
+class SettingsSync:
+    def __init__(self, base_url, refrigerator_number, check_value, headers=None,
+                 snapshot_path=SETTINGS_SNAPSHOT_PATH, timeout=SETTINGS_TIMEOUT_SECONDS, session=None):
+        self.url = f"{base_url}/{refrigerator_number}"
+        self.params = {'check_refrigerator': check_value}
+        self.refrigerator_number = refrigerator_number
+        self.headers = headers or {}
+        self._session = session
+        if session is not None:
+            session.headers.update(self.headers)
+        self.snapshot_path = snapshot_path
+        self.timeout = timeout
+        self.settings = empty_settings() # 에이전트가 같은 dict 를 계속 참조
+        self.etag = None
+        self.last_modified = None
+        self.body_hash = None
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_received = 0
+        self.load_snapshot()
+
+    @property
+    def session(self):
+        # requests 는 첫 요청 때 import (스냅샷만으로 시작하는 동안은 로드하지 않음)
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.headers.update(self.headers)
+        return self._session
+
+    # --------------------------------------------------------------------------
+    # 스냅샷 (네트워크 없이 재시작해도 마지막 설정으로 동작)
+    # --------------------------------------------------------------------------
+    def load_snapshot(self) -> bool:
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.error(f"설정 스냅샷 읽기 오류: {e}")
+            return False
+        if snapshot.get('refrigerator_number') != self.refrigerator_number:
+            logger.warning("설정 스냅샷의 냉장고 번호가 달라 무시합니다.")
+            return False
+        self.settings.update({k: v for k, v in snapshot.get('settings', {}).items() if k in self.settings})
+        self.etag = snapshot.get('etag')
+        self.last_modified = snapshot.get('last_modified')
+        self.body_hash = snapshot.get('body_hash')
+        logger.info(f"설정 스냅샷 로드: {self.settings}")
+        return True
+
+    def save_snapshot(self):
+        snapshot = {
+            'refrigerator_number': self.refrigerator_number,
+            'settings': self.settings,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'body_hash': self.body_hash,
+        }
+        tmp_path = self.snapshot_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.error(f"설정 스냅샷 저장 오류: {e}")
+
+    # --------------------------------------------------------------------------
+    # 동기화
+    # --------------------------------------------------------------------------
+    def sync(self) -> Optional[Dict[str, Tuple[object, object]]]:
+        # 바뀐 필드 {키: (이전, 최신)}. 변경 없음/304 는 {}, 요청 실패는 None (기존 설정 유지)
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        t0 = time.perf_counter()
+        try:
+            response = self.session.get(self.url, params=self.params, headers=headers, timeout=self.timeout)
+        except Exception as e:
+            HTTP_REQUESTS.labels("settings", "error").inc()
+            logger.error(f"API 통신 오류: {e}")
+            return None
+        HTTP_SECONDS.labels("settings").observe(time.perf_counter() - t0)
+        HTTP_REQUESTS.labels("settings", response.status_code).inc()
+        self.requests += 1
+        if response.status_code == 304:
+            self.not_modified += 1
+            return {}
+        if response.status_code != 200:
+            logger.warning(f"API 요청 실패: {response.status_code}")
+            return None
+
+        body = response.content
+        self.bytes_received += len(body)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        # 검증자를 주지 않는 서버라도 본문이 같으면 JSON 파싱/탐색을 건너뜀
+        body_hash = hashlib.sha1(body).hexdigest()
+        if body_hash == self.body_hash:
+            self.not_modified += 1
+            if (etag, last_modified) != (self.etag, self.last_modified):
+                self.etag, self.last_modified = etag, last_modified
+                self.save_snapshot()
+            return {}
+        try:
+            data = json.loads(body).get('data')
+        except (ValueError, AttributeError) as e:
+            logger.error(f"API 응답 해석 오류: {e}")
+            return None
+        if not data:
+            return None
+
+        found = None
+        for item in data:
+            if item.get('refrigerator_number') == self.refrigerator_number:
+                found = item
+                break
+        latest = empty_settings()
+        if found is not None:
+            for api_key, key in API_FIELDS.items():
+                latest[key] = found.get(api_key)
+        else:
+            # 목록에서 빠진 냉장고는 업로드를 멈추도록 ID 만 지움 (설정값은 유지)
+            latest = dict(self.settings, refrigerator_id=None)
+
+        diff = diff_settings(self.settings, latest)
+        self.settings.update(latest)
+        self.etag, self.last_modified, self.body_hash = etag, last_modified, body_hash
+        self.save_snapshot()
+        if diff:
+            logger.info(f"API 설정 변경: {diff}")
+        return diff
@@ -0,0 +1,98 @@
+import math
+import time
+import random
+from typing import NamedTuple, Tuple
+
+# ==============================================================================
+# 0. 상수 (SCT-013-30A + ADS1115, current_analysis 와 같은 환산)
+# ==============================================================================
+ADS1115_FULL_SCALE = {2/3: 6.144, 1: 4.096, 2: 2.048, 4: 1.024, 8: 0.512, 16: 0.256}
+BIT_RESOLUTION = 32768
+
+STATE_OFF = "off"
+STATE_COMPRESSOR = "compressor"
+STATE_HEATER = "heater"
+
+# ==============================================================================
+# 1. 냉장고 운전 패턴 (압축기 on/off 반복 + 주기적 제상)
+# ==============================================================================
+class CompressorProfile(NamedTuple):
+    on_seconds: float = 600.0
+    off_seconds: float = 900.0
+    defrost_every: float = 6 * 3600.0 # 제상 시작 간격 (0 이면 제상 없음)
+    defrost_seconds: float = 1200.0
+    compressor_amps: float = 2.4
+    heater_amps: float = 6.5
+    idle_amps: float = 0.05 # 팬/컨트롤러 대기 전류
+    inrush_amps: float = 12.0 # 압축기 기동 돌입 전류
+    inrush_seconds: float = 0.5
+    # 캐비닛 온도 변화율 (°C/초, 1-Wire/FOX-MR20 가짜 장치용)
+    cool_rate: float = -0.004
+    warm_rate: float = 0.002
+    heat_rate: float = 0.01
+
+    def state(self, t: float) -> Tuple[str, float, float]:
+        # t 초 시점의 (상태, RMS 전류, 상태 경과 시간)
+        if self.defrost_every > 0:
+            into_defrost = t % self.defrost_every
+            if t >= self.defrost_every and into_defrost < self.defrost_seconds:
+                return STATE_HEATER, self.heater_amps, into_defrost
+        cycle = self.on_seconds + self.off_seconds
+        into_cycle = t % cycle
+        if into_cycle < self.on_seconds:
+            amps = self.inrush_amps if into_cycle < self.inrush_seconds else self.compressor_amps
+            return STATE_COMPRESSOR, amps, into_cycle
+        return STATE_OFF, self.idle_amps, into_cycle - self.on_seconds
+
+    def temperature_rate(self, t: float) -> float:
+        state = self.state(t)[0]
+        if state == STATE_COMPRESSOR:
+            return self.cool_rate
+        if state == STATE_HEATER:
+            return self.heat_rate
+        return self.warm_rate
+
+    def scaled(self, factor: float) -> "CompressorProfile":
+        # 시간 축만 1/factor 로 압축 (1분 벤치마크에서 제상까지 보이도록)
+        return self._replace(
+            on_seconds=self.on_seconds / factor, off_seconds=self.off_seconds / factor,
+            defrost_every=self.defrost_every / factor, defrost_seconds=self.defrost_seconds / factor,
+            cool_rate=self.cool_rate * factor, warm_rate=self.warm_rate * factor, heat_rate=self.heat_rate * factor,
+        )
+
+# 1분 안에 압축기 기동/정지와 제상이 모두 나오는 벤치마크용 패턴
+FAST_PROFILE = CompressorProfile().scaled(30.0)
+
+# ==============================================================================
+# 2. 가짜 ADS1115 (Adafruit_ADS1x15.ADS1115 대역)
+# ==============================================================================
+class FakeAds1115:
+    # Ads1115Backend(adc=FakeAds1115(...)) 로 사용. 값은 벽시계 기준 (epoch 를 맞추면 다른 프로세스와 같은 상태)
+    def __init__(self, profile: CompressorProfile = CompressorProfile(), cal_factor=30.0, frequency=60.0,
+                 dc_volts=0.0, noise_amps=0.02, epoch=None, seed=None):
+        self.profile = profile
+        self.cal_factor = cal_factor
+        self.frequency = frequency
+        self.dc_volts = dc_volts
+        self.noise_amps = noise_amps
+        self.epoch = time.time() if epoch is None else epoch
+        self.gain = 1
+        self.reads = 0
+        self._rng = random.Random(seed)
+
+    def start_adc(self, channel, gain=1, data_rate=None):
+        self.gain = gain
+
+    def stop_adc(self):
+        pass
+
+    def get_last_result(self) -> int:
+        t = time.time() - self.epoch
+        _, amps, _ = self.profile.state(t)
+        value = amps * math.sqrt(2) * math.sin(2 * math.pi * self.frequency * t)
+        if self.noise_amps:
+            value += self._rng.gauss(0, self.noise_amps)
+        volts = value / self.cal_factor + self.dc_volts
+        self.reads += 1
+        counts = int(round(volts / ADS1115_FULL_SCALE[self.gain] * BIT_RESOLUTION))
+        return max(-32768, min(32767, counts))
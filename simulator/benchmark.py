@@ -0,0 +1,200 @@
+import os
+import sys
+import time
+import argparse
+import logging
+import resource
+import tempfile
+import threading
+import multiprocessing
+from collections import defaultdict
+from typing import Dict, List
+
+# python simulator/benchmark.py 로 실행해도 저장소 루트 모듈을 찾도록
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from simulator.ads1115 import CompressorProfile, FakeAds1115
+from simulator.w1_sysfs import FakeW1Tree
+from simulator.fox_mr20 import FakeFoxMr20
+from simulator.mock_api import MockApiServer
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+BENCH_SECONDS = 60
+TIME_SCALE = 30.0 # 압축기/제상 패턴 시간 압축 배율 (1분 안에 제상까지)
+REFRIGERATOR_NUMBER = "NO.1-1"
+PROBES = {'28-00000000bc01': 'center', '28-00000000bc02': 'door'}
+START_TEMPERATURE = 4.0
+PLANT_STEP_SECONDS = 1.0
+
+# ==============================================================================
+# 1. 가짜 장치 프로세스 (FOX-MR20 pty + NAS API + 캐비닛 온도 모델)
+# ==============================================================================
+def _device_process(conn, w1_dir: str, profile: CompressorProfile, epoch: float, api_latency: float):
+    # 에이전트와 다른 프로세스에서 돌려서 에이전트 CPU/메모리만 측정되도록
+    tree = FakeW1Tree(base_dir=w1_dir)
+    with FakeFoxMr20() as fox, MockApiServer(latency=api_latency) as api:
+        conn.send({'fox_port': fox.port, 'api_url': api.base_url})
+        temperature = START_TEMPERATURE
+        last = time.time()
+        while not conn.poll(PLANT_STEP_SECONDS):
+            now = time.time()
+            temperature += profile.temperature_rate(now - epoch) * (now - last)
+            last = now
+            for i, probe_id in enumerate(PROBES):
+                tree.set_temperature(probe_id, temperature + 0.3 * i)
+            fox.set_temperature(temperature - 0.2)
+        conn.recv()
+        conn.send(dict(api.stats(), modbus_requests=fox.requests))
+
+# ==============================================================================
+# 2. 단계별 시간 수집
+# ==============================================================================
+class StageTimer:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock() # 버스/업로드 스레드에서도 기록
+
+    def observe(self, task, duration: float):
+        # AgentRuntime.observers 용
+        self.add(task.name, duration)
+
+    def add(self, stage: str, duration: float):
+        with self._lock:
+            self.samples[stage].append(duration)
+
+    def timed(self, stage: str, func):
+        def _wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - t0)
+        return _wrapper
+
+def percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def _rss_bytes() -> int:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+# ==============================================================================
+# 3. 실제 main() 구동
+# ==============================================================================
+def run(seconds=BENCH_SECONDS, time_scale=TIME_SCALE, upload_max_wait=None, api_latency=0.0, workdir=None,
+        metrics_port=0) -> dict:
+    workdir = workdir or tempfile.mkdtemp(prefix='agent_bench_')
+    profile = CompressorProfile().scaled(time_scale)
+    epoch = time.time()
+    w1 = FakeW1Tree({probe_id: START_TEMPERATURE for probe_id in PROBES}, base_dir=os.path.join(workdir, 'w1'))
+
+    conn, child_conn = multiprocessing.Pipe()
+    devices = multiprocessing.Process(target=_device_process, daemon=True,
+                                      args=(child_conn, w1.base_dir, profile, epoch, api_latency))
+    devices.start()
+    info = conn.recv()
+
+    cwd = os.getcwd()
+    os.chdir(workdir) # refrigerator.log, 업로드 큐 DB 를 작업 디렉터리에
+    try:
+        import fox_registers
+        import refrigerator_update as agent
+        from agent_runtime import AgentRuntime
+        from sensor_drivers import Sct013Driver, Ds18b20Driver, FoxMr20Driver
+
+        agent.configure_logging(console_level=logging.WARNING)
+        timer = StageTimer()
+        agent.TEMP_API_BASE_URL = f"{info['api_url']}/api/refrigerator/raspi"
+        agent.DATA_POST_URL = f"{info['api_url']}/api/temperature"
+        agent.LOCAL_API_ENABLED = False
+        agent.METRICS_BIND, agent.METRICS_PORT_NUMBER = "127.0.0.1", metrics_port
+        agent.HISTORY_PATH = os.path.join(workdir, 'history')
+        agent.SETTINGS_SNAPSHOT = os.path.join(workdir, 'settings_snapshot.json')
+        if upload_max_wait is not None:
+            agent.UPLOAD_MAX_WAIT_SECONDS = upload_max_wait
+        # Modbus 트랜잭션과 HTTP 업로드는 태스크 안쪽 단계라 별도로 측정
+        fox_registers.transact = timer.timed('modbus_transaction', fox_registers.transact)
+
+        class TimedUploader(agent.BatchUploader):
+            def send(self, records):
+                return timer.timed('http_upload', super().send)(records)
+        agent.BatchUploader = TimedUploader
+
+        drivers = [
+            Sct013Driver(adc=FakeAds1115(profile, epoch=epoch)),
+            Ds18b20Driver(probes=PROBES, primary='center', base_dir=w1.base_dir + '/'),
+            FoxMr20Driver(port=info['fox_port'], slaves=[{'slave_id': 1, 'period': 2}]),
+        ]
+        runtime = AgentRuntime()
+        runtime.observers.append(timer.observe)
+        at_stop = {}
+
+        def _stop():
+            # 종료 직전 (모든 스레드가 살아 있을 때) 상태
+            at_stop.update(rss=_rss_bytes(), threads=threading.active_count())
+            runtime.stop()
+        threading.Timer(seconds, _stop).start()
+
+        usage0 = resource.getrusage(resource.RUSAGE_SELF)
+        wall0 = time.monotonic()
+        agent.main(REFRIGERATOR_NUMBER, "bench", drivers, runtime=runtime)
+        wall = time.monotonic() - wall0
+        usage1 = resource.getrusage(resource.RUSAGE_SELF)
+    finally:
+        os.chdir(cwd)
+        conn.send('stop')
+        api_stats = conn.recv() if conn.poll(5.0) else {}
+        devices.join(timeout=5.0)
+        w1.cleanup()
+
+    cpu_user = usage1.ru_utime - usage0.ru_utime
+    cpu_sys = usage1.ru_stime - usage0.ru_stime
+    return {
+        'seconds': wall,
+        'stages': {name: list(values) for name, values in timer.samples.items()},
+        'cpu_percent': 100.0 * (cpu_user + cpu_sys) / wall,
+        'cpu_user': cpu_user,
+        'cpu_sys': cpu_sys,
+        'rss_bytes': at_stop['rss'],
+        'max_rss_bytes': max(usage1.ru_maxrss * 1024, at_stop['rss']), # ru_maxrss 는 리눅스에서 KB 단위
+        'threads': at_stop['threads'],
+        'api': api_stats,
+    }
+
+# ==============================================================================
+# 4. 결과 출력
+# ==============================================================================
+def report(result: dict):
+    print(f"에이전트 벤치마크: {result['seconds']:.1f}초")
+    print(f"{'단계':<20}{'횟수':>6}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)")
+    for name in sorted(result['stages']):
+        values = result['stages'][name]
+        if not values:
+            continue
+        row = [percentile(values, p) * 1e3 for p in (50, 90, 99)] + [max(values) * 1e3]
+        print(f"{name:<20}{len(values):>6}" + "".join(f"{v:>10.2f}" for v in row))
+    print(f"CPU {result['cpu_percent']:.1f}% (user {result['cpu_user']:.2f}s, sys {result['cpu_sys']:.2f}s), "
+          f"RSS {result['rss_bytes'] / 2**20:.1f} MB (최대 {result['max_rss_bytes'] / 2**20:.1f} MB), "
+          f"스레드 {result['threads']}개")
+    api = result['api']
+    if api:
+        delays = api['delays']
+        delay_text = (f", 측정->수신 p50 {percentile(delays, 50):.1f}s / max {max(delays):.1f}s"
+                      if delays else "")
+        print(f"NAS API: 설정 조회 {api['settings_requests']}회 (304 {api['not_modified']}회), "
+              f"업로드 {api['upload_requests']}회 / 레코드 {api['records']}건 / {api['bytes_received']} 바이트"
+              f"{delay_text}, FOX-MR20 요청 {api['modbus_requests']}회")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 장치로 refrigerator_update.main() 을 구동하는 벤치마크")
+    parser.add_argument('--seconds', type=float, default=BENCH_SECONDS)
+    parser.add_argument('--time-scale', type=float, default=TIME_SCALE, help="운전 패턴 시간 압축 배율")
+    parser.add_argument('--upload-max-wait', type=float, help="배치 최대 대기 (기본은 에이전트 설정)")
+    parser.add_argument('--api-latency', type=float, default=0.0, help="가짜 NAS 응답 지연 (초)")
+    args = parser.parse_args()
+    report(run(args.seconds, args.time_scale, args.upload_max_wait, args.api_latency))
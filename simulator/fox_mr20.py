@@ -0,0 +1,138 @@
+import os
+import pty
+import tty
+import time
+import select
+import struct
+import threading
+from typing import Dict, Iterable
+
+from modbus import (
+    crc16_modbus, check_crc, char_time,
+    READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS,
+    WRITE_SINGLE_REGISTER, WRITE_MULTIPLE_REGISTERS, EXCEPTION_FLAG,
+)
+
+# ==============================================================================
+# 0. 기본 레지스터 값 (FOX-MR20, 온도는 x10 스케일)
+# ==============================================================================
+DEFAULT_HOLDING = {0x0002: 30, 0x0003: 0, 0x0004: 2, 0x0012: 20}
+DEFAULT_INPUT = {0x0064: 35}
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+
+# ==============================================================================
+# 1. pty 기반 가짜 FOX-MR20 슬레이브
+# ==============================================================================
+class FakeFoxMr20:
+    # self.port 를 serial.Serial(port=...) 에 그대로 넘기면 실제 장치처럼 응답
+    def __init__(self, slave_ids: Iterable[int] = (1,), baudrate=9600, simulate_wire_time=True):
+        self.baudrate = baudrate
+        self.simulate_wire_time = simulate_wire_time
+        self.holding: Dict[int, Dict[int, int]] = {s: dict(DEFAULT_HOLDING) for s in slave_ids}
+        self.input: Dict[int, Dict[int, int]] = {s: dict(DEFAULT_INPUT) for s in slave_ids}
+        self.silent_slaves = set() # 응답하지 않는 슬레이브 (장애 시뮬레이션)
+        self.requests = 0
+        self.port = None
+        self._master = None
+        self._slave = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="fake-fox-mr20", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def set_temperature(self, celsius: float, slave_id=1):
+        self.input[slave_id][0x0064] = int(round(celsius * 10)) & 0xFFFF
+
+    # --------------------------------------------------------------------------
+    def _request_length(self, buf: bytes):
+        if len(buf) < 2:
+            return None
+        if buf[1] == WRITE_MULTIPLE_REGISTERS:
+            return 9 + buf[6] if len(buf) >= 7 else None
+        return 8
+
+    def _run(self):
+        gap = 3.5 * char_time(self.baudrate)
+        buf = b''
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._master], [], [], 0.05 if not buf else gap)
+            if not ready:
+                buf = b'' # 프레임 간격 동안 조용하면 미완성 조각은 버림
+                continue
+            try:
+                buf += os.read(self._master, 256)
+            except OSError:
+                return
+            while True:
+                length = self._request_length(buf)
+                if length is None or len(buf) < length:
+                    break
+                frame, buf = buf[:length], buf[length:]
+                response = self.handle(frame)
+                if response:
+                    if self.simulate_wire_time:
+                        time.sleep((len(frame) + len(response)) * char_time(self.baudrate))
+                    os.write(self._master, response)
+
+    def handle(self, frame: bytes) -> bytes:
+        if not check_crc(frame):
+            return b''
+        slave_id, function_code = frame[0], frame[1]
+        if slave_id not in self.holding or slave_id in self.silent_slaves:
+            return b''
+        self.requests += 1
+
+        def exception(code):
+            pdu = bytes([slave_id, function_code | EXCEPTION_FLAG, code])
+            return pdu + crc16_modbus(pdu)
+
+        def reply(pdu):
+            return pdu + crc16_modbus(pdu)
+
+        if function_code in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+            address, count = struct.unpack_from('>HH', frame, 2)
+            table = self.holding[slave_id] if function_code == READ_HOLDING_REGISTERS else self.input[slave_id]
+            addresses = range(address, address + count)
+            if any(a not in table for a in addresses):
+                return exception(ILLEGAL_DATA_ADDRESS)
+            values = [table[a] for a in addresses]
+            return reply(struct.pack(f'>BBB{count}H', slave_id, function_code, count * 2, *values))
+        if function_code == WRITE_SINGLE_REGISTER:
+            address, value = struct.unpack_from('>HH', frame, 2)
+            if address not in self.holding[slave_id]:
+                return exception(ILLEGAL_DATA_ADDRESS)
+            self.holding[slave_id][address] = value
+            return reply(frame[:6])
+        if function_code == WRITE_MULTIPLE_REGISTERS:
+            address, count = struct.unpack_from('>HH', frame, 2)
+            values = struct.unpack_from(f'>{count}H', frame, 7)
+            if any(a not in self.holding[slave_id] for a in range(address, address + count)):
+                return exception(ILLEGAL_DATA_ADDRESS)
+            for i, value in enumerate(values):
+                self.holding[slave_id][address + i] = value
+            return reply(frame[:6])
+        return exception(ILLEGAL_FUNCTION)
@@ -0,0 +1,162 @@
+import gzip
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+# ==============================================================================
+# 0. 기본 냉장고 목록 (/api/refrigerator/raspi 응답의 data 항목)
+# ==============================================================================
+DEFAULT_REFRIGERATORS = [
+    {'refrigerator_number': "NO.1-1", 'refrigerator_id': 1, 'setting_temp_value': 3.0,
+     'temp_gap': 2.0, 'defrost_time': 20},
+]
+
+# ==============================================================================
+# 1. NAS API 대역 (설정 조회 + 측정값 업로드)
+# ==============================================================================
+class MockApiServer:
+    # with MockApiServer() as api: SettingsSync(api.settings_url, ...), BatchUploader(api.upload_url)
+    def __init__(self, host="127.0.0.1", port=0, refrigerators: Optional[List[dict]] = None, latency=0.0):
+        self.refrigerators = [dict(r) for r in (refrigerators or DEFAULT_REFRIGERATORS)]
+        self.latency = latency # 응답 전 지연 (느린 NAS 흉내)
+        self.version = 1
+        self.settings_requests = 0
+        self.not_modified = 0
+        self.upload_requests = 0
+        self.records = 0
+        self.bytes_received = 0
+        self.delays: List[float] = [] # 레코드 measured_at -> 수신까지 (초)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def settings_url(self) -> str:
+        return f"{self.base_url}/api/refrigerator/raspi"
+
+    @property
+    def upload_url(self) -> str:
+        return f"{self.base_url}/api/temperature"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def update(self, refrigerator_number: str, **fields):
+        # 관리 화면에서 설정을 바꾼 것처럼 (ETag 가 바뀜)
+        with self._lock:
+            for item in self.refrigerators:
+                if item['refrigerator_number'] == refrigerator_number:
+                    item.update(fields)
+            self.version += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'settings_requests': self.settings_requests,
+                'not_modified': self.not_modified,
+                'upload_requests': self.upload_requests,
+                'records': self.records,
+                'bytes_received': self.bytes_received,
+                'delays': list(self.delays),
+            }
+
+    # --------------------------------------------------------------------------
+    def _settings_body(self):
+        with self._lock:
+            body = json.dumps({'data': self.refrigerators}, ensure_ascii=False).encode('utf-8')
+            etag = f'"{self.version}-{hashlib.sha1(body).hexdigest()[:12]}"'
+        return body, etag
+
+    def _received(self, body: bytes, raw_length: int):
+        records = json.loads(body)
+        if isinstance(records, dict):
+            records = [records]
+        now = time.time()
+        delays = []
+        for record in records:
+            try:
+                measured = datetime.strptime(record.get('measured_at') or '', "%Y-%m-%dT%H:%M:%S%z").timestamp()
+                delays.append(now - measured)
+            except ValueError:
+                pass
+        with self._lock:
+            self.upload_requests += 1
+            self.records += len(records)
+            self.bytes_received += raw_length
+            self.delays.extend(delays)
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status, body=b'', headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if body and self.command != 'HEAD':
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                if api.latency:
+                    time.sleep(api.latency)
+                if not urlsplit(self.path).path.startswith('/api/refrigerator/raspi'):
+                    return self._reply(404)
+                body, etag = api._settings_body()
+                with api._lock:
+                    api.settings_requests += 1
+                    if self.headers.get('If-None-Match') == etag:
+                        api.not_modified += 1
+                        not_modified = True
+                    else:
+                        not_modified = False
+                if not_modified:
+                    return self._reply(304, headers={'ETag': etag})
+                self._reply(200, body, {'Content-Type': 'application/json', 'ETag': etag})
+
+            def do_POST(self):
+                if api.latency:
+                    time.sleep(api.latency)
+                length = int(self.headers.get('Content-Length', 0))
+                raw = self.rfile.read(length)
+                if urlsplit(self.path).path != '/api/temperature':
+                    return self._reply(404)
+                body = gzip.decompress(raw) if self.headers.get('Content-Encoding') == 'gzip' else raw
+                try:
+                    api._received(body, len(raw))
+                except ValueError:
+                    return self._reply(400)
+                self._reply(201)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,148 @@
+import struct
+import asyncio
+import threading
+from typing import Dict, List, Tuple
+
+from mqtt_channel import (
+    read_packet, packet, encode_string, topic_matches,
+    CONNECT, CONNACK, PUBLISH, PUBACK, SUBSCRIBE, SUBACK, PINGREQ, PINGRESP, DISCONNECT,
+)
+
+# ==============================================================================
+# 1. 프로세스 내 MQTT 브로커 (Mosquitto 대용, QoS 0/1 + retained + will)
+# ==============================================================================
+class StubBroker:
+    # with StubBroker() as broker: MqttClient("127.0.0.1", broker.port)
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.retained: Dict[str, bytes] = {}
+        self.published: List[Tuple[str, bytes]] = [] # 클라이언트가 발행한 메시지 (검사용)
+        self.clients = 0
+        self.drop_publishes = 0 # 이 수만큼 클라이언트의 QoS 1 발행을 PUBACK 없이 끊음 (응답 유실 시뮬레이션)
+        self._sessions = {} # writer -> 구독 필터 목록
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stub-mqtt-broker", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            for writer in list(self._sessions):
+                writer.close()
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+    def publish(self, topic: str, payload: bytes, retain=False):
+        # 테스트에서 서버 역할로 발행 (다른 스레드에서 호출 가능)
+        self._loop.call_soon_threadsafe(self._route, topic, payload, retain)
+
+    def inject(self, data: bytes):
+        # 접속한 모든 클라이언트에 원시 바이트를 그대로 (깨진 패킷 시뮬레이션)
+        self._loop.call_soon_threadsafe(lambda: [w.write(data) for w in list(self._sessions)])
+
+    def disconnect_all(self):
+        # 네트워크 단절 시뮬레이션 (클라이언트의 will 발행)
+        self._loop.call_soon_threadsafe(lambda: [w.close() for w in list(self._sessions)])
+
+    # --------------------------------------------------------------------------
+    def _route(self, topic: str, payload: bytes, retain: bool):
+        if retain:
+            if payload:
+                self.retained[topic] = payload
+            else:
+                self.retained.pop(topic, None)
+        for writer, filters in list(self._sessions.items()):
+            if any(topic_matches(f, topic) for f in filters):
+                writer.write(packet(PUBLISH, encode_string(topic) + payload))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        will = None
+        clean_exit = False
+        try:
+            header, body = await read_packet(reader)
+            if header != CONNECT:
+                return
+            flags = body[7]
+            pos = 10
+            client_len = struct.unpack_from('>H', body, pos)[0]
+            pos += 2 + client_len
+            if flags & 0x04:
+                topic_len = struct.unpack_from('>H', body, pos)[0]
+                topic = body[pos + 2:pos + 2 + topic_len].decode('utf-8')
+                pos += 2 + topic_len
+                message_len = struct.unpack_from('>H', body, pos)[0]
+                will = (topic, body[pos + 2:pos + 2 + message_len], bool(flags & 0x20))
+            writer.write(packet(CONNACK, b'\x00\x00'))
+            self._sessions[writer] = []
+            self.clients += 1
+            while True:
+                header, body = await read_packet(reader)
+                kind = header & 0xF0
+                if kind == PUBLISH:
+                    qos = (header >> 1) & 0x03
+                    topic_len = struct.unpack_from('>H', body)[0]
+                    topic = body[2:2 + topic_len].decode('utf-8')
+                    pos = 2 + topic_len
+                    if qos:
+                        if self.drop_publishes:
+                            self.drop_publishes -= 1
+                            return
+                        writer.write(packet(PUBACK, body[pos:pos + 2]))
+                        pos += 2
+                    self.published.append((topic, body[pos:]))
+                    self._route(topic, body[pos:], bool(header & 0x01))
+                elif kind == SUBSCRIBE:
+                    packet_id = body[:2]
+                    pos, granted = 2, b''
+                    while pos < len(body):
+                        topic_len = struct.unpack_from('>H', body, pos)[0]
+                        topic = body[pos + 2:pos + 2 + topic_len].decode('utf-8')
+                        pos += 2 + topic_len + 1
+                        self._sessions[writer].append(topic)
+                        granted += b'\x00'
+                    writer.write(packet(SUBACK, packet_id + granted))
+                    for retained_topic, payload in self.retained.items():
+                        if any(topic_matches(f, retained_topic) for f in self._sessions[writer]):
+                            writer.write(packet(PUBLISH | 0x01, encode_string(retained_topic) + payload))
+                elif kind == PINGREQ:
+                    writer.write(packet(PINGRESP))
+                elif kind == DISCONNECT:
+                    clean_exit = True
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        finally:
+            self._sessions.pop(writer, None)
+            writer.close()
+            if will is not None and not clean_exit:
+                self._route(*will)
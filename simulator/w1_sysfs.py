@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional
+
+# ==============================================================================
+# 가짜 /sys/bus/w1/devices 트리 (W1Bus(base_dir=...) 에 그대로 넘겨서 사용)
+# ==============================================================================
+class FakeW1Tree:
+    def __init__(self, sensors: Optional[Dict[str, float]] = None, base_dir=None,
+                 bulk_read=True, temperature_attr=False):
+        self._own_dir = base_dir is None
+        self.base_dir = base_dir or tempfile.mkdtemp(prefix='w1_devices_')
+        self.bulk_read = bulk_read
+        self.temperature_attr = temperature_attr # 최신 커널의 temperature 속성 흉내
+        master = os.path.join(self.base_dir, 'w1_bus_master1')
+        os.makedirs(master, exist_ok=True)
+        if bulk_read:
+            with open(os.path.join(master, 'therm_bulk_read'), 'w') as f:
+                f.write('0\n')
+        for sensor_id, celsius in (sensors or {}).items():
+            self.set_temperature(sensor_id, celsius)
+
+    def set_temperature(self, sensor_id: str, celsius: float, crc_ok=True):
+        device_dir = os.path.join(self.base_dir, sensor_id)
+        os.makedirs(device_dir, exist_ok=True)
+        milli = int(round(celsius * 1000))
+        raw = (milli * 16 // 1000) & 0xFFFF
+        scratch = f"{raw & 0xFF:02x} {raw >> 8:02x} 4b 46 7f ff 0c 10 1c"
+        with open(os.path.join(device_dir, 'w1_slave'), 'w') as f:
+            f.write(f"{scratch} : crc=1c {'YES' if crc_ok else 'NO'}\n")
+            f.write(f"{scratch} t={milli}\n")
+        if self.temperature_attr:
+            with open(os.path.join(device_dir, 'temperature'), 'w') as f:
+                f.write(f"{milli}\n")
+
+    def remove(self, sensor_id: str):
+        shutil.rmtree(os.path.join(self.base_dir, sensor_id), ignore_errors=True)
+
+    def cleanup(self):
+        if self._own_dir:
+            shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
@@ -2,7 +2,7 @@
 
 # 첫 번째 Chromium 창: HDMI-1 (왼쪽 모니터)
 chromium-browser \
-  --kiosk --new-window "http://192.168.7.152:5173/kiosk/test2/NO.1-1/" \
+  --kiosk --new-window "http://127.0.0.1:8080/" \
   --window-position=0,0 \
   --user-data-dir=/tmp/profile1 &
 
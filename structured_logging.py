@@ -0,0 +1,239 @@
+import os
+import sys
+import glob
+import gzip
+import json
+import time
+import queue
+import shutil
+import atexit
+import logging
+import logging.handlers
+from typing import Dict, Optional
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+LOG_PATH = "refrigerator.log"
+LOG_MAX_BYTES = 5 * 2**20 # 이 크기를 넘으면 회전
+LOG_ROTATE_SECONDS = 86400 # 또는 하루마다 회전
+LOG_BACKUPS = 14 # 보관할 압축 파일 수
+CONSOLE_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+# 서브시스템(로거 이름)별 기본 레벨. 프로토콜 덤프(modbus 등)는 DEBUG 로 기록하므로 INFO 면 남지 않음
+DEFAULT_LEVELS: Dict[str, str] = {}
+
+_listener = None
+_console = None
+
+# ==============================================================================
+# 1. JSON lines 포맷 (리스너 스레드에서 포맷)
+# ==============================================================================
+class JsonLinesFormatter(logging.Formatter):
+    # {"ts":..., "level":..., "logger":..., "msg":..., <extra={'fields': {...}} 의 키>}
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            for key, value in fields.items():
+                entry.setdefault(key, value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str, separators=(',', ':'))
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    # 기본 QueueHandler.prepare() 는 호출 스레드에서 메시지를 포맷함 -> 트레이스백만 문자열로 만들고 나머지는 리스너에서
+    # (args/fields 로 넘긴 객체는 기록 뒤에 바꾸지 않아야 함)
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+# ==============================================================================
+# 2. 크기/시간 회전 + gzip 압축
+# ==============================================================================
+class CompressedRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    # refrigerator.log -> refrigerator.log.20240101-000000.gz, 최근 backups 개만 보관
+    def __init__(self, filename=LOG_PATH, max_bytes=LOG_MAX_BYTES, rotate_seconds=LOG_ROTATE_SECONDS,
+                 backups=LOG_BACKUPS, encoding="utf-8"):
+        super().__init__(filename, 'a', encoding=encoding, delay=False)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backups = backups
+        self.rollover_at = self._next_rollover(time.time())
+        self.rotations = 0
+
+    def _next_rollover(self, now: float) -> float:
+        return now + self.rotate_seconds if self.rotate_seconds else float('inf')
+
+    def shouldRollover(self, record) -> bool:
+        if time.time() >= self.rollover_at:
+            return True
+        # 레코드 길이까지 포맷해서 재지 않고 현재 크기만 (최대 한 줄 초과)
+        return bool(self.max_bytes) and self.stream is not None and self.stream.tell() >= self.max_bytes
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        now = time.time()
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+            target = f"{self.baseFilename}.{stamp}"
+            n = 1
+            while os.path.exists(target + ".gz"):
+                target = f"{self.baseFilename}.{stamp}-{n}"
+                n += 1
+            os.replace(self.baseFilename, target)
+            try:
+                with open(target, 'rb') as src, gzip.open(target + ".gz", 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(target)
+            except OSError as e:
+                sys.stderr.write(f"로그 압축 실패 ({target}): {e}\n")
+            self._prune()
+            self.rotations += 1
+        self.stream = self._open()
+        self.rollover_at = self._next_rollover(now)
+
+    def _prune(self):
+        # 오래된 순 (같은 초에 여러 번 회전하면 접미사 없는 것, -1, -2 ... 순)
+        rotated = sorted(glob.glob(glob.escape(self.baseFilename) + ".*.gz"),
+                         key=lambda path: (int(os.path.getmtime(path)), len(path), path))
+        for path in rotated[:max(0, len(rotated) - self.backups)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+# ==============================================================================
+# 3. 설정 (루트 로거 -> 큐 -> 리스너 스레드 -> 파일/콘솔)
+# ==============================================================================
+def setup_logging(path=LOG_PATH, level="INFO", levels: Optional[Dict[str, str]] = None, json_lines=True,
+                  max_bytes=LOG_MAX_BYTES, rotate_seconds=LOG_ROTATE_SECONDS, backups=LOG_BACKUPS,
+                  console=True, console_level=None) -> logging.handlers.QueueListener:
+    # 호출 스레드는 레코드를 큐에 넣기만 함 (SD 카드 쓰기/포맷/압축은 리스너 스레드). 두 번째 호출부터는 레벨만 갱신
+    global _listener, _console
+    root = logging.getLogger()
+    root.setLevel(level)
+    for name, name_level in dict(DEFAULT_LEVELS, **(levels or {})).items():
+        logging.getLogger(name).setLevel(name_level)
+    if _listener is not None:
+        if console_level is not None:
+            set_console_level(console_level)
+        return _listener
+
+    file_handler = CompressedRotatingFileHandler(path, max_bytes, rotate_seconds, backups)
+    file_handler.setFormatter(JsonLinesFormatter() if json_lines else logging.Formatter(CONSOLE_FORMAT))
+    handlers = [file_handler]
+    if console:
+        _console = logging.StreamHandler()
+        _console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        if console_level is not None:
+            _console.setLevel(console_level)
+        handlers.append(_console)
+
+    log_queue = queue.SimpleQueue()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(LazyQueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+def set_console_level(level):
+    # 콘솔 점검 모드: 화면에는 출력 줄만, 로그는 파일에
+    if _console is not None:
+        _console.setLevel(level)
+
+def shutdown_logging():
+    # 큐에 남은 레코드를 모두 쓰고 파일을 닫음
+    global _listener, _console
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, LazyQueueHandler):
+            root.removeHandler(handler)
+    _listener = _console = None
+
+# ==============================================================================
+# 4. 벤치마크: 주기당 로깅 비용과 하루 기록량 (기존 FileHandler + INFO 전체 덤프 대비)
+# ==============================================================================
+def _sample_record() -> dict:
+    return {
+        "temperature_value": "3.25", "out_temperature_value": "3.1", "setting_temp_value": "3.0",
+        "current_value": "2.41", "refrigerator_id": 1, "raspi_ip": "192.168.0.21", "raspi_serial": "10000000abcdef01",
+        "measured_at": "2024-01-01T12:00:00+0900", "compressor_state": "compressor",
+        "duty_cycle_1h": 0.41, "duty_cycle_24h": 0.38,
+        "controller_registers": {"probe_temp": 3.1, "set_temp": 3.0, "diff": 2.0, "defrost_interval": 6,
+                                 "defrost_time": 20, "status": 1},
+        "probe_temperatures": [{"id": "28-00000000bc01", "location": "center", "temperature": 3.25},
+                               {"id": "28-00000000bc02", "location": "door", "temperature": 3.5}],
+    }
+
+def benchmark(cycles=2000, period=10.0):
+    import tempfile
+    record = _sample_record()
+    per_day = 86400 / period
+    workdir = tempfile.mkdtemp(prefix="log_bench_")
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    try:
+        # 기존: 루트에 FileHandler, 매 주기 INFO 로 레코드 전체를 f-string 으로
+        before_path = os.path.join(workdir, "before.log")
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        before = logging.FileHandler(before_path, encoding="utf-8")
+        before.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+        root.addHandler(before)
+        root.setLevel(logging.INFO)
+        t0 = time.perf_counter()
+        for _ in range(cycles):
+            logging.info(f"전송할 데이터: {record}")
+        before_cost = (time.perf_counter() - t0) / cycles
+        before.close()
+        root.removeHandler(before)
+        before_bytes = os.path.getsize(before_path) / cycles
+
+        # 변경: 큐 + JSON lines, 레코드 덤프는 DEBUG (INFO 운영에서는 레벨 확인만)
+        after_path = os.path.join(workdir, "after.log")
+        setup_logging(after_path, level="INFO", console=False)
+        logger = logging.getLogger("refrigerator_update")
+        t0 = time.perf_counter()
+        for _ in range(cycles):
+            logger.debug("전송할 데이터", extra={'fields': {'record': record}})
+        after_cost = (time.perf_counter() - t0) / cycles
+        logger.setLevel(logging.DEBUG)
+        t0 = time.perf_counter()
+        for _ in range(cycles):
+            logger.debug("전송할 데이터", extra={'fields': {'record': record}})
+        debug_cost = (time.perf_counter() - t0) / cycles
+        shutdown_logging()
+        debug_bytes = os.path.getsize(after_path) / cycles
+    finally:
+        shutdown_logging()
+        root.handlers[:], root.level = saved
+        logging.getLogger("refrigerator_update").setLevel(logging.NOTSET)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"주기 {period:.0f}초 (하루 {per_day:.0f}주기), 레코드 덤프 1건 기준")
+    print(f"  기존 (FileHandler, INFO f-string): 호출 {before_cost * 1e6:.1f} µs/주기, "
+          f"{before_bytes:.0f} 바이트/주기 -> {before_bytes * per_day / 2**20:.1f} MB/일")
+    print(f"  변경 (큐, INFO 운영): 호출 {after_cost * 1e6:.2f} µs/주기, 0 바이트/주기 -> 0 MB/일")
+    print(f"  변경 (큐, DEBUG 켬): 호출 {debug_cost * 1e6:.1f} µs/주기 (포맷/쓰기는 리스너 스레드), "
+          f"{debug_bytes:.0f} 바이트/주기 -> {debug_bytes * per_day / 2**20:.1f} MB/일")
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,90 @@
+import os
+import sys
+
+# 모듈이 저장소 최상위에 평평하게 있으므로 (패키지 아님) 테스트에서 바로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+class StubServer:
+    # 로컬 NAS API 대역: respond(body, headers) -> 상태 코드 (None 이면 응답 없이 연결을 끊음 = 통신 장애)
+    # GET 은 respond_get(headers) -> (상태 코드, 본문 bytes, 응답 헤더 dict)
+    def __init__(self):
+        self.received = [] # 성공 응답한 레코드 (도착 순서)
+        self.requests = [] # (상태 코드, Content-Encoding, 레코드 수)
+        self.get_requests = [] # (상태 코드, 요청 헤더 dict)
+        self.respond = lambda body, headers: 201
+        self.respond_get = lambda headers: (404, b'', {})
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                encoding = self.headers.get('Content-Encoding')
+                if encoding == 'gzip':
+                    data = gzip.decompress(data)
+                body = json.loads(data)
+                with stub.lock:
+                    status = stub.respond(body, self.headers)
+                    records = body if isinstance(body, list) else [body]
+                    stub.requests.append((status, encoding, len(records)))
+                    if status is not None and 200 <= status < 300:
+                        stub.received.extend(records)
+                if status is None:
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                with stub.lock:
+                    status, body, headers = stub.respond_get(self.headers)
+                    stub.get_requests.append((status, dict(self.headers)))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/temperature"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
+
+@pytest.fixture
+def fake_fox():
+    # pty 위의 가짜 FOX-MR20 (슬레이브 1, 2). 선 위 전송 시간은 빼서 테스트를 빠르게
+    from simulator.fox_mr20 import FakeFoxMr20
+    with FakeFoxMr20(slave_ids=(1, 2), simulate_wire_time=False) as fox:
+        yield fox
+
+@pytest.fixture
+def fox_serial(fake_fox):
+    serial = pytest.importorskip("serial")
+    port = serial.Serial(port=fake_fox.port, baudrate=9600, timeout=1)
+    yield port
+    port.close()
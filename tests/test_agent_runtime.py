@@ -0,0 +1,93 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from agent_runtime import AgentRuntime
+
+def run_for(runtime, seconds, during=None):
+    # runtime.run() 을 seconds 동안 돌리고 멈춤. during() 은 시작 직후 기다리는 코루틴 (주기 변경 등)
+    async def main():
+        runner = asyncio.ensure_future(runtime.run())
+        if during is not None:
+            await during()
+        await asyncio.sleep(seconds)
+        runtime.stop()
+        await asyncio.wait_for(runner, 2)
+    asyncio.run(main())
+
+def test_slots_stay_on_monotonic_grid():
+    runtime = AgentRuntime()
+    starts = []
+
+    def read():
+        starts.append(time.monotonic())
+        time.sleep(0.02) # 실행 시간이 주기에 더해지지 않아야 함
+        return 1
+    task = runtime.add_task('sensor', read, 0.1)
+    run_for(runtime, 1.05)
+    assert 9 <= len(starts) <= 11
+    offsets = [t - (starts[0] + k * 0.1) for k, t in enumerate(starts)]
+    # 슬롯마다 오차가 누적되지 않음 (sleep(period) 반복이면 k * 20ms 씩 밀려 마지막엔 ~200ms)
+    assert max(abs(o) for o in offsets) < 0.05
+    assert task.overruns == 0 and len(starts) - 1 <= task.runs <= len(starts) # 마지막 실행은 stop 에 취소될 수 있음
+    assert runtime.latest.get('sensor') == 1
+
+def test_overrun_skips_missed_slots():
+    runtime = AgentRuntime()
+    starts = []
+
+    def read():
+        starts.append(time.monotonic())
+        if len(starts) == 1:
+            time.sleep(0.12) # 슬롯 1, 2 를 넘김
+    task = runtime.add_task('slow', read, 0.05)
+    run_for(runtime, 0.27)
+    assert task.overruns == 2
+    # 밀린 슬롯을 몰아서 실행하지 않고 다음 격자(슬롯 3)부터
+    assert starts[1] - starts[0] == pytest.approx(0.15, abs=0.03)
+    assert starts[2] - starts[1] == pytest.approx(0.05, abs=0.03)
+
+def test_set_period_wakes_sleeping_task():
+    runtime = AgentRuntime()
+    starts = []
+    task = runtime.add_task('sensor', lambda: starts.append(time.monotonic()), 10.0, blocking=False)
+
+    async def shorten():
+        await asyncio.sleep(0.05)
+        task.set_period(0.05)
+    run_for(runtime, 0.2, during=shorten)
+    # 10초를 다 기다리지 않고 직전 실행 + 새 주기에 실행
+    assert len(starts) >= 4
+    assert starts[1] - starts[0] == pytest.approx(0.05, abs=0.03)
+    assert task.period == 0.05
+
+def test_blocking_driver_runs_in_executor():
+    runtime = AgentRuntime()
+    threads, ticks = [], []
+
+    def blocking_read():
+        threads.append(threading.current_thread().name)
+        time.sleep(0.2)
+    runtime.add_task('serial', blocking_read, 1.0)
+    runtime.add_task('snapshot', lambda: ticks.append(time.monotonic()), 0.02, blocking=False)
+    run_for(runtime, 0.15)
+    # 블로킹 드라이버가 이벤트 루프를 막지 않음
+    assert threads and threads[0].startswith("agent-io")
+    assert len(ticks) >= 5
+
+def test_task_error_is_counted_and_loop_continues():
+    runtime = AgentRuntime()
+    results = []
+
+    def flaky():
+        if not results:
+            results.append(None)
+            raise OSError("센서 없음")
+        results.append(2)
+        return 2
+    task = runtime.add_task('flaky', flaky, 0.03, on_result=lambda r: None)
+    run_for(runtime, 0.1)
+    assert task.errors == 1 and task.runs >= 3
+    assert runtime.latest.get('flaky') == 2
@@ -0,0 +1,23 @@
+import pytest
+
+from anomaly_detector import AnomalyDetector, ALARM_RATE
+
+def rate_alarms(samples):
+    detector = AnomalyDetector()
+    events = []
+    for ts, value in samples:
+        events.extend(detector.update('temperature', ts, value))
+    return [e for e in events if e['alarm'] == ALARM_RATE]
+
+@pytest.mark.parametrize("period", [1.0, 3.75, 10.0])
+def test_quantization_noise_raises_no_rate_alarm(period):
+    # 0.0625°C 한 단계씩 오르내림 -> 주기가 짧아도 변화율 알람 없음
+    samples = [(i * period, 3.0 + 0.0625 * (i % 2)) for i in range(int(3600 / period))]
+    assert rate_alarms(samples) == []
+
+@pytest.mark.parametrize("period", [1.0, 3.75, 10.0])
+def test_sensor_step_raises_rate_alarm_at_any_period(period):
+    samples = [(i * period, 3.0 if i * period < 600 else 7.0) for i in range(int(1200 / period))]
+    alarms = rate_alarms(samples)
+    assert [a['state'] for a in alarms] == ['raised', 'cleared']
+    assert 600 <= alarms[0]['timestamp'] <= 600 + 30 + period
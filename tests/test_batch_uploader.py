@@ -0,0 +1,90 @@
+import pytest
+
+from upload_queue import RecordRejected
+
+requests = pytest.importorskip("requests")
+from batch_uploader import BatchUploader, REPROBE_SECONDS  # noqa: E402
+
+def records(n, start=0):
+    return [{"seq": i, "temperature_value": "3.25"} for i in range(start, start + n)]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def uploader(stub_server, clock):
+    uploader = BatchUploader(stub_server.url, timeout=2)
+    uploader.gzip.clock = uploader.batch.clock = clock
+    return uploader
+
+def test_one_bad_record_does_not_disable_batching_or_gzip(uploader, stub_server):
+    def respond(body, headers):
+        rows = body if isinstance(body, list) else [body]
+        return 400 if any(r['seq'] == 1 for r in rows) else 201
+    stub_server.respond = respond
+    with pytest.raises(RecordRejected) as e:
+        uploader.send(records(3))
+    assert e.value.done == 1 and e.value.status == 400
+    assert uploader.batch.enabled and uploader.gzip.enabled
+    assert uploader.send(records(3, 2)) == 3
+    assert stub_server.requests[-1] == (201, 'gzip', 3)
+
+def test_transient_404_is_not_latched(uploader, stub_server):
+    outage = {'on': True}
+    stub_server.respond = lambda body, headers: 404 if outage['on'] else 201
+    assert uploader.send(records(3)) == 0
+    assert uploader.batch.enabled and uploader.gzip.enabled
+    outage['on'] = False
+    assert uploader.send(records(3)) == 3
+    assert stub_server.requests[-1] == (201, 'gzip', 3)
+
+def test_gzip_disabled_only_when_uncompressed_succeeds_then_reprobed(uploader, stub_server, clock):
+    accepts_gzip = {'on': False}
+
+    def respond(body, headers):
+        if headers.get('Content-Encoding') == 'gzip' and not accepts_gzip['on']:
+            return 415
+        return 201
+    stub_server.respond = respond
+    assert uploader.send(records(3)) == 3
+    assert not uploader.gzip.enabled and uploader.batch.enabled
+    assert uploader.send(records(3, 3)) == 3
+    assert stub_server.requests[-1] == (201, None, 3)
+
+    clock.now += REPROBE_SECONDS
+    accepts_gzip['on'] = True
+    assert uploader.send(records(3, 6)) == 3
+    assert stub_server.requests[-1] == (201, 'gzip', 3)
+    assert uploader.gzip.until is None and uploader.gzip.delay == REPROBE_SECONDS
+    assert [r['seq'] for r in stub_server.received] == list(range(9))
+
+def test_415_everywhere_does_not_disable_gzip(uploader, stub_server):
+    stub_server.respond = lambda body, headers: 415
+    assert uploader.send(records(1)) == 0
+    assert uploader.gzip.enabled
+
+def test_array_body_unsupported_falls_back_and_reprobes_with_backoff(uploader, stub_server, clock):
+    stub_server.respond = lambda body, headers: 400 if isinstance(body, list) else 201
+    assert uploader.send(records(3)) == 3
+    assert not uploader.batch.enabled
+    assert uploader.send(records(2, 3)) == 2
+    assert [n for _, _, n in stub_server.requests[-2:]] == [1, 1]
+
+    # 재확인 시점: 다시 배열을 보내 보고, 여전히 안 되면 두 배 뒤에 다시
+    clock.now += REPROBE_SECONDS
+    assert uploader.batch.enabled
+    assert uploader.send(records(2, 5)) == 2
+    assert not uploader.batch.enabled
+    clock.now += REPROBE_SECONDS
+    assert not uploader.batch.enabled
+    clock.now += REPROBE_SECONDS
+    assert uploader.batch.enabled
+    assert [r['seq'] for r in stub_server.received] == list(range(7))
@@ -0,0 +1,84 @@
+import pytest
+
+from compressor_monitor import CompressorMonitor, load_trace, replay, STATE_HEATER, STATE_COMPRESSOR
+from simulator.ads1115 import CompressorProfile
+
+CAL_FACTOR = 30.0
+
+def profile_trace(profile, hours, period, phase=0.0):
+    # 프로파일의 RMS 전류를 period 초 간격으로 (phase 로 압축기 기동 시각과의 위상을 바꿈)
+    t = phase
+    while t < hours * 3600:
+        yield t, profile.state(t)[1]
+        t += period
+
+def write_trace(path, trace):
+    with open(path, 'w') as f:
+        f.write("timestamp,current\n")
+        for t, current in trace:
+            f.write(f"{t:.3f},{current}\n")
+
+def kinds(events, kind):
+    return [e for e in events if e['event'] == kind]
+
+@pytest.mark.parametrize("phase", [i * 0.25 for i in range(8)])
+def test_inrush_is_not_heater(phase):
+    # 2초 샘플이 0.5초 돌입 전류(12 A, 히터 임계값 4.5 A 초과)에 걸려도 히터 이벤트 없음
+    profile = CompressorProfile(defrost_every=0)
+    monitor = CompressorMonitor.from_cal_factor(CAL_FACTOR)
+    events = replay(profile_trace(profile, 6, 2.0, phase), monitor)
+    assert not kinds(events, "heater_on") and not kinds(events, "heater_off")
+    starts = kinds(events, "compressor_start")
+    cycle = profile.on_seconds + profile.off_seconds
+    # 첫 사이클은 초기 상태로 시작하므로 두 번째 사이클부터 기동 이벤트
+    assert len(starts) == len(range(int(cycle), 6 * 3600, int(cycle)))
+    for event in starts:
+        # 기동 시각은 돌입 전류가 보인 시각 (다음 측정까지 늦지 않음)
+        assert event['timestamp'] % cycle < 2.0
+
+def test_inrush_from_recorded_trace(tmp_path):
+    path = tmp_path / "inrush.csv"
+    write_trace(path, profile_trace(CompressorProfile(defrost_every=0), 3, 2.0, 0.25))
+    monitor = CompressorMonitor.from_cal_factor(CAL_FACTOR)
+    events = replay(load_trace(str(path)), monitor)
+    assert {e['event'] for e in events} == {"compressor_start", "compressor_stop"}
+    stats = monitor.stats()
+    assert stats['duty_cycle_1h'] == pytest.approx(600 / 1500, abs=0.02)
+    assert stats['last_on_seconds'] == pytest.approx(600, abs=2.0)
+    assert stats['last_off_seconds'] == pytest.approx(900, abs=2.0)
+
+def test_defrost_heater_detected_with_start_time():
+    profile = CompressorProfile()
+    monitor = CompressorMonitor.from_cal_factor(CAL_FACTOR)
+    events = replay(profile_trace(profile, 13, 2.0), monitor)
+    heater_on = kinds(events, "heater_on")
+    heater_off = kinds(events, "heater_off")
+    assert [round(e['timestamp']) for e in heater_on] == [6 * 3600, 12 * 3600]
+    assert len(heater_off) == 2
+    assert heater_off[0]['previous_duration'] == pytest.approx(profile.defrost_seconds, abs=2.0)
+
+def test_heater_confirmed_on_second_reading_at_slow_sampling():
+    # 10초 주기: 두 번째 측정에서 확정, 상태 시작 시각은 첫 측정
+    monitor = CompressorMonitor.from_cal_factor(CAL_FACTOR)
+    trace = [(0, 0.05), (10, 6.5), (20, 6.5), (30, 6.5), (40, 0.05)]
+    events = replay(trace, monitor)
+    assert [e['event'] for e in events] == ["heater_on", "heater_off"]
+    assert events[0]['timestamp'] == 10
+    assert events[1]['previous_duration'] == 30
+
+def test_heater_not_confirmed_across_gap():
+    monitor = CompressorMonitor.from_cal_factor(CAL_FACTOR, max_gap=120)
+    trace = [(0, 0.05), (10, 12.0), (500, 12.0), (502, 2.4)]
+    events = replay(trace, monitor)
+    assert not kinds(events, "heater_on")
+    assert monitor.state == STATE_COMPRESSOR
+    assert monitor.state_since == 500
+
+def test_heater_confirm_zero_keeps_immediate_transition():
+    monitor = CompressorMonitor.from_cal_factor(CAL_FACTOR, heater_confirm=0)
+    replay([(0, 0.05), (2, 12.0)], monitor)
+    assert monitor.state == STATE_HEATER
+
+def test_hysteresis_thresholds_required():
+    with pytest.raises(ValueError):
+        CompressorMonitor(compressor_on=0.3, compressor_off=0.6, heater_on=4.5, heater_off=3.6)
@@ -0,0 +1,54 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from current_analysis import analyze_block, synthetic_block, ADS1115_FULL_SCALE, BIT_RESOLUTION, CAL_FACTOR
+from sensor_drivers import Sct013Driver
+
+def test_sine_rms_crest_factor_and_frequency():
+    # 860 SPS 로 60 Hz 를 정확히 30 주기(430 샘플), 진폭 8000 카운트
+    n, rate = 430, 860
+    t = np.arange(n) / rate
+    block = np.round(8000 * np.sin(2 * np.pi * 60.0 * t) + 1200).astype(np.int16)
+    stats = analyze_block(block, sample_rate=rate)
+
+    amps_per_count = ADS1115_FULL_SCALE[1] / BIT_RESOLUTION * CAL_FACTOR
+    assert stats.rms == pytest.approx(8000 / math.sqrt(2) * amps_per_count, rel=1e-3)
+    assert stats.crest_factor == pytest.approx(math.sqrt(2), rel=1e-3)
+    assert stats.frequency == pytest.approx(60.0, abs=0.5)
+    assert stats.dc_offset == pytest.approx(1200 * ADS1115_FULL_SCALE[1] / BIT_RESOLUTION, rel=1e-3)
+    assert stats.samples == n
+
+class SlowSampler:
+    # 공칭 860 SPS 인데 실제로는 430 SPS 만 달성한 샘플러
+    running = True
+
+    def __init__(self, block, rate):
+        self.block = block
+        self.rate = rate
+
+    def get_window(self, n_cycles):
+        return self.block
+
+    def effective_rate(self):
+        return self.rate
+
+def test_driver_uses_effective_sample_rate():
+    driver = Sct013Driver(data_rate=860, simulate=True)
+    driver.open()
+    driver.sampler = SlowSampler(synthetic_block(n=430, sample_rate=430, noise_amps=0.0), 430)
+    seen = []
+    analyze = driver._analyze
+
+    def recording_analyze(window, **kwargs):
+        seen.append(kwargs['sample_rate'])
+        return analyze(window, **kwargs)
+    driver._analyze = recording_analyze
+
+    reading = driver.read()
+    assert seen == [430]
+    assert reading.value == pytest.approx(5.0, abs=0.05)
+    stats = analyze(driver.sampler.block, sample_rate=seen[0])
+    assert stats.frequency == pytest.approx(60.0, abs=0.5)
@@ -0,0 +1,49 @@
+import pytest
+
+from adaptive_sampling import AdaptiveScheduler, DEFAULT_POLICIES, cabinet_temperature
+from event_inference import EventInference, EVENT_DOOR_OPEN, STATE_COMPRESSOR
+
+def compressor_state(t):
+    # cabinet_temperature 모델: 1500초 사이클 중 앞 600초 냉각
+    return STATE_COMPRESSOR if t % 1500 < 600 else 'off'
+
+def door_starts(times):
+    inference = EventInference()
+    inference.set_reference(3.0, 2.0)
+    events = []
+    for t in times:
+        events.extend(inference.update(t, cabinet_temperature(t), compressor_state(t)))
+    return [e['start'] for e in events if e['event'] == EVENT_DOOR_OPEN]
+
+def adaptive_times(hours=24, cost=0.75):
+    scheduler = AdaptiveScheduler()
+    scheduler.add('temperature', DEFAULT_POLICIES['ds18b20'], lambda period: None, cost=lambda: cost, period=10.0)
+    t, times = 0.0, []
+    while t < hours * 3600:
+        times.append(t)
+        t += scheduler.observe('temperature', cabinet_temperature(t), ts=t)
+    return times
+
+# 모델의 문 열림: 2시간마다 (1h, 3h, ... 23h) 90초
+OPENINGS = [h * 3600 for h in range(1, 24, 2)]
+
+@pytest.mark.parametrize("times", [
+    [i * 10.0 for i in range(8640)], # 고정 10초
+    adaptive_times(), # 적응형 (과도 상태에서 ~3.75초)
+    [float(i) for i in range(86400)], # 1초
+], ids=["fixed-10s", "adaptive", "fixed-1s"])
+def test_door_openings_independent_of_sample_period(times):
+    starts = door_starts(times)
+    assert len(starts) == len(OPENINGS)
+    for start, opening in zip(starts, OPENINGS):
+        assert opening - 60 <= start <= opening + 30
+
+def test_single_quantization_step_is_not_a_door_opening():
+    inference = EventInference()
+    inference.set_reference(3.0, 2.0)
+    events, t = [], 0.0
+    for temperature in [3.0] * 20 + [3.0625] * 20:
+        events.extend(inference.update(t, temperature, 'off'))
+        t += 1.0
+    assert not inference.episodes and not events
+    assert inference.rate < inference.door_rate
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+pytest.importorskip("serial")
+
+from modbus import build_read_request, parse_response, transact, ModbusError, READ_INPUT_REGISTERS  # noqa: E402
+from sensor_drivers import FoxMr20Driver  # noqa: E402
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = predicate()
+        if value:
+            return value
+        time.sleep(0.02)
+    return predicate()
+
+@pytest.fixture
+def driver(fake_fox):
+    driver = FoxMr20Driver(port=fake_fox.port, slaves=[{'slave_id': 1}, {'slave_id': 2}], poll_period=0.2)
+    driver.open()
+    assert driver.bus is not None
+    yield driver
+    driver.close()
+
+def test_poll_path_reads_every_slave(driver, fake_fox):
+    fake_fox.set_temperature(3.5, slave_id=1)
+    fake_fox.set_temperature(-18.0, slave_id=2)
+    values = wait_for(lambda: len(driver.read().value) == 2 and driver.read().value)
+    assert values[1]['probe_temp'] == 3.5 and values[2]['probe_temp'] == -18.0
+    assert values[1]['temp_set'] == 3.0
+
+    # 값이 바뀌면 다음 폴링에 반영
+    fake_fox.set_temperature(4.0, slave_id=1)
+    assert wait_for(lambda: driver.read().value.get(1, {}).get('probe_temp') == 4.0)
+    stats = driver.bus.stats()['slaves']
+    assert stats[1]['errors'] == 0 and stats[2]['errors'] == 0
+
+def test_transaction_returns_without_waiting_for_timeout(driver):
+    # 고정 길이 read(15) 는 1초 타임아웃까지 기다렸음 -> 길이 계산으로 프레임을 다 받으면 바로 반환
+    request = build_read_request(1, READ_INPUT_REGISTERS, 0x0064, 1)
+    t0 = time.monotonic()
+    future = driver.bus.submit(lambda ser: parse_response(transact(ser, request), 1, READ_INPUT_REGISTERS))
+    assert future.result(timeout=2) == [35]
+    assert time.monotonic() - t0 < 0.5
+
+def test_illegal_data_address_exception(driver, fake_fox):
+    # 직접 요청: 장치 에러 응답 0x02 가 그대로 올라옴
+    request = build_read_request(1, READ_INPUT_REGISTERS, 0x0070, 1)
+    future = driver.bus.submit(lambda ser: parse_response(transact(ser, request), 1, READ_INPUT_REGISTERS))
+    with pytest.raises(ModbusError) as e:
+        future.result(timeout=2)
+    assert e.value.exception_code == 0x02
+
+    # 폴링 경로: 슬레이브 2 에 heat_time 이 없으면 그 레지스터만 빠지고 나머지는 계속 읽힘
+    del fake_fox.holding[2][0x0012]
+    fake_fox.set_temperature(-20.0, slave_id=2)
+    values = wait_for(lambda: driver.read().value.get(2, {}).get('probe_temp') == -20.0 and driver.read().value)
+    assert 'heat_time' not in values[2] and values[2]['temp_set'] == 3.0
+    assert driver.bus.slaves[2].poller.unsupported == ['heat_time']
+    assert values[1]['heat_time'] == 20
+
+def test_silent_slave_backs_off_while_other_keeps_polling(driver, fake_fox):
+    fake_fox.silent_slaves.add(2)
+    wait_for(lambda: driver.bus.slaves[2].failures >= 1)
+    fake_fox.set_temperature(5.5, slave_id=1)
+    assert wait_for(lambda: driver.read().value.get(1, {}).get('probe_temp') == 5.5)
+    assert driver.bus.slaves[2].failures >= 1
+    assert driver.bus.slaves[1].failures == 0
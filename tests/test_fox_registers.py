@@ -0,0 +1,49 @@
+import pytest
+
+import fox_registers
+from fox_registers import Register, RegisterPoller, REGISTER_MAP, INPUT, HOLDING, plan_reads
+
+def test_default_map_splits_rejected_holding_block(fox_serial, fake_fox):
+    fake_fox.set_temperature(-2.5)
+    poller = RegisterPoller(1)
+    values = poller.read(fox_serial)
+    assert values['probe_temp'] == -2.5
+    assert values['temp_set'] == 3.0 and values['temp_gap'] == 2 and values['heat_time'] == 20
+    # 홀딩 0x0002~0x0012 는 빈 주소 때문에 거절 -> 맵에 있는 주소의 연속 구간별로
+    assert [(b.table, b.start, b.count) for b in poller.blocks] == [
+        (HOLDING, 0x0002, 1), (HOLDING, 0x0004, 1), (HOLDING, 0x0012, 1), (INPUT, 0x0064, 1)]
+    assert not poller.unsupported
+    before = poller.transactions
+    assert poller.read(fox_serial) == values
+    assert poller.transactions - before == 4
+
+def test_rejected_contiguous_block_falls_back_to_single_registers(fox_serial, fake_fox, monkeypatch):
+    # 장치에 없는 0x0065 가 0x0064 와 한 블록이면 연속 구간으로 나눠도 같은 블록 -> 하나씩 읽음
+    monkeypatch.setitem(REGISTER_MAP, 'unknown', Register('unknown', 0x0065, INPUT))
+    poller = RegisterPoller(1, names=['probe_temp', 'unknown'])
+    assert [(b.start, b.count) for b in poller.blocks] == [(0x0064, 2)]
+    fake_fox.set_temperature(4.2)
+    assert poller.read(fox_serial) == {'probe_temp': 4.2}
+    assert poller.unsupported == ['unknown']
+    assert [(b.start, b.count) for b in poller.blocks] == [(0x0064, 1)]
+    fake_fox.set_temperature(4.5)
+    before = poller.transactions
+    assert poller.read(fox_serial) == {'probe_temp': 4.5}
+    assert poller.transactions - before == 1
+
+def test_plan_reads_merges_small_gaps():
+    registers = [REGISTER_MAP[n] for n in ('temp_set', 'temp_gap', 'heat_time', 'probe_temp')]
+    blocks = plan_reads(registers)
+    assert [(b.table, b.start, b.count) for b in blocks] == [(HOLDING, 0x0002, 0x11), (INPUT, 0x0064, 1)]
+    assert [(b.start, b.count) for b in plan_reads(registers, max_gap=0)] == [(0x0002, 1), (0x0004, 1),
+                                                                            (0x0012, 1), (0x0064, 1)]
+
+def test_write_uses_one_transaction_for_adjacent_registers(fox_serial, fake_fox):
+    poller = RegisterPoller(1)
+    poller.read(fox_serial)
+    assert poller.write(fox_serial, {'temp_set': -1.5, 'temp_gap': 3})
+    assert fake_fox.holding[1][0x0002] == 0xFFF1 and fake_fox.holding[1][0x0004] == 3
+    assert poller.read(fox_serial)['temp_set'] == -1.5
+    with pytest.raises(ValueError):
+        poller.write(fox_serial, {'probe_temp': 1.0})
+    assert fox_registers.REGISTER_MAP['temp_set'].encode(-1.5) == 0xFFF1
@@ -0,0 +1,56 @@
+import os
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from history_store import HistoryStore, HEADER_SIZE, RECORD_DTYPE, segment_name  # noqa: E402
+
+# 오늘 00:00 UTC (보존 기간 안이어야 전날 세그먼트가 지워지지 않음)
+MIDNIGHT = time.time() // 86400 * 86400
+
+def test_torn_tail_is_truncated_on_reopen(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    for i in range(3):
+        store.append(MIDNIGHT + 3600 + i * 10, ds18b20=3.0 + i)
+    store.close()
+    path = tmp_path / segment_name(MIDNIGHT)
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * (RECORD_DTYPE.itemsize // 2)) # 쓰다가 전원 차단
+
+    store = HistoryStore(str(tmp_path))
+    store.append(MIDNIGHT + 3630, ds18b20=6.0)
+    store.close()
+    assert os.path.getsize(path) == HEADER_SIZE + 4 * RECORD_DTYPE.itemsize
+    records = store.query(MIDNIGHT, MIDNIGHT + 86400)
+    assert list(records['ds18b20']) == [3.0, 4.0, 5.0, 6.0]
+    assert np.isnan(records['rs485']).all()
+
+def test_retention_deletes_old_segments(tmp_path):
+    now = time.time()
+    store = HistoryStore(str(tmp_path), retention_days=30)
+    store.append(now - 40 * 86400, ds18b20=1.0)
+    store.append(now - 10 * 86400, ds18b20=2.0) # 새 세그먼트를 열 때 보존 기간 검사
+    store.append(now, ds18b20=3.0)
+    store.close()
+    assert store.segment_names() == [segment_name(now - 10 * 86400), segment_name(now)]
+
+def test_query_across_midnight_spans_two_memmapped_segments(tmp_path):
+    store = HistoryStore(str(tmp_path), flush_every=1000)
+    stamps = [MIDNIGHT + offset for offset in range(-300, 300, 60)]
+    for i, ts in enumerate(stamps):
+        store.append(ts, ds18b20=float(i), current=2.0)
+    # 기록 중인 (flush 안 된) 세그먼트도 조회 때 flush 되어 보임
+    parts = list(store.segments(MIDNIGHT - 150, MIDNIGHT + 150))
+    assert len(parts) == 2 and all(isinstance(p, np.memmap) for p in parts)
+    records = store.query(MIDNIGHT - 150, MIDNIGHT + 150)
+    assert list(records['timestamp']) == [ts for ts in stamps if MIDNIGHT - 150 <= ts < MIDNIGHT + 150]
+    assert list(records['ds18b20']) == [3.0, 4.0, 5.0, 6.0, 7.0]
+
+    # 하루 안의 조회는 복사 없는 memmap 뷰, channel 을 주면 두 열만
+    same_day = store.query(MIDNIGHT, MIDNIGHT + 300, channel='current')
+    assert isinstance(same_day, np.memmap) and same_day.dtype.names == ('timestamp', 'current')
+    assert len(same_day) == 5
+    assert store.latest()['ds18b20'] == 9.0
+    store.close()
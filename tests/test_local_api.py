@@ -0,0 +1,81 @@
+import json
+import time
+import asyncio
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from agent_runtime import LatestValues  # noqa: E402
+from history_store import HistoryStore  # noqa: E402
+from local_api import LocalApiServer  # noqa: E402
+
+async def get(port, target):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: local\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    body = await reader.read()
+    writer.close()
+    return int(head.split(b" ", 2)[1]), json.loads(body)
+
+async def next_event(reader):
+    # 주석(keepalive) 이 아닌 다음 SSE 이벤트 -> (event, data)
+    while True:
+        block = (await reader.readuntil(b"\n\n")).decode()
+        fields = dict(line.split(": ", 1) for line in block.strip().split("\n") if ": " in line and line[0] != ":")
+        if 'event' in fields:
+            return fields['event'], json.loads(fields['data'])
+
+@pytest.fixture
+def history(tmp_path):
+    store = HistoryStore(str(tmp_path / "history"))
+    now = time.time()
+    for i in range(10):
+        store.append(now - 600 + i * 60, ds18b20=3.0 + i * 0.1, rs485=None, current=2.0, setpoint=3.0)
+    yield store
+    store.close()
+
+def test_latest_history_and_events(history):
+    async def scenario():
+        latest = LatestValues()
+        latest.publish('ds18b20', 3.25, 0.01)
+        server = LocalApiServer(latest, history, host="127.0.0.1", port=0)
+        await server.start()
+        try:
+            status, body = await get(server.port, "/api/latest")
+            assert status == 200 and body['channels']['ds18b20']['value'] == 3.25
+
+            status, body = await get(server.port, "/api/history?hours=1&channel=ds18b20")
+            assert status == 200 and len(body['timestamp']) == 10
+            assert body['ds18b20'][0] == 3.0 and 'rs485' not in body
+            status, body = await get(server.port, "/api/history?hours=1")
+            assert body['rs485'] == [None] * 10
+
+            for bad in ("nan", "inf", "-inf", "-1", "0", "abc"):
+                status, body = await get(server.port, f"/api/history?hours={bad}")
+                assert status == 400, bad
+                assert 'error' in body
+            status, _ = await get(server.port, "/api/history?channel=nope")
+            assert status == 400
+
+            # SSE: 접속 직후 snapshot, 값이 발행되면 바로 sample
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"GET /api/events HTTP/1.1\r\nHost: local\r\n\r\n")
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            assert b"text/event-stream" in head
+            event, data = await asyncio.wait_for(next_event(reader), 2)
+            assert event == 'snapshot' and 'ds18b20' in data['channels']
+            while server.clients == 0:
+                await asyncio.sleep(0.01)
+            latest.publish('rs485', 3.5, 0.02)
+            event, data = await asyncio.wait_for(next_event(reader), 2)
+            assert event == 'sample' and data['channel'] == 'rs485' and data['value'] == 3.5
+            writer.close()
+        finally:
+            await server.stop()
+    asyncio.run(scenario())
+
+def test_history_unavailable_without_store():
+    assert LocalApiServer(host="127.0.0.1", port=0)._history({})[0] == 503
@@ -0,0 +1,161 @@
+import random
+import struct
+
+import pytest
+
+import modbus
+from modbus import (crc16, crc16_modbus, check_crc, Crc16, _crc16_bitwise, build_read_request, build_write_single,
+                    build_write_multiple, parse_response, read_frame, ModbusError, ModbusTimeout,
+                    READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS, WRITE_SINGLE_REGISTER, WRITE_MULTIPLE_REGISTERS)
+
+# FOX-MR20 온도 읽기 요청 (기존 스크립트에 하드코딩돼 있던 프레임)
+FOX_READ_TEMPERATURE = b'\x01\x04\x00\x64\x00\x02\x30\x14'
+
+def random_payloads(seed=7, count=200):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield bytes(rng.getrandbits(8) for _ in range(rng.randint(0, 300)))
+
+def response(slave_id, function_code, payload: bytes) -> bytes:
+    pdu = bytes([slave_id, function_code]) + payload
+    return pdu + crc16_modbus(pdu)
+
+def read_response(slave_id, function_code, values) -> bytes:
+    return response(slave_id, function_code, bytes([len(values) * 2]) + struct.pack(f'>{len(values)}H', *values))
+
+# ------------------------------------------------------------------------------
+# CRC
+# ------------------------------------------------------------------------------
+def test_table_crc_matches_bitwise_on_random_data():
+    for data in random_payloads():
+        assert crc16_modbus(data) == _crc16_bitwise(data)
+
+def test_incremental_crc_matches_on_random_chunks():
+    rng = random.Random(11)
+    for data in random_payloads(seed=13):
+        crc = Crc16()
+        view = memoryview(data)
+        i = 0
+        while i < len(data):
+            step = rng.randint(1, 17)
+            crc.update(view[i:i + step])
+            i += step
+        assert crc.digest() == _crc16_bitwise(data)
+        assert crc16(data[len(data) // 2:], crc16(data[:len(data) // 2])) == crc.value
+
+def test_crc_over_frame_with_crc_is_zero():
+    for data in random_payloads(seed=17, count=50):
+        frame = data + crc16_modbus(data)
+        assert check_crc(frame) == (len(frame) >= 4)
+
+def test_known_fox_mr20_frame():
+    assert crc16_modbus(FOX_READ_TEMPERATURE[:-2]) == b'\x30\x14'
+    assert check_crc(FOX_READ_TEMPERATURE)
+    assert build_read_request(1, READ_INPUT_REGISTERS, 0x0064, 2) == FOX_READ_TEMPERATURE
+    assert not check_crc(FOX_READ_TEMPERATURE[:-1] + b'\x15')
+
+# ------------------------------------------------------------------------------
+# 요청 생성 / 응답 해석 왕복
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("function_code", [READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS])
+def test_read_round_trip(function_code):
+    rng = random.Random(function_code)
+    for _ in range(100):
+        slave_id = rng.randint(1, 247)
+        address = rng.randint(0, 0xFFFF)
+        count = rng.randint(1, modbus.MAX_READ_REGISTERS)
+        request = build_read_request(slave_id, function_code, address, count)
+        assert check_crc(request)
+        assert struct.unpack('>BBHH', request[:6]) == (slave_id, function_code, address, count)
+        values = [rng.randint(0, 0xFFFF) for _ in range(count)]
+        frame = read_response(slave_id, function_code, values)
+        assert modbus.expected_response_length(function_code, frame[:3]) == len(frame)
+        assert parse_response(frame, slave_id, function_code) == values
+
+def test_write_round_trips():
+    request = build_write_single(1, 0x0100, -25)
+    assert parse_response(request, 1, WRITE_SINGLE_REGISTER) == (0x0100, 0xFFE7)
+    assert modbus.to_signed(0xFFE7) == -25
+    request = build_write_multiple(2, 0x0200, [30, 5, 0xFFFF])
+    assert check_crc(request) and request[6] == 6
+    echo = response(2, WRITE_MULTIPLE_REGISTERS, struct.pack('>HH', 0x0200, 3))
+    assert parse_response(echo, 2, WRITE_MULTIPLE_REGISTERS) == (0x0200, 3)
+
+@pytest.mark.parametrize("count", [0, modbus.MAX_READ_REGISTERS + 1])
+def test_read_request_rejects_bad_count(count):
+    with pytest.raises(ValueError):
+        build_read_request(1, READ_INPUT_REGISTERS, 0, count)
+
+def test_parse_response_errors():
+    frame = read_response(1, READ_INPUT_REGISTERS, [225, 0])
+    with pytest.raises(ModbusError, match="CRC"):
+        parse_response(frame[:-1] + bytes([frame[-1] ^ 1]), 1, READ_INPUT_REGISTERS)
+    with pytest.raises(ModbusError, match="슬레이브"):
+        parse_response(frame, 2, READ_INPUT_REGISTERS)
+    with pytest.raises(ModbusError, match="함수 코드"):
+        parse_response(frame, 1, READ_HOLDING_REGISTERS)
+    exception = response(1, READ_INPUT_REGISTERS | 0x80, b'\x02')
+    with pytest.raises(ModbusError) as e:
+        parse_response(exception, 1, READ_INPUT_REGISTERS)
+    assert e.value.exception_code == 2
+
+# ------------------------------------------------------------------------------
+# read_frame (pyserial loop:// 로 실제 시리얼 객체 타임아웃 동작)
+# ------------------------------------------------------------------------------
+@pytest.fixture
+def loop():
+    serial = pytest.importorskip("serial")
+    port = serial.serial_for_url('loop://', baudrate=9600, timeout=0.1)
+    yield port
+    port.close()
+
+def test_read_frame_returns_complete_frame(loop):
+    frame = read_response(1, READ_INPUT_REGISTERS, [225, 0])
+    loop.write(frame + b'\x01\x04') # 뒤에 붙은 다음 프레임 조각은 읽지 않음
+    assert read_frame(loop, response_timeout=0.2) == frame
+    assert loop.in_waiting == 2
+
+def test_read_frame_exception_frame(loop):
+    frame = response(1, READ_INPUT_REGISTERS | 0x80, b'\x02')
+    loop.write(frame)
+    received = read_frame(loop, response_timeout=0.2)
+    assert received == frame and len(received) == 5
+    with pytest.raises(ModbusError) as e:
+        parse_response(received, 1, READ_INPUT_REGISTERS)
+    assert e.value.exception_code == 2
+
+@pytest.mark.parametrize("cut", [1, 2, 3, 6])
+def test_read_frame_truncated(loop, cut):
+    frame = read_response(1, READ_INPUT_REGISTERS, [225, 0])
+    loop.write(frame[:cut])
+    with pytest.raises(ModbusError, match="중단") as e:
+        read_frame(loop, response_timeout=0.2)
+    assert not isinstance(e.value, ModbusTimeout)
+
+def test_read_frame_timeout_without_response(loop):
+    with pytest.raises(ModbusTimeout):
+        read_frame(loop, response_timeout=0.05)
+    assert loop.timeout == 0.1
+
+def test_read_frame_waits_out_usb_latency(loop):
+    # USB 변환기가 16ms(FTDI 기본 latency_timer) 동안 모았다가 나머지를 넘기는 경우
+    import threading
+    frame = read_response(1, READ_INPUT_REGISTERS, [225, 0])
+    loop.write(frame[:4])
+    threading.Timer(0.016, loop.write, args=(frame[4:],)).start()
+    assert read_frame(loop, response_timeout=0.2) == frame
+
+    loop.write(frame[:4])
+    late = threading.Timer(0.016, loop.write, args=(frame[4:],))
+    late.start()
+    with pytest.raises(ModbusError, match="중단"):
+        read_frame(loop, response_timeout=0.2, gap_floor=0.005)
+    late.join()
+
+def test_check_gap_floor_warns_when_latency_timer_is_longer(monkeypatch, caplog):
+    assert modbus.usb_latency_timer("/dev/nonexistent-port") is None
+    monkeypatch.setattr(modbus, 'usb_latency_timer', lambda port: 0.016)
+    assert modbus.check_gap_floor("/dev/ttyUSB0", gap_floor=0.020) == 0.016
+    assert not caplog.records
+    modbus.check_gap_floor("/dev/ttyUSB0", gap_floor=0.005)
+    assert "latency_timer" in caplog.text
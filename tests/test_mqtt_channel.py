@@ -0,0 +1,94 @@
+import gzip
+import json
+import time
+import asyncio
+import threading
+
+import pytest
+
+import mqtt_channel
+from mqtt_channel import MqttClient, DeviceLink, FallbackSender, packet, encode_string, PUBLISH
+from simulator.mqtt_broker import StubBroker
+from upload_queue import UploadQueue, QueueDrainer
+
+def wait_until(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+@pytest.fixture(autouse=True)
+def fast_reconnect(monkeypatch):
+    monkeypatch.setattr(mqtt_channel, 'RECONNECT_BASE_SECONDS', 0.05)
+
+@pytest.fixture
+def broker():
+    with StubBroker() as b:
+        yield b
+
+@pytest.fixture
+def device(broker):
+    # 에이전트처럼 클라이언트 run() 은 별도 스레드의 이벤트 루프에서, 테스트는 드레이너처럼 스레드에서 호출
+    configs = []
+    client = MqttClient("127.0.0.1", broker.port, client_id="fridge-7", keepalive=5)
+    link = DeviceLink(client, "7", configs.append)
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(client.run())
+    thread = threading.Thread(target=loop.run_until_complete, args=(task,), daemon=True)
+    thread.start()
+    assert wait_until(lambda: broker.retained.get("refrigerator/7/status") == b"online")
+    yield link, configs, task
+    asyncio.run_coroutine_threadsafe(client.stop(), loop).result(2)
+    thread.join(2)
+    loop.close()
+
+def test_reconnects_and_restores_subscription(broker, device):
+    link, configs, task = device
+    broker.publish("refrigerator/7/config", b"1")
+    assert wait_until(lambda: configs == [b"1"])
+
+    broker.disconnect_all()
+    # will (offline) 발행 뒤 재연결하면 다시 online
+    assert wait_until(lambda: link.client.connects == 2)
+    assert wait_until(lambda: broker.retained.get("refrigerator/7/status") == b"online")
+    broker.publish("refrigerator/7/config", b"2")
+    assert wait_until(lambda: configs == [b"1", b"2"])
+    assert not task.done()
+
+def test_qos1_telemetry_redelivered_after_lost_puback(broker, device, tmp_path):
+    link, configs, task = device
+    queue = UploadQueue(str(tmp_path / "queue.db"))
+    sender = FallbackSender(link, lambda records: 0) # HTTP 도 불통 -> 큐에 남아야 함
+    broker.drop_publishes = 1
+    for i in range(3):
+        queue.put({"seq": i})
+    drainer = QueueDrainer(queue, sender.send, batch_size=3, base_delay=0.05, max_delay=0.1)
+    drainer.start()
+    try:
+        assert wait_until(lambda: len(queue) == 0)
+    finally:
+        drainer.stop()
+        queue.close()
+
+    # 첫 발행은 PUBACK 없이 끊김 -> 재연결 뒤 같은 레코드를 다시 발행
+    assert link.client.connects == 2
+    assert drainer.failures >= 1
+    telemetry = [json.loads(gzip.decompress(payload)) for topic, payload in broker.published
+                 if topic == "refrigerator/7/telemetry/gz"]
+    assert telemetry == [[{"seq": 0}, {"seq": 1}, {"seq": 2}]]
+    assert sender.mqtt_records == 3 and sender.http_records == 0
+
+@pytest.mark.parametrize("raw", [
+    packet(PUBLISH | 0x02, encode_string("refrigerator/7/config")), # QoS 1 인데 packet id 없음 (struct.error)
+    packet(PUBLISH, b"\x00\x02\xff\xfe"), # UTF-8 이 아닌 토픽 (UnicodeDecodeError)
+])
+def test_malformed_packet_drops_and_reconnects(broker, device, raw):
+    link, configs, task = device
+    broker.inject(raw)
+    assert wait_until(lambda: link.client.connects == 2)
+    assert not task.done()
+    assert wait_until(lambda: broker.retained.get("refrigerator/7/status") == b"online")
+    broker.publish("refrigerator/7/config", b"after")
+    assert wait_until(lambda: configs == [b"after"])
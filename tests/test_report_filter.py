@@ -0,0 +1,68 @@
+from report_filter import ReportFilter, replay, synthetic_day
+
+class Clock:
+    # 측정 주기 10초로 진행하는 시계 (offer 의 timestamp)
+    def __init__(self, start=1_700_000_000.0, period=10.0):
+        self.now = start
+        self.period = period
+
+    def tick(self):
+        self.now += self.period
+        return self.now
+
+def record(temperature, current=None, **extra):
+    return dict({"temperature_value": str(temperature), "current_value": current, "refrigerator_id": 1,
+                 "measured_at": "2024-01-01T00:00:00+0900"}, **extra)
+
+def test_deadband_suppresses_small_changes():
+    clock = Clock()
+    f = ReportFilter(heartbeat=600)
+    assert f.offer(record(3.0), clock.now)['report_reason'] == 'first'
+    # 0.3°C 미만 변화, measured_at 만 바뀜 -> 보내지 않음
+    for temperature in (3.1, 3.2, 2.9, 3.25):
+        assert f.offer(record(temperature, measured_at=str(clock.tick())), clock.now) is None
+    report = f.offer(record(3.4), clock.tick())
+    assert report['report_reason'] == 'temperature_value'
+    # 비교 기준은 마지막으로 보낸 값 (3.4)
+    assert f.offer(record(3.2), clock.tick()) is None
+    # 숫자가 아닌 필드는 값이 바뀌면 바로
+    assert f.offer(record(3.4, refrigerator_id=2), clock.tick())['report_reason'] == 'refrigerator_id'
+    assert (f.offered, f.reported) == (8, 3)
+
+def test_heartbeat_forces_report():
+    clock = Clock()
+    f = ReportFilter(heartbeat=60)
+    f.offer(record(3.0), clock.now)
+    sent = [f.offer(record(3.0), clock.tick()) for _ in range(12)]
+    reasons = [(i, r['report_reason']) for i, r in enumerate(sent) if r is not None]
+    # 10초 주기, 하트비트 60초 -> 6번째, 12번째
+    assert reasons == [(5, 'heartbeat'), (11, 'heartbeat')]
+    assert sent[5]['interval_seconds'] == 60.0
+
+def test_event_fields_force_report():
+    clock = Clock()
+    f = ReportFilter()
+    f.offer(record(3.0), clock.now)
+    assert f.offer(record(3.0, alarms=[]), clock.tick()) is None
+    assert f.offer(record(3.0, alarms=[{'alarm': 'temperature_high'}]), clock.tick())['report_reason'] == 'event'
+
+def test_aggregates_cover_suppressed_samples():
+    clock = Clock()
+    f = ReportFilter(heartbeat=600)
+    f.offer(record(3.0, current="2.0"), clock.now)
+    for temperature, current in ((3.1, "2.1"), (2.8, "1.9"), (3.2, "2.0")):
+        assert f.offer(record(temperature, current=current), clock.tick()) is None
+    report = f.offer(record(3.4, current="2.0"), clock.tick())
+    # 직전 보고 이후 구간 (이번 값 포함)
+    assert report['interval_seconds'] == 40.0
+    assert report['aggregates']['temperature_value'] == {'min': 2.8, 'max': 3.4, 'mean': 3.125, 'count': 4}
+    assert report['aggregates']['current_value'] == {'min': 1.9, 'max': 2.1, 'mean': 2.0, 'count': 4}
+    # 보고 뒤에는 새 구간
+    report = f.offer(record(2.9, current="2.0"), clock.tick())
+    assert report['aggregates']['temperature_value']['count'] == 1
+
+def test_synthetic_day_reduces_reports():
+    records, reports, bytes_all, bytes_sent = replay(synthetic_day(), ReportFilter())
+    assert records == 8640
+    assert 144 <= reports < records / 5 # 하트비트(10분) 이상, 5배 넘게 감소
+    assert bytes_sent < bytes_all / 3
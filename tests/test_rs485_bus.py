@@ -0,0 +1,44 @@
+import pytest
+
+from rs485_bus import BusManager
+
+def test_scale_keeps_per_slave_periods():
+    bus = BusManager(None, [{'slave_id': 1, 'period': 5}, {'slave_id': 2, 'period': 30}])
+    assert bus.base_period() == 5
+    bus.scale_poll_periods(0.5)
+    assert {s.slave_id: s.period for s in bus.slaves.values()} == {1: 2.5, 2: 15.0}
+    bus.scale_poll_periods(2)
+    assert {s.slave_id: s.period for s in bus.slaves.values()} == {1: 10.0, 2: 60.0}
+
+def test_set_poll_period_targets_one_slave():
+    bus = BusManager(None, [{'slave_id': 1, 'period': 5}, {'slave_id': 2, 'period': 30}])
+    bus.set_poll_period(1, slave_id=2)
+    assert bus.slaves[1].period == 5 and bus.slaves[2].period == 1
+    assert bus.slaves[2].base_period == 30
+
+def test_adaptive_channel_scales_each_slave_from_its_base(fake_fox):
+    pytest.importorskip("serial")
+    from sensor_drivers import FoxMr20Driver
+    from agent_runtime import AgentRuntime
+    from adaptive_sampling import AdaptiveScheduler
+    from refrigerator_update import add_adaptive_channels
+
+    driver = FoxMr20Driver(port=fake_fox.port, slaves=[{'slave_id': 1, 'period': 2}, {'slave_id': 2, 'period': 10}])
+    driver.open()
+    try:
+        sampler = AdaptiveScheduler()
+        add_adaptive_channels(sampler, AgentRuntime(), [driver])
+        channel = sampler.channels[driver.channel]
+        assert channel.period == 2
+        # 조용하면 배율이 커져도 슬레이브 2 는 계속 슬레이브 1 의 5배
+        for i in range(5):
+            sampler.observe(driver.channel, 3.0, ts=i * 60.0)
+        periods = {s.slave_id: s.period for s in driver.bus.slaves.values()}
+        assert periods[1] == pytest.approx(channel.period)
+        assert periods[2] == pytest.approx(channel.period * 5)
+        assert periods[1] > 2
+        # 과도 상태 -> 최소 주기, 비율 유지
+        sampler.boost(driver.channel, ts=400.0)
+        assert {s.slave_id: s.period for s in driver.bus.slaves.values()} == {1: 1.0, 2: 5.0}
+    finally:
+        driver.close()
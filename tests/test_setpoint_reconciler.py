@@ -0,0 +1,99 @@
+import pytest
+
+pytest.importorskip("serial")
+
+from fox_registers import RegisterPoller  # noqa: E402
+from setpoint_reconciler import SetpointReconciler  # noqa: E402
+
+TEMP_SET = 0x0002
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+@pytest.fixture
+def reconciler(clock):
+    return SetpointReconciler(RegisterPoller(slave_id=1), min_interval=30, clock=clock)
+
+def test_write_is_read_back(reconciler, fake_fox, fox_serial):
+    reconciler.set_desired({'temp_set': 4.5, 'temp_gap': 2})
+    report = reconciler.reconcile(fox_serial)
+    # temp_gap 은 이미 2 -> temp_set 만 씀
+    assert report['deltas'] == {'temp_set': 4.5}
+    assert report['written'] == {'temp_set': 4.5} and report['verified'] is True
+    assert fake_fox.holding[1][TEMP_SET] == 45
+
+    # 일치하면 읽기만 하고 쓰지 않음
+    assert reconciler.reconcile(fox_serial) == {'deltas': {}, 'written': {}, 'verified': None}
+    assert reconciler.stats() == {'checks': 2, 'writes': 1, 'verify_failures': 0, 'drifts': 0}
+
+def test_readback_mismatch_retries_with_backoff(reconciler, fake_fox, fox_serial, monkeypatch, clock):
+    # 패널 잠금: 쓰기에는 정상 응답하지만 값은 그대로
+    handle = fake_fox.handle
+    def locked(frame):
+        response = handle(frame)
+        fake_fox.holding[1][TEMP_SET] = 30
+        return response
+    monkeypatch.setattr(fake_fox, 'handle', locked)
+
+    reconciler.set_desired({'temp_set': 5.0})
+    report = reconciler.reconcile(fox_serial)
+    assert report['written'] == {'temp_set': 5.0} and report['verified'] is False
+    assert reconciler.verify_failures == 1
+
+    # 실패 1회 -> min_interval * 2 동안 보류
+    clock.now += 59
+    assert reconciler.reconcile(fox_serial)['written'] == {}
+    clock.now += 1
+    assert reconciler.reconcile(fox_serial)['verified'] is False
+    assert reconciler.verify_failures == 2
+
+    # 실패 2회 -> min_interval * 4
+    clock.now += 119
+    assert reconciler.reconcile(fox_serial)['written'] == {}
+    clock.now += 1
+    assert reconciler.reconcile(fox_serial)['written'] == {'temp_set': 5.0}
+    assert reconciler.writes == 3
+
+def test_repeated_desired_changes_are_rate_limited(reconciler, fake_fox, fox_serial, clock):
+    reconciler.set_desired({'temp_set': 4.0})
+    assert reconciler.reconcile(fox_serial)['verified'] is True
+
+    # 같은 레지스터를 min_interval 안에 다시 바꾸면 보류
+    reconciler.set_desired({'temp_set': 5.0})
+    report = reconciler.reconcile(fox_serial)
+    assert report['deltas'] == {'temp_set': 5.0} and report['written'] == {}
+    assert fake_fox.holding[1][TEMP_SET] == 40
+    clock.now += 30
+    assert reconciler.reconcile(fox_serial)['written'] == {'temp_set': 5.0}
+    assert fake_fox.holding[1][TEMP_SET] == 50
+
+def test_hourly_write_cap(fake_fox, fox_serial, clock):
+    reconciler = SetpointReconciler(RegisterPoller(slave_id=1), min_interval=0, max_writes_per_hour=2, clock=clock)
+    for value in (4.0, 5.0):
+        reconciler.set_desired({'temp_set': value})
+        assert reconciler.reconcile(fox_serial)['verified'] is True
+        clock.now += 1
+    reconciler.set_desired({'temp_set': 6.0})
+    assert reconciler.reconcile(fox_serial)['written'] == {}
+    clock.now += 3600
+    assert reconciler.reconcile(fox_serial)['written'] == {'temp_set': 6.0}
+
+def test_panel_change_is_detected_and_corrected(reconciler, fake_fox, fox_serial, clock):
+    reconciler.set_desired({'temp_set': 4.0})
+    assert reconciler.reconcile(fox_serial)['verified'] is True
+
+    fake_fox.holding[1][TEMP_SET] = 80 # 전면 패널에서 8.0°C 로 바꿈
+    clock.now += 60
+    report = reconciler.reconcile(fox_serial)
+    assert report['deltas'] == {'temp_set': 4.0}
+    assert report['written'] == {'temp_set': 4.0} and report['verified'] is True
+    assert reconciler.drifts == 1
+    assert fake_fox.holding[1][TEMP_SET] == 40
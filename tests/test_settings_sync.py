@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+
+from settings_sync import SettingsSync, register_changes  # noqa: E402
+
+NUMBER = "NO.1-1"
+
+class Nas:
+    # 설정 목록 + 검증자. validators=False 면 ETag/Last-Modified 를 주지 않는 서버
+    def __init__(self, validators=True):
+        self.item = {'refrigerator_number': NUMBER, 'refrigerator_id': 1, 'setting_temp_value': 3.0,
+                     'temp_gap': 2.0, 'defrost_time': 20}
+        self.version = 1
+        self.validators = validators
+
+    def update(self, **fields):
+        self.item.update(fields)
+        self.version += 1
+
+    def __call__(self, headers):
+        etag = f'"v{self.version}"'
+        if self.validators and headers.get('If-None-Match') == etag:
+            return 304, b'', {}
+        body = json.dumps({'data': [self.item, {'refrigerator_number': "NO.1-2", 'refrigerator_id': 2}]}).encode()
+        response_headers = {'ETag': etag, 'Last-Modified': "Mon, 01 Jan 2024 00:00:00 GMT"} if self.validators else {}
+        return 200, body, response_headers
+
+@pytest.fixture
+def nas(stub_server):
+    nas = stub_server.respond_get = Nas()
+    return nas
+
+def make_sync(stub_server, tmp_path):
+    return SettingsSync(stub_server.url, NUMBER, "serial", snapshot_path=str(tmp_path / "snapshot.json"))
+
+def test_not_modified_applies_nothing(stub_server, nas, tmp_path):
+    sync = make_sync(stub_server, tmp_path)
+    first = sync.sync()
+    assert first['setting_temp_value_from_api'] == (None, 3.0)
+    settings = dict(sync.settings)
+
+    assert sync.sync() == {}
+    status, headers = stub_server.get_requests[-1]
+    assert status == 304 and headers['If-None-Match'] == '"v1"'
+    assert 'If-Modified-Since' in headers
+    assert sync.settings == settings and sync.not_modified == 1
+
+def test_identical_body_without_validators_applies_nothing(stub_server, tmp_path):
+    stub_server.respond_get = Nas(validators=False)
+    sync = make_sync(stub_server, tmp_path)
+    assert sync.sync()
+    settings = dict(sync.settings)
+    # 검증자가 없어 항상 200 이지만 본문 해시가 같음
+    assert sync.sync() == {}
+    assert stub_server.get_requests[-1][0] == 200
+    assert sync.settings == settings and sync.not_modified == 1
+
+def test_changed_body_yields_only_changed_keys(stub_server, nas, tmp_path):
+    sync = make_sync(stub_server, tmp_path)
+    sync.sync()
+    nas.update(setting_temp_value=4.0)
+    diff = sync.sync()
+    assert diff == {'setting_temp_value_from_api': (3.0, 4.0)}
+    assert register_changes(diff) == {'temp_set': 4.0}
+    assert sync.settings['temp_gap_api'] == 2.0
+
+@pytest.mark.parametrize("validators", [True, False])
+def test_restart_from_snapshot_does_not_repush(stub_server, tmp_path, validators):
+    stub_server.respond_get = Nas(validators)
+    make_sync(stub_server, tmp_path).sync()
+
+    # 재시작: 스냅샷에서 설정과 검증자를 복원 -> 첫 요청이 304/같은 본문이라 제어기에 쓸 것이 없음
+    restarted = make_sync(stub_server, tmp_path)
+    assert restarted.settings['setting_temp_value_from_api'] == 3.0
+    diff = restarted.sync()
+    assert diff == {} and register_changes(diff) == {}
+    assert stub_server.get_requests[-1][0] == (304 if validators else 200)
+
+def test_snapshot_for_other_refrigerator_is_ignored(stub_server, nas, tmp_path):
+    make_sync(stub_server, tmp_path).sync()
+    other = SettingsSync(stub_server.url, "NO.1-2", "serial", snapshot_path=str(tmp_path / "snapshot.json"))
+    assert other.etag is None and other.settings['setting_temp_value_from_api'] is None
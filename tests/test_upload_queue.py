@@ -0,0 +1,146 @@
+import time
+
+import pytest
+
+from upload_queue import UploadQueue, QueueDrainer, RecordRejected
+
+requests = pytest.importorskip("requests")
+from batch_uploader import BatchUploader  # noqa: E402
+
+def records(n, start=0):
+    return [{"seq": i, "temperature_value": "3.25"} for i in range(start, start + n)]
+
+def wait_until(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+@pytest.fixture
+def queue(tmp_path):
+    q = UploadQueue(str(tmp_path / "queue.db"))
+    yield q
+    q.close()
+
+def drain(queue, send, **kwargs):
+    drainer = QueueDrainer(queue, send, base_delay=0.01, max_delay=0.05, **kwargs)
+    drainer.start()
+    return drainer
+
+def test_outage_then_recovery_delivers_everything_in_order(queue, stub_server):
+    # 연결이 끊기는 장애 -> 503 -> 복구. 그 사이 쌓인 레코드는 순서대로 모두 도착
+    phase = {'mode': 'drop'}
+    stub_server.respond = lambda body, headers: {'drop': None, '503': 503, 'up': 201}[phase['mode']]
+    uploader = BatchUploader(stub_server.url, timeout=2)
+    drainer = drain(queue, uploader.send, batch_size=5)
+    try:
+        for record in records(12):
+            queue.put(record)
+        assert wait_until(lambda: len(stub_server.requests) >= 3)
+        phase['mode'] = '503'
+        for record in records(8, 12):
+            queue.put(record)
+        assert wait_until(lambda: any(status == 503 for status, _, _ in stub_server.requests))
+        assert len(queue) == 20 and not stub_server.received
+        phase['mode'] = 'up'
+        assert wait_until(lambda: len(queue) == 0)
+    finally:
+        drainer.stop()
+    assert [r['seq'] for r in stub_server.received] == list(range(20))
+    assert drainer.failures >= 2
+
+@pytest.mark.parametrize("status", [401, 403, 404, 500])
+def test_non_record_errors_keep_records_queued(queue, stub_server, status):
+    # 토큰 만료/권한/프록시 오류는 레코드 탓이 아님 -> 지우지 않고 백오프 후 재전송
+    failing = {'count': 0}
+
+    def respond(body, headers):
+        if failing['count'] < 6:
+            failing['count'] += 1
+            return status
+        return 201
+    stub_server.respond = respond
+    uploader = BatchUploader(stub_server.url, timeout=2)
+    for record in records(3):
+        queue.put(record)
+    drainer = drain(queue, uploader.send)
+    try:
+        assert wait_until(lambda: len(queue) == 0)
+    finally:
+        drainer.stop()
+    assert [r['seq'] for r in stub_server.received] == [0, 1, 2]
+    assert queue.dead_letter_count() == 0
+
+def test_malformed_record_moves_to_dead_letter(queue, stub_server):
+    # 단건 전송에 422 -> 그 레코드만 dead_letter, 나머지는 순서대로 전송
+    stub_server.respond = lambda body, headers: 422 if body.get('seq') == 2 else 201
+    uploader = BatchUploader(stub_server.url, timeout=2)
+    for record in records(5):
+        queue.put(record)
+    drainer = drain(queue, uploader.send)
+    try:
+        assert wait_until(lambda: len(queue) == 0)
+    finally:
+        drainer.stop()
+    assert [r['seq'] for r in stub_server.received] == [0, 1, 3, 4]
+    dead = queue.dead_letters()
+    assert [d['record']['seq'] for d in dead] == [2]
+    assert dead[0]['status'] == 422
+    assert drainer.rejected == 1
+
+def test_requeue_dead_letters_restores_original_order(queue):
+    for record in records(3):
+        queue.put(record)
+    ids = [row_id for row_id, _ in queue.peek(3)]
+    queue.dead_letter(ids[1:2], 400, "bad")
+    assert len(queue) == 2 and queue.dead_letter_count() == 1
+    assert queue.requeue_dead_letters() == 1
+    assert [r['seq'] for _, r in queue.peek(3)] == [0, 1, 2]
+    assert queue.dead_letter_count() == 0
+
+def test_unacked_records_survive_restart(tmp_path):
+    # 전송 중에 죽으면 (ack 전) 재시작 후 다시 전송 (at-least-once)
+    path = str(tmp_path / "queue.db")
+    q = UploadQueue(path)
+    for record in records(4):
+        q.put(record)
+    batch = q.peek(2)
+    q.ack([batch[0][0]])
+    q.close()
+    q = UploadQueue(path)
+    try:
+        assert [r['seq'] for _, r in q.peek(10)] == [1, 2, 3]
+        assert q.wait(0)
+    finally:
+        q.close()
+
+def test_partial_send_acks_prefix_only(queue):
+    for record in records(4):
+        queue.put(record)
+    calls = []
+
+    def send(batch):
+        calls.append([r['seq'] for r in batch])
+        if len(calls) == 1:
+            raise RecordRejected(1, 400, "bad field")
+        return len(batch)
+    drainer = drain(queue, send, batch_size=4)
+    try:
+        assert wait_until(lambda: len(queue) == 0)
+    finally:
+        drainer.stop()
+    assert calls == [[0, 1, 2, 3], [2, 3]]
+    assert [d['record']['seq'] for d in queue.dead_letters()] == [1]
+
+def test_eviction_bounds_disk_footprint(tmp_path):
+    q = UploadQueue(str(tmp_path / "queue.db"), max_records=10)
+    try:
+        for record in records(25):
+            q.put(record)
+        assert len(q) == 10
+        assert q.evicted == 15
+        assert [r['seq'] for _, r in q.peek(1)] == [15]
+    finally:
+        q.close()
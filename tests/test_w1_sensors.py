@@ -0,0 +1,107 @@
+import os
+import threading
+
+import pytest
+
+from w1_sensors import W1Bus, probe_readings, primary_temperature
+from sensor_drivers import Ds18b20Driver
+from simulator.w1_sysfs import FakeW1Tree
+
+PROBE_A = '28-00000000aa01'
+PROBE_B = '28-00000000bb02'
+
+@pytest.fixture
+def tree(tmp_path):
+    with FakeW1Tree({PROBE_A: 3.25, PROBE_B: -18.5}, base_dir=str(tmp_path)) as tree:
+        yield tree
+
+def bulk_path(tree):
+    return os.path.join(tree.base_dir, 'w1_bus_master1', 'therm_bulk_read')
+
+def test_read_all_triggers_one_bulk_conversion(tree):
+    bus = W1Bus(tree.base_dir)
+    assert bus.read_all() == {PROBE_A: 3.25, PROBE_B: -18.5}
+    assert bus.bulk_supported
+    with open(bulk_path(tree)) as f:
+        assert f.read().strip() == 'trigger'
+
+def test_without_bulk_read_sensors_are_still_read(tmp_path):
+    with FakeW1Tree({PROBE_A: 4.0}, base_dir=str(tmp_path), bulk_read=False) as tree:
+        bus = W1Bus(tree.base_dir)
+        assert not bus.start_conversion()
+        assert bus.read_all() == {PROBE_A: 4.0}
+
+def test_wait_conversion_polls_until_done(tree):
+    bus = W1Bus(tree.base_dir)
+    bus.discover()
+    with open(bulk_path(tree), 'w') as f:
+        f.write('-1\n')
+    assert not bus.conversion_done()
+
+    def finish():
+        with open(bulk_path(tree), 'w') as f:
+            f.write('1\n')
+    timer = threading.Timer(0.1, finish)
+    timer.start()
+    try:
+        assert bus.wait_conversion(timeout=2.0)
+    finally:
+        timer.cancel()
+
+def test_wait_conversion_is_bounded(tree):
+    bus = W1Bus(tree.base_dir)
+    bus.discover()
+    with open(bulk_path(tree), 'w') as f:
+        f.write('-1\n')
+    assert not bus.wait_conversion(timeout=0.1)
+
+def test_crc_no_returns_none_after_bounded_retries(tree):
+    tree.set_temperature(PROBE_A, 5.0, crc_ok=False)
+    bus = W1Bus(tree.base_dir, max_retries=3)
+    assert bus.read_all() == {PROBE_A: None, PROBE_B: -18.5}
+    assert bus.read_errors == 1
+    tree.set_temperature(PROBE_A, 5.0)
+    assert bus.read_sensor(PROBE_A) == 5.0
+
+def test_power_on_85c_is_discarded(tree):
+    tree.set_temperature(PROBE_B, 85.0)
+    bus = W1Bus(tree.base_dir)
+    assert bus.read_sensor(PROBE_B) is None
+    assert bus.read_errors == 1
+
+def test_temperature_attribute_preferred(tmp_path):
+    with FakeW1Tree({PROBE_A: 2.5}, base_dir=str(tmp_path), temperature_attr=True) as tree:
+        with open(os.path.join(tree.base_dir, PROBE_A, 'w1_slave'), 'w') as f:
+            f.write("garbage\n")
+        assert W1Bus(tree.base_dir).read_sensor(PROBE_A) == 2.5
+
+def test_probe_disappearing_triggers_rediscovery(tree):
+    bus = W1Bus(tree.base_dir, refresh_seconds=3600)
+    assert set(bus.read_all()) == {PROBE_A, PROBE_B}
+    tree.remove(PROBE_B)
+    # 캐시된 목록으로 읽다가 파일이 없으면 None, 다음 호출에서 다시 탐색
+    assert bus.read_all() == {PROBE_A: 3.25, PROBE_B: None}
+    assert bus.read_all() == {PROBE_A: 3.25}
+    assert bus.read_errors == 0
+
+def test_discovery_is_cached(tree):
+    bus = W1Bus(tree.base_dir, refresh_seconds=3600)
+    assert bus.sensors() == [PROBE_A, PROBE_B]
+    tree.set_temperature('28-00000000cc03', 1.0)
+    assert bus.sensors() == [PROBE_A, PROBE_B]
+    bus.discover()
+    assert '28-00000000cc03' in bus.sensors()
+
+def test_driver_maps_probes_to_locations(tree):
+    driver = Ds18b20Driver(probes={PROBE_A: 'center', PROBE_B: 'freezer'}, primary='freezer', base_dir=tree.base_dir)
+    driver.open()
+    temps = driver.read().value
+    assert driver.primary_temperature(temps) == -18.5
+    tree.remove(PROBE_A)
+    driver.read()
+    temps = driver.read().value
+    assert probe_readings(temps, driver.probes) == [
+        {'probe_id': PROBE_A, 'location': 'center', 'temperature': None},
+        {'probe_id': PROBE_B, 'location': 'freezer', 'temperature': -18.5},
+    ]
+    assert primary_temperature(temps, driver.probes) == -18.5
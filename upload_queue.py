@@ -0,0 +1,251 @@
+import json
+import time
+import random
+import sqlite3
+import logging
+import threading
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+QUEUE_DB_PATH = "upload_queue.db"
+MAX_QUEUE_RECORDS = 100000 # 10초 주기 기준 약 11.5일 분량, 초과 시 오래된 것부터 삭제
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 300.0
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+class RecordRejected(Exception):
+    # send() 가 서버로부터 레코드 자체가 잘못됐다는 응답을 받았을 때 (앞쪽 done 건은 처리 완료)
+    def __init__(self, done: int, status: int, reason: str = ""):
+        super().__init__(f"레코드 거절: {status} {reason}".strip())
+        self.done = done
+        self.status = status
+        self.reason = reason
+
+# ==============================================================================
+# 1. SQLite(WAL) 기반 영속 큐
+# ==============================================================================
+class UploadQueue:
+    def __init__(self, path=QUEUE_DB_PATH, max_records=MAX_QUEUE_RECORDS):
+        self.path = path
+        self.max_records = max_records
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Event()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # 커밋된 레코드는 전원이 끊겨도 남아 있어야 하므로 FULL
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " created REAL NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " priority INTEGER NOT NULL DEFAULT 1)"
+        )
+        # 이전 버전 DB 는 priority 열이 없음
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")]
+        if 'priority' not in columns:
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN priority INTEGER NOT NULL DEFAULT 1")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_priority ON outbox (priority, id)")
+        # 서버가 형식 오류로 거절한 레코드는 지우지 않고 따로 보관 (백엔드 수정 후 requeue_dead_letters)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letter ("
+            " id INTEGER PRIMARY KEY,"
+            " created REAL NOT NULL,"
+            " failed REAL NOT NULL,"
+            " status INTEGER,"
+            " reason TEXT,"
+            " payload TEXT NOT NULL)"
+        )
+        if len(self):
+            self._not_empty.set()
+
+    def put(self, record: dict, priority=False):
+        # priority=True (알람 등) 는 쌓여 있는 일반 레코드보다 먼저 전송
+        payload = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._conn.execute(
+                    "INSERT INTO outbox (created, payload, priority) VALUES (?, ?, ?)",
+                    (time.time(), payload, PRIORITY_HIGH if priority else PRIORITY_NORMAL))
+                # 용량 제한: 가장 오래된 레코드부터 삭제
+                cutoff = cur.lastrowid - self.max_records
+                if cutoff > 0:
+                    deleted = self._conn.execute("DELETE FROM outbox WHERE id <= ?", (cutoff,)).rowcount
+                    if deleted:
+                        self.evicted += deleted
+                        logger.warning(f"업로드 큐 용량 초과로 오래된 레코드 {deleted}건 삭제")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._not_empty.set()
+
+    def peek(self, limit=1) -> List[Tuple[int, dict]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload FROM outbox ORDER BY priority, id LIMIT ?", (limit,)).fetchall()
+        if not rows:
+            self._not_empty.clear()
+        return [(row_id, json.loads(payload)) for row_id, payload in rows]
+
+    def oldest_created(self):
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(created) FROM outbox").fetchone()
+        return row[0] if row else None
+
+    def ack(self, ids):
+        # 업로드가 확인된 뒤에만 삭제 -> 중간에 죽으면 재시작 후 다시 전송 (at-least-once)
+        ids = list(ids)
+        if not ids:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def dead_letter(self, ids, status: Optional[int] = None, reason: str = ""):
+        # outbox 에서 dead_letter 로 한 트랜잭션 안에서 이동 (중간에 죽어도 둘 중 한 곳에는 남음)
+        ids = list(ids)
+        if not ids:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for row_id in ids:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO dead_letter (id, created, failed, status, reason, payload)"
+                        " SELECT id, created, ?, ?, ?, payload FROM outbox WHERE id = ?",
+                        (time.time(), status, reason, row_id))
+                    self._conn.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def dead_letters(self, limit=100) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, created, failed, status, reason, payload FROM dead_letter ORDER BY id LIMIT ?",
+                (limit,)).fetchall()
+        return [{'id': row_id, 'created': created, 'failed': failed, 'status': status, 'reason': reason,
+                 'record': json.loads(payload)} for row_id, created, failed, status, reason, payload in rows]
+
+    def requeue_dead_letters(self) -> int:
+        # 보관된 레코드를 원래 id 그대로 outbox 로 되돌림 (원래 순서 유지)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                moved = self._conn.execute(
+                    "INSERT OR IGNORE INTO outbox (id, created, payload, priority)"
+                    " SELECT id, created, payload, ? FROM dead_letter", (PRIORITY_NORMAL,)).rowcount
+                self._conn.execute("DELETE FROM dead_letter")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if moved:
+            self._not_empty.set()
+        return moved
+
+    def dead_letter_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+
+    def wait(self, timeout=None) -> bool:
+        return self._not_empty.wait(timeout)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# ==============================================================================
+# 2. 백그라운드 전송기 (순서 보장 + 지수 백오프)
+# ==============================================================================
+class QueueDrainer:
+    # send(records) 는 앞에서부터 전송 완료된 레코드 수를 반환. 서버가 레코드 형식 오류로 거절하면
+    # RecordRejected(done, ...) -> 앞쪽 done 건은 ack, 그 다음 레코드는 dead_letter 로 옮기고 바로 계속
+    # batch_size 건이 모이거나 가장 오래된 레코드가 max_wait 초를 넘으면 전송
+    def __init__(self, queue: UploadQueue, send: Callable[[List[dict]], int],
+                 batch_size=1, max_wait=0.0,
+                 base_delay=BACKOFF_BASE_SECONDS, max_delay=BACKOFF_MAX_SECONDS):
+        self.queue = queue
+        self.send = send
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._stop = threading.Event()
+        self._flush = threading.Event()
+        self._thread = None
+        self.sent = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="upload-drainer", daemon=True)
+        self._thread.start()
+
+    def flush(self):
+        # 배치가 덜 찼어도 max_wait 를 기다리지 않고 바로 전송 (알람 레코드)
+        self._flush.set()
+        self.queue._not_empty.set()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._flush.set()
+        self.queue._not_empty.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        delay = self.base_delay
+        while not self._stop.is_set():
+            if not self.queue.wait(timeout=1.0):
+                continue
+            batch = self.queue.peek(self.batch_size)
+            if not batch:
+                continue
+            if len(batch) < self.batch_size and self.max_wait > 0 and not self._flush.is_set():
+                oldest = self.queue.oldest_created()
+                remaining = (oldest or 0) + self.max_wait - time.time()
+                if remaining > 0:
+                    self._flush.wait(min(remaining, 1.0))
+                    continue
+            self._flush.clear()
+            try:
+                done = self.send([record for _, record in batch])
+            except RecordRejected as e:
+                done = min(e.done, len(batch) - 1)
+                self.queue.ack([row_id for row_id, _ in batch[:done]])
+                self.queue.dead_letter([batch[done][0]], e.status, e.reason)
+                self.sent += done
+                self.rejected += 1
+                logger.error(f"서버가 레코드를 거절해 dead_letter 로 이동: id={batch[done][0]} {e}")
+                delay = self.base_delay
+                continue
+            except Exception as e:
+                logger.error(f"큐 전송 오류: {e}")
+                done = 0
+            if done:
+                self.queue.ack([row_id for row_id, _ in batch[:done]])
+                self.sent += done
+                delay = self.base_delay
+                continue
+            self.failures += 1
+            wait = delay * random.uniform(0.5, 1.0)
+            logger.warning(f"업로드 실패, {wait:.1f}초 후 재시도 (대기 {len(self.queue)}건)")
+            self._stop.wait(wait)
+            delay = min(delay * 2, self.max_delay)
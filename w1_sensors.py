@@ -0,0 +1,172 @@
+import os
+import time
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# 0. 상수
+# ==============================================================================
+W1_BASE_DIR = '/sys/bus/w1/devices/'
+DS18B20_FAMILY = '28-'
+DISCOVERY_REFRESH_SECONDS = 60 # 센서 목록 캐시 갱신 주기
+CONVERSION_TIMEOUT_SECONDS = 1.0 # 12비트 변환 750ms + 여유
+CONVERSION_POLL_SECONDS = 0.05
+MAX_READ_RETRIES = 3
+# 전원 인가 직후 또는 변환 실패 시 DS18B20 이 돌려주는 값
+POWER_ON_RESET_MILLI = 85000
+
+# ==============================================================================
+# 1. 1-Wire 버스 (센서 탐색 캐시 + 일괄 변환)
+# ==============================================================================
+class W1Bus:
+    def __init__(self, base_dir=W1_BASE_DIR, refresh_seconds=DISCOVERY_REFRESH_SECONDS,
+                 max_retries=MAX_READ_RETRIES):
+        self.base_dir = base_dir
+        self.refresh_seconds = refresh_seconds
+        self.max_retries = max_retries
+        self._sensors: List[str] = []
+        self._masters: List[str] = []
+        self._discovered_at = None
+        self.read_errors = 0
+
+    # --------------------------------------------------------------------------
+    # 탐색 (매 측정마다 listdir 하지 않음)
+    # --------------------------------------------------------------------------
+    def discover(self):
+        try:
+            entries = os.listdir(self.base_dir)
+        except Exception as e:
+            logger.error(f"1-Wire 장치 탐색 오류: {e}")
+            entries = []
+        sensors = sorted(d for d in entries if d.startswith(DS18B20_FAMILY))
+        if sensors != self._sensors:
+            logger.info(f"DS18B20 센서 목록: {sensors}")
+        self._sensors = sensors
+        self._masters = sorted(
+            d for d in entries
+            if d.startswith('w1_bus_master') and os.path.exists(os.path.join(self.base_dir, d, 'therm_bulk_read'))
+        )
+        self._discovered_at = time.monotonic()
+
+    def sensors(self) -> List[str]:
+        if self._discovered_at is None or time.monotonic() - self._discovered_at >= self.refresh_seconds:
+            self.discover()
+        return list(self._sensors)
+
+    # --------------------------------------------------------------------------
+    # 일괄 변환: 버스의 모든 센서가 동시에 변환 -> 센서 수와 무관하게 약 750ms
+    # --------------------------------------------------------------------------
+    @property
+    def bulk_supported(self) -> bool:
+        if self._discovered_at is None:
+            self.discover()
+        return bool(self._masters)
+
+    def start_conversion(self) -> bool:
+        if not self.bulk_supported:
+            return False
+        started = False
+        for master in self._masters:
+            try:
+                with open(os.path.join(self.base_dir, master, 'therm_bulk_read'), 'w') as f:
+                    f.write('trigger\n')
+                started = True
+            except Exception as e:
+                logger.error(f"1-Wire 일괄 변환 시작 오류 ({master}): {e}")
+        return started
+
+    def conversion_done(self) -> bool:
+        # therm_bulk_read: -1 변환 중, 1 변환 완료(읽지 않은 값 있음), 0 진행 중인 변환 없음
+        for master in self._masters:
+            try:
+                with open(os.path.join(self.base_dir, master, 'therm_bulk_read'), 'r') as f:
+                    if f.read().strip() == '-1':
+                        return False
+            except Exception:
+                continue
+        return True
+
+    def wait_conversion(self, timeout=CONVERSION_TIMEOUT_SECONDS) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.conversion_done():
+                return True
+            time.sleep(CONVERSION_POLL_SECONDS)
+        return self.conversion_done()
+
+    # --------------------------------------------------------------------------
+    # 센서 읽기 (재시도 횟수 제한)
+    # --------------------------------------------------------------------------
+    def read_sensor(self, sensor_id: str) -> Optional[float]:
+        device_dir = os.path.join(self.base_dir, sensor_id)
+        for _ in range(self.max_retries):
+            try:
+                milli = self._read_milli(device_dir)
+            except FileNotFoundError:
+                # 센서가 빠졌으면 다음 호출에서 다시 탐색
+                self._discovered_at = None
+                return None
+            except Exception as e:
+                logger.debug(f"DS18B20 읽기 재시도 ({sensor_id}): {e}")
+                milli = None
+            if milli is not None and milli != POWER_ON_RESET_MILLI:
+                return round(milli / 1000.0, 2)
+        self.read_errors += 1
+        logger.warning(f"DS18B20 읽기 실패 ({sensor_id}), {self.max_retries}회 시도")
+        return None
+
+    def _read_milli(self, device_dir: str) -> Optional[int]:
+        # 최신 커널의 temperature 속성 우선, 없으면 w1_slave (CRC YES 확인)
+        temperature_path = os.path.join(device_dir, 'temperature')
+        if os.path.exists(temperature_path):
+            with open(temperature_path, 'r') as f:
+                text = f.read().strip()
+            return int(text) if text else None
+        with open(os.path.join(device_dir, 'w1_slave'), 'r') as f:
+            lines = f.readlines()
+        if len(lines) < 2 or lines[0].strip()[-3:] != 'YES':
+            return None
+        equals_pos = lines[1].find('t=')
+        if equals_pos == -1:
+            return None
+        return int(lines[1][equals_pos + 2:])
+
+    def read_all(self) -> Dict[str, Optional[float]]:
+        sensors = self.sensors()
+        if not sensors:
+            return {}
+        if self.start_conversion():
+            if not self.wait_conversion():
+                logger.warning("1-Wire 일괄 변환 시간 초과")
+        return {sensor_id: self.read_sensor(sensor_id) for sensor_id in sensors}
+
+# ==============================================================================
+# 2. 프로브 ID -> 설치 위치 매핑
+# ==============================================================================
+def probe_readings(temps: Dict[str, Optional[float]], locations: Dict[str, str]) -> List[dict]:
+    # 설정에 있는데 응답이 없는 프로브도 None 으로 포함 (끊어진 프로브를 서버가 알 수 있게)
+    readings = []
+    for probe_id in sorted(set(temps) | set(locations)):
+        readings.append({
+            'probe_id': probe_id,
+            'location': locations.get(probe_id),
+            'temperature': temps.get(probe_id),
+        })
+    return readings
+
+def primary_temperature(temps: Dict[str, Optional[float]], locations: Dict[str, str],
+                        primary: Optional[str] = None) -> Optional[float]:
+    # primary 는 프로브 ID 또는 위치 이름. 지정이 없으면 매핑된 첫 프로브, 그것도 없으면 첫 프로브
+    if primary:
+        for probe_id, location in locations.items():
+            if location == primary:
+                return temps.get(probe_id)
+        return temps.get(primary)
+    for probe_id in sorted(locations):
+        if probe_id in temps:
+            return temps[probe_id]
+    if temps:
+        return temps[min(temps)]
+    return None